@@ -0,0 +1,479 @@
+import ast
+import contextlib
+import json
+import operator
+import os
+import threading
+import time
+import urllib.request
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from analysis.universe_screener import SCREENING_COLUMNS
+
+try:
+    import fcntl
+except ImportError:  # Windows: status hanya dijaga antar thread
+    fcntl = None
+
+ALERT_COLUMNS = ["fired_at", "rule", "ticker", "LKH_Score", "price", "Margin_of_Safety", "message"]
+
+_COMPARE_OPS = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+    ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+_BINARY_OPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """
+    Aturan alert: kondisi atas kolom tabel screening
+
+    Kondisi ditulis sebagai ekspresi Python sederhana, misal
+    "Margin_of_Safety > 30" atau "PER < lkh_per_threshold and ROE > lkh_roe_threshold".
+    Yang diizinkan: nama kolom, nama parameter engine, angka, + - * /,
+    perbandingan (boleh berantai), and, or, not. Nilai kosong (NaN) tidak
+    pernah memenuhi perbandingan.
+
+    Parameters:
+    name (str): Nama unik aturan
+    condition (str): Ekspresi kondisi
+    cooldown (float): Detik minimum antar alert untuk saham yang sama
+    message (str): Optional; teks yang ikut dikirim
+    """
+    name: str
+    condition: str
+    cooldown: float = 24 * 3600
+    message: str = ""
+
+
+def compile_condition(condition: str):
+    """
+    Kompilasi kondisi menjadi predikat vektor
+
+    Ekspresi di-parse dengan ast (tidak pernah di-eval) lalu diubah menjadi
+    fungsi yang bekerja pada seluruh kolom sekaligus.
+
+    Parameters:
+    condition (str): Ekspresi kondisi (lihat AlertRule)
+
+    Returns:
+    tuple: (predicate, names); predicate(columns, params, size) mengembalikan
+        array bool sepanjang size, columns berisi {nama: np.ndarray}; names
+        adalah nama yang dipakai
+    """
+    try:
+        tree = ast.parse(condition, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Kondisi tidak valid: {condition!r}") from e
+    names = set()
+    predicate = _compile_node(tree.body, names, condition)
+
+    def run(columns: dict, params: dict, size: int) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = predicate(columns, params)
+        # Kondisi tanpa kolom (hanya parameter) berlaku sama untuk semua saham
+        return np.broadcast_to(np.asarray(result, dtype=bool), (size,))
+
+    return run, frozenset(names)
+
+
+def _compile_node(node, names: set, source: str):
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(v, names, source) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+        def bool_op(columns, params):
+            result = parts[0](columns, params)
+            for part in parts[1:]:
+                result = combine(result, part(columns, params))
+            return result
+        return bool_op
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+        operand = _compile_node(node.operand, names, source)
+        if isinstance(node.op, ast.Not):
+            return lambda columns, params: np.logical_not(operand(columns, params))
+        return lambda columns, params: -operand(columns, params)
+
+    if isinstance(node, ast.Compare):
+        operands = [_compile_node(n, names, source) for n in [node.left, *node.comparators]]
+        ops = []
+        for op in node.ops:
+            if type(op) not in _COMPARE_OPS:
+                raise ValueError(f"Operator tidak didukung dalam {source!r}")
+            ops.append(_COMPARE_OPS[type(op)])
+
+        def compare(columns, params):
+            values = [operand(columns, params) for operand in operands]
+            result = ops[0](values[0], values[1])
+            for i, op in enumerate(ops[1:], start=1):
+                result = np.logical_and(result, op(values[i], values[i + 1]))
+            return result
+        return compare
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        left = _compile_node(node.left, names, source)
+        right = _compile_node(node.right, names, source)
+        op = _BINARY_OPS[type(node.op)]
+        return lambda columns, params: op(left(columns, params), right(columns, params))
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        names.add(name)
+
+        def lookup(columns, params):
+            if name in params:
+                return params[name]
+            if name in columns:
+                return columns[name]
+            raise ValueError(f"Kolom atau parameter tidak dikenal: {name}")
+        return lookup
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        value = node.value
+        return lambda columns, params: value
+
+    raise ValueError(f"Ekspresi tidak didukung dalam {source!r}: {ast.dump(node)}")
+
+
+# Parameter bawaan engine: batas slider LKH dan asumsi DCF default sidebar.
+# Kondisi boleh memakai nama-nama ini; listener refresher memakai nilainya
+# untuk menilai universe.
+DEFAULT_ALERT_PARAMS = {
+    "lkh_per_threshold": 12,
+    "lkh_roe_threshold": 15,
+    "growth_rate": 0.12,
+    "discount_rate": 0.10,
+    "terminal_growth": 0.03,
+    "years": 5,
+}
+
+
+def default_alert_rules() -> list:
+    """Aturan bawaan: undervalued, margin besar, skor LKH 80+, dan kriteria slider LKH"""
+    return [
+        AlertRule("undervalued", "Margin_of_Safety > 0", message="Nilai DCF di atas harga"),
+        AlertRule("margin_30", "Margin_of_Safety > 30", message="Margin of safety di atas 30%"),
+        AlertRule("lkh_80", "LKH_Score >= 80", message="Skor LKH mencapai 80"),
+        AlertRule(
+            "lkh_criteria", "PER < lkh_per_threshold and ROE > lkh_roe_threshold",
+            message="PER dan ROE memenuhi batas LKH"
+        ),
+    ]
+
+
+class AlertEngine:
+    """
+    Mengevaluasi aturan alert atas tabel screening dan mengirim alert baru
+
+    Alert dikirim saat kondisi sebuah saham berubah dari tidak terpenuhi menjadi
+    terpenuhi (bukan setiap evaluasi selama kondisi tetap terpenuhi), dan paling
+    sering sekali per `cooldown` per (aturan, saham) sehingga saham yang
+    naik-turun di sekitar batas tidak membanjiri penerima. Status ini bisa
+    disimpan ke file agar restart tidak mengirim ulang alert yang sama.
+    Aman dipanggil dari beberapa thread.
+
+    Beberapa proses boleh memakai state_path yang sama: evaluasi memegang
+    flock pada file status dan membaca ulang status yang diubah proses lain,
+    sehingga setiap alert hanya dikirim sekali. Parameter juga disimpan di
+    file status; nilai tersimpan menggantikan params dari konstruktor.
+
+    Nama dalam kondisi diperiksa saat aturan ditambahkan: harus kolom dari
+    `columns` atau nama parameter.
+
+    Parameters:
+    rules (list): Daftar AlertRule (nama unik)
+    params (dict): Optional; nilai parameter yang dipakai kondisi
+    sinks (list): Optional; callable sink(alerts) yang menerima list dict alert
+    state_path (str): Optional; file JSON status dedup/cooldown dan parameter
+    history_size (int): Jumlah alert terakhir yang disimpan di memori
+    columns (list): Optional; kolom tabel yang boleh dipakai kondisi, default SCREENING_COLUMNS
+    """
+
+    def __init__(self, rules: list, params: dict = None, sinks: list = None, state_path: str = None,
+                 history_size: int = 200, columns: list = None):
+        self.params = dict(params or {})
+        self.columns = frozenset(columns if columns is not None else SCREENING_COLUMNS)
+        self.sinks = list(sinks or [])
+        self.state_path = state_path
+        self.recent = deque(maxlen=history_size)
+        self.rules = []
+        self._compiled = []
+        self._lock = threading.Lock()
+        # Status per aturan disimpan sebagai array yang diindeks id saham
+        self._ids = {}  # ticker -> id
+        self._active = {}  # nama aturan -> terpenuhi pada evaluasi terakhir
+        self._last_fired = {}  # nama aturan -> epoch alert terakhir, -inf jika belum
+        self._state_key = None
+        for rule in rules:
+            self.add_rule(rule)
+        with self._state_lock():
+            self._load_state()
+
+    # ---- rules ----
+
+    def add_rule(self, rule: AlertRule):
+        """
+        Tambahkan aturan; ValueError jika nama sudah dipakai, kondisi tidak
+        valid, atau kondisi memakai kolom/parameter yang tidak dikenal
+        """
+        predicate, names = compile_condition(rule.condition)
+        unknown = sorted(names - self.columns - set(self.params))
+        if unknown:
+            raise ValueError(f"Kolom atau parameter tidak dikenal dalam {rule.name!r}: {', '.join(unknown)}")
+        with self._lock:
+            if rule.name in self._active:
+                raise ValueError(f"Nama aturan alert harus unik: {rule.name}")
+            size = len(next(iter(self._last_fired.values()), ()))
+            self.rules.append(rule)
+            self._compiled.append((predicate, names))
+            self._active[rule.name] = np.zeros(size, dtype=bool)
+            self._last_fired[rule.name] = np.full(size, -np.inf)
+
+    def set_params(self, **updates):
+        """Ubah parameter kondisi dan simpan ke file status"""
+        with self._lock, self._state_lock():
+            self._sync_state()
+            self.params.update(updates)
+            self._save_state()
+
+    # ---- state ----
+
+    @contextlib.contextmanager
+    def _state_lock(self):
+        """flock pada <state_path>.lock agar proses lain tidak menulis status bersamaan"""
+        if not self.state_path or fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        with open(self.state_path + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _stat_state(self):
+        try:
+            st = os.stat(self.state_path)
+        except (OSError, TypeError):
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _sync_state(self):
+        """Baca ulang status jika file diubah proses lain sejak dibaca/ditulis terakhir"""
+        if self.state_path and self._stat_state() != self._state_key:
+            for name in self._active:
+                self._active[name][:] = False
+                self._last_fired[name][:] = -np.inf
+            self._load_state()
+
+    def _ticker_ids(self, tickers) -> np.ndarray:
+        ids = np.fromiter((self._ids.setdefault(t, len(self._ids)) for t in tickers), dtype=np.intp, count=len(tickers))
+        size = len(self._ids)
+        for name in self._active:
+            grow = size - len(self._active[name])
+            if grow > 0:
+                # Tumbuh dua kali lipat agar saham baru tidak selalu memicu salinan
+                grow = max(grow, len(self._active[name]))
+                self._active[name] = np.concatenate([self._active[name], np.zeros(grow, dtype=bool)])
+                self._last_fired[name] = np.concatenate([self._last_fired[name], np.full(grow, -np.inf)])
+        return ids
+
+    def _load_state(self):
+        if not self.state_path:
+            return
+        self._state_key = self._stat_state()
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Error reading alert state: {str(e)}")
+            return
+        self.params.update(state.get("params", {}))
+        for name, tickers in state.get("active", {}).items():
+            if name in self._active:
+                ids = self._ticker_ids(tickers)
+                self._active[name][ids] = True
+        for name, fired in state.get("last_fired", {}).items():
+            if name in self._last_fired:
+                ids = self._ticker_ids(list(fired))
+                self._last_fired[name][ids] = list(fired.values())
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        tickers = np.array(list(self._ids), dtype=object)
+        state = {"params": self.params, "active": {}, "last_fired": {}}
+        for name, active in self._active.items():
+            state["active"][name] = tickers[active[:len(tickers)]].tolist()
+            last = self._last_fired[name][:len(tickers)]
+            fired = np.isfinite(last)
+            state["last_fired"][name] = dict(zip(tickers[fired].tolist(), last[fired].tolist()))
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+        self._state_key = self._stat_state()
+
+    # ---- evaluation ----
+
+    def evaluate(self, df: pd.DataFrame, now: float = None) -> pd.DataFrame:
+        """
+        Evaluasi semua aturan atas tabel screening dan kirim alert baru ke sinks
+
+        Saham yang tidak ada di df mempertahankan statusnya. Kolom yang dipakai
+        aturan tetapi tidak ada di df dianggap kosong (NaN).
+
+        Parameters:
+        df (pd.DataFrame): Tabel screen_universe (minimal kolom ticker dan
+            kolom yang dipakai aturan)
+        now (float): Optional; waktu epoch evaluasi
+
+        Returns:
+        pd.DataFrame: Alert yang baru dikirim (ALERT_COLUMNS)
+        """
+        now = time.time() if now is None else now
+        fired_rules, fired_rows = [], []
+        changed = False
+        with self._lock, self._state_lock():
+            self._sync_state()
+            columns = {}
+            for _, names in self._compiled:
+                for name in names - set(self.params) - set(columns):
+                    columns[name] = (
+                        pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+                        if name in df.columns else np.full(len(df), np.nan)
+                    )
+            ids = self._ticker_ids(df["ticker"].tolist())
+            for rule, (predicate, _) in zip(self.rules, self._compiled):
+                mask = predicate(columns, self.params, len(ids))
+                active = self._active[rule.name]
+                last_fired = self._last_fired[rule.name]
+                was_active = active[ids]
+                fire = mask & ~was_active & (now - last_fired[ids] >= rule.cooldown)
+                if not changed and (was_active != mask).any():
+                    changed = True
+                active[ids] = mask
+                rows = np.flatnonzero(fire)
+                if len(rows):
+                    last_fired[ids[rows]] = now
+                    fired_rules.extend([rule] * len(rows))
+                    fired_rows.extend(rows.tolist())
+            # Status hanya ditulis ulang jika ada yang berubah (evaluasi tanpa perubahan murah)
+            if changed:
+                self._save_state()
+
+        alerts = self._build_alerts(df, fired_rules, fired_rows, now)
+        if len(alerts):
+            records = alerts.to_dict("records")
+            self.recent.extend(records)
+            for sink in self.sinks:
+                try:
+                    sink(records)
+                except Exception as e:
+                    print(f"Error delivering alerts: {str(e)}")
+        return alerts
+
+    def _build_alerts(self, df: pd.DataFrame, rules: list, rows: list, now: float) -> pd.DataFrame:
+        if not rows:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        picked = df.iloc[rows]
+        alerts = pd.DataFrame({
+            "fired_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)),
+            "rule": [r.name for r in rules],
+            "ticker": picked["ticker"].to_numpy(),
+            "message": [r.message for r in rules],
+        })
+        for col in ("LKH_Score", "price", "Margin_of_Safety"):
+            values = picked[col].to_numpy(dtype=np.float64) if col in picked else np.full(len(rows), np.nan)
+            alerts[col] = np.where(np.isnan(values), None, values)
+        return alerts[ALERT_COLUMNS]
+
+    def reset(self, rule: str = None):
+        """Hapus status dedup/cooldown untuk satu aturan, atau semua jika None"""
+        with self._lock, self._state_lock():
+            self._sync_state()
+            for name in self._active if rule is None else [rule]:
+                self._active[name][:] = False
+                self._last_fired[name][:] = -np.inf
+            self._save_state()
+
+
+class FileSink:
+    """Menambahkan setiap alert sebagai satu baris JSON ke file lokal"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, alerts: list):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for alert in alerts:
+                f.write(json.dumps(alert) + "\n")
+
+
+class WebhookSink:
+    """
+    Mengirim alert sebagai POST JSON {"alerts": [...]} ke sebuah URL
+
+    Stub minimal tanpa retry; tanpa URL, payload hanya disimpan di `sent`
+    (berguna untuk uji coba dan mode offline).
+    """
+
+    def __init__(self, url: str = None, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self.sent = []
+
+    def __call__(self, alerts: list):
+        payload = json.dumps({"alerts": alerts}).encode("utf-8")
+        if not self.url:
+            self.sent.append(payload)
+            return
+        request = urllib.request.Request(
+            self.url, data=payload, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+DEFAULT_ALERTS_DIR = os.path.join(os.path.expanduser("~"), ".cache", "screener")
+
+_alert_engine = None
+_alert_engine_lock = threading.Lock()
+
+
+def get_alert_engine(params: dict = None) -> AlertEngine:
+    """
+    AlertEngine bersama untuk proses ini dengan default_alert_rules()
+
+    Alert ditulis ke SCREENER_ALERTS_FILE (default alerts.jsonl di
+    DEFAULT_ALERTS_DIR) dan, jika SCREENER_ALERT_WEBHOOK diisi, dikirim ke URL
+    tersebut. Status dedup/cooldown dan parameter disimpan di alert_state.json,
+    dibagi dengan proses lain yang memakai direktori yang sama.
+
+    Parameters:
+    params (dict): Optional; parameter kondisi untuk pembuatan pertama (di atas
+        DEFAULT_ALERT_PARAMS; nilai yang sudah tersimpan tetap dipakai)
+    """
+    global _alert_engine
+    with _alert_engine_lock:
+        if _alert_engine is None:
+            sinks = [FileSink(os.environ.get("SCREENER_ALERTS_FILE", os.path.join(DEFAULT_ALERTS_DIR, "alerts.jsonl")))]
+            webhook = os.environ.get("SCREENER_ALERT_WEBHOOK")
+            if webhook:
+                sinks.append(WebhookSink(webhook))
+            _alert_engine = AlertEngine(
+                default_alert_rules(), params={**DEFAULT_ALERT_PARAMS, **(params or {})}, sinks=sinks,
+                state_path=os.path.join(DEFAULT_ALERTS_DIR, "alert_state.json")
+            )
+        return _alert_engine
@@ -0,0 +1,338 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from analysis.lkh_screener import LKH_INPUT_COLUMNS, DEFAULT_LKH_RULES, score_lkh_arrays, lkh_rules_from_thresholds
+from analysis.dcf_valuation import calculate_dcf_array
+
+# Snapshot dari yfinance dianggap tersedia mulai tengah malam WIB setelah
+# tanggal rebalance (data sore hari masih bisa dipakai untuk rebalance hari itu)
+_WIB_OFFSET = 7 * 3600
+
+# Kolom yang nilainya berbanding lurus dengan harga dan diskalakan ulang ke harga
+# pada tanggal rebalance (lihat apply_quote di data.fetch_data)
+_PRICE_SCALED = ("PER", "PBV", "market_cap")
+
+# Field snapshot yang dibaca selain LKH_INPUT_COLUMNS
+_SNAPSHOT_EXTRA = ("FCF", "market_cap", "price")
+
+PERIODS_PER_YEAR = {"M": 12, "Q": 4}
+
+
+def rebalance_rows(dates: np.ndarray, freq: str = "M") -> np.ndarray:
+    """
+    Posisi hari bursa terakhir setiap bulan ("M") atau kuartal ("Q")
+
+    Parameters:
+    dates (np.ndarray): Hari bursa datetime64[D], urut naik
+
+    Returns:
+    np.ndarray: Indeks baris ke dalam dates
+    """
+    if freq not in PERIODS_PER_YEAR:
+        raise ValueError("freq harus 'M' atau 'Q'")
+    if len(dates) == 0:
+        return np.empty(0, dtype=np.intp)
+    period = dates.astype("datetime64[M]").astype(np.int64)
+    if freq == "Q":
+        period = period // 3
+    last_of_period = np.append(period[1:] != period[:-1], True)
+    return np.flatnonzero(last_of_period)
+
+
+class BacktestPanel:
+    """
+    Data point-in-time per tanggal rebalance, semua berbentuk (tanggal, saham)
+
+    Parameters:
+    dates (array_like): Tanggal rebalance (datetime64[D]), urut naik
+    tickers (list): Kode saham, satu per kolom
+    fundamentals (dict): {kolom LKH_INPUT_COLUMNS: array (tanggal, saham)} yang
+        diketahui pada tanggal tersebut; NaN jika belum ada snapshot
+    prices (np.ndarray): Harga penutupan pada tanggal rebalance
+    freq (str): "M" atau "Q", untuk menyetahunkan hasil
+    fcf (np.ndarray): Optional; FCF untuk valuasi DCF (sudah dengan fallback
+        5% market cap), NaN jika tidak ada
+    """
+
+    def __init__(self, dates, tickers, fundamentals: dict, prices: np.ndarray, freq: str = "M",
+                 fcf: np.ndarray = None):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.tickers = list(tickers)
+        shape = (len(self.dates), len(self.tickers))
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.fundamentals = {c: np.asarray(fundamentals[c], dtype=np.float64) for c in LKH_INPUT_COLUMNS}
+        self.fcf = np.full(shape, np.nan) if fcf is None else np.asarray(fcf, dtype=np.float64)
+        for name, values in [("prices", self.prices), ("fcf", self.fcf), *self.fundamentals.items()]:
+            if values.shape != shape:
+                raise ValueError(f"{name} harus berbentuk {shape}")
+        self.freq = freq
+        with np.errstate(divide="ignore", invalid="ignore"):
+            forward = self.prices[1:] / self.prices[:-1] - 1
+        # Return dari tanggal ini ke tanggal rebalance berikutnya (baris terakhir NaN)
+        self.forward_returns = np.vstack([forward, np.full((1, shape[1]), np.nan)])
+
+    @property
+    def shape(self) -> tuple:
+        return self.prices.shape
+
+    @classmethod
+    def from_stores(
+        cls,
+        snapshots,
+        price_store,
+        start=None,
+        end=None,
+        freq: str = "M",
+        tickers: list = None,
+        max_snapshot_age_days: float = 400,
+        rescale_ratios: bool = True
+    ) -> "BacktestPanel":
+        """
+        Bangun panel dari FundamentalsStore dan PriceHistoryStore
+
+        Untuk setiap tanggal rebalance dipakai snapshot terbaru yang sudah
+        tersedia pada tanggal itu (tanpa look-ahead) dan tidak lebih tua dari
+        max_snapshot_age_days. Dengan rescale_ratios, PER, PBV dan market cap
+        snapshot diskalakan dengan harga rebalance / harga snapshot. FCF yang
+        tidak positif diganti 5% market cap, sama seperti screen_universe.
+
+        Parameters:
+        snapshots (FundamentalsStore): Riwayat snapshot fundamental
+        price_store (PriceHistoryStore): Riwayat harga harian
+        start, end (str or date): Optional; batas tanggal rebalance
+        freq (str): "M" (bulanan) atau "Q" (kuartalan)
+        tickers (list): Optional; default semua saham di price_store
+        max_snapshot_age_days (float): Umur maksimum snapshot yang masih dipakai
+        rescale_ratios (bool): Skalakan PER/PBV ke harga pada tanggal rebalance
+        """
+        all_dates = price_store.dates
+        rows = rebalance_rows(all_dates, freq)
+        keep = np.ones(len(rows), dtype=bool)
+        if start is not None:
+            keep &= all_dates[rows] >= np.datetime64(pd.Timestamp(start).date(), "D")
+        if end is not None:
+            keep &= all_dates[rows] <= np.datetime64(pd.Timestamp(end).date(), "D")
+        rows = rows[keep]
+        dates = all_dates[rows]
+
+        tickers = list(dict.fromkeys(tickers or price_store.tickers))
+        position = {t: i for i, t in enumerate(price_store.tickers)}
+        tickers = [t for t in tickers if t in position]
+        columns = np.array([position[t] for t in tickers], dtype=np.intp)
+
+        # Harga rebalance = penutupan terakhir yang tersedia (maks. 5 hari bursa ke belakang)
+        close = pd.DataFrame(np.asarray(price_store.field("close")[:, columns]))
+        prices = close.ffill(limit=5).to_numpy()[rows] if len(rows) else np.empty((0, len(tickers)))
+
+        fields = _point_in_time(snapshots, tickers, dates, max_snapshot_age_days * 86400)
+        if rescale_ratios:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.where(fields["price"] > 0, prices / fields["price"], np.nan)
+            for c in _PRICE_SCALED:
+                fields[c] = fields[c] * ratio
+        fcf = np.where(fields["FCF"] > 0, fields["FCF"], fields["market_cap"] * 0.05)
+        return cls(dates, tickers, fields, prices, freq, fcf=fcf)
+
+
+def _point_in_time(snapshots, tickers: list, dates: np.ndarray, max_age: float) -> dict:
+    """Field snapshot terbaru yang sudah tersedia per (tanggal, saham)"""
+    names = [*LKH_INPUT_COLUMNS, *_SNAPSHOT_EXTRA]
+    fields = {c: np.full((len(dates), len(tickers)), np.nan) for c in names}
+
+    cutoffs = (dates + np.timedelta64(1, "D")).astype("datetime64[s]").astype(np.float64) - _WIB_OFFSET
+    column = {t: i for i, t in enumerate(tickers)}
+    for k, cutoff in enumerate(cutoffs):
+        hits = snapshots.as_of(tickers, until=cutoff, since=cutoff - max_age)
+        if not hits:
+            continue
+        cols = np.array([column[t] for t in hits], dtype=np.intp)
+        values = np.array(
+            [[_as_float(data.get(c)) for c in names] for data, _ in hits.values()], dtype=np.float64
+        )
+        for i, c in enumerate(names):
+            fields[c][k, cols] = values[:, i]
+    return fields
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def run_backtest(panel: BacktestPanel, rules=None, top_n: int = 20, min_score: float = 0,
+                 dcf: tuple = None, min_margin: float = None) -> dict:
+    """
+    Backtest portofolio top-N skor LKH dengan bobot sama
+
+    Pada setiap tanggal rebalance, saham dengan harga dan snapshot fundamental
+    diberi skor, lalu top_n skor tertinggi (minimal min_score) dibeli dan
+    ditahan sampai tanggal rebalance berikutnya. Benchmark adalah rata-rata
+    bobot sama seluruh saham yang punya harga pada tanggal itu. Saham yang
+    tidak punya harga pada periode berikutnya dikeluarkan dari rata-rata.
+
+    Dengan asumsi dcf, margin of safety dihitung dari panel.fcf dan dipakai
+    seperti tabel screening: pemecah skor yang sama, dan dengan min_margin
+    juga syarat minimum.
+
+    Parameters:
+    panel (BacktestPanel): Data point-in-time
+    rules (LKHRules): Optional; aturan skoring, default DEFAULT_LKH_RULES
+    top_n (int): Jumlah saham dalam portofolio
+    min_score (float): Skor minimum agar saham boleh dibeli
+    dcf (tuple): Optional; (growth_rate, discount_rate, terminal_growth, years)
+    min_margin (float): Optional; margin of safety minimum (%), butuh dcf
+
+    Returns:
+    dict: {
+        "periods": pd.DataFrame per tanggal rebalance (portfolio_return,
+            benchmark_return, excess_return, hit_rate, turnover, n_holdings, ic),
+        "summary": dict metrik agregat,
+        "holdings": {tanggal: [ticker, ...]}
+    }
+    """
+    rules = rules or DEFAULT_LKH_RULES
+    scores = score_lkh_arrays(panel.fundamentals, rules)
+    prices = panel.prices
+    returns = panel.forward_returns
+
+    has_snapshot = ~np.isnan(panel.fundamentals["ROE"]) | ~np.isnan(panel.fundamentals["PER"])
+    eligible = (prices > 0) & has_snapshot & (scores >= min_score)
+
+    key = np.where(eligible, scores, -np.inf)
+    if dcf is not None:
+        growth_rate, discount_rate, terminal_growth, years = dcf
+        dcf_values, _ = calculate_dcf_array(panel.fcf, growth_rate, discount_rate, terminal_growth, years)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            margin = np.where(prices > 0, (dcf_values - prices) / prices * 100, np.nan)
+        if min_margin is not None:
+            eligible &= margin >= min_margin
+            key = np.where(eligible, key, -np.inf)
+        # Skor turun lalu margin turun (tanpa margin paling akhir); kunci terakhir = utama
+        top = np.lexsort((np.nan_to_num(-margin, nan=np.inf), -key), axis=1)[:, :top_n]
+    else:
+        # Urutkan skor turun; argsort stabil sehingga skor sama dipecah menurut urutan kolom
+        top = np.argsort(-key, axis=1, kind="stable")[:, :top_n]
+    selected = np.zeros(panel.shape, dtype=bool)
+    np.put_along_axis(selected, top, True, axis=1)
+    selected &= eligible
+
+    held = selected & ~np.isnan(returns)
+    n_held = held.sum(axis=1)
+    universe = (prices > 0) & ~np.isnan(returns)
+    n_universe = universe.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        portfolio = np.where(held, returns, 0).sum(axis=1) / n_held
+        benchmark = np.where(universe, returns, 0).sum(axis=1) / n_universe
+        hits = (held & (returns > benchmark[:, None])).sum(axis=1)
+        hit_rate = hits / n_held
+
+        n_selected = selected.sum(axis=1)
+        kept = (selected[1:] & selected[:-1]).sum(axis=1)
+        turnover = np.concatenate([[np.nan], 1 - kept / n_selected[1:]])
+
+    ic = _rank_ic(scores, returns, eligible & ~np.isnan(returns))
+
+    periods = pd.DataFrame({
+        "portfolio_return": portfolio,
+        "benchmark_return": benchmark,
+        "excess_return": portfolio - benchmark,
+        "hit_rate": hit_rate,
+        "turnover": turnover,
+        "n_holdings": n_selected,
+        "ic": ic,
+    }, index=pd.DatetimeIndex(panel.dates, name="date"))
+
+    holdings = {
+        pd.Timestamp(d): [panel.tickers[j] for j in np.flatnonzero(row)]
+        for d, row in zip(panel.dates, selected)
+    }
+    return {
+        "periods": periods,
+        "summary": _summarize(periods, hits, n_held, PERIODS_PER_YEAR[panel.freq]),
+        "holdings": holdings,
+    }
+
+
+def _rank_ic(scores: np.ndarray, returns: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Korelasi Spearman skor vs return berikutnya per tanggal"""
+    a = pd.DataFrame(np.where(mask, scores, np.nan)).rank(axis=1).to_numpy()
+    b = pd.DataFrame(np.where(mask, returns, np.nan)).rank(axis=1).to_numpy()
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        # Tanggal tanpa saham valid menghasilkan "Mean of empty slice"
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        a = a - np.nanmean(a, axis=1, keepdims=True)
+        b = b - np.nanmean(b, axis=1, keepdims=True)
+        ic = np.nansum(a * b, axis=1) / np.sqrt(np.nansum(a * a, axis=1) * np.nansum(b * b, axis=1))
+    ic[mask.sum(axis=1) < 3] = np.nan
+    return ic
+
+
+def _summarize(periods: pd.DataFrame, hits: np.ndarray, n_held: np.ndarray, per_year: int) -> dict:
+    valid = periods["portfolio_return"].notna() & periods["benchmark_return"].notna()
+    port = periods.loc[valid, "portfolio_return"].to_numpy()
+    bench = periods.loc[valid, "benchmark_return"].to_numpy()
+    n = len(port)
+    if n == 0:
+        return {"periods": 0}
+
+    growth = np.cumprod(1 + port)
+    bench_growth = np.cumprod(1 + bench)
+    drawdown = growth / np.maximum.accumulate(growth) - 1
+    years = n / per_year
+    vol = port.std(ddof=1) * np.sqrt(per_year) if n > 1 else np.nan
+    return {
+        "periods": n,
+        "total_return": float(growth[-1] - 1),
+        "benchmark_total_return": float(bench_growth[-1] - 1),
+        "cagr": float(growth[-1] ** (1 / years) - 1),
+        "benchmark_cagr": float(bench_growth[-1] ** (1 / years) - 1),
+        "volatility": float(vol),
+        "sharpe": float(port.mean() * per_year / vol) if vol else np.nan,
+        "max_drawdown": float(drawdown.min()),
+        "mean_excess_return": float((port - bench).mean()),
+        "hit_rate": float(hits[valid.to_numpy()].sum() / n_held[valid.to_numpy()].sum()),
+        "win_rate": float((port > bench).mean()),
+        "mean_turnover": float(periods["turnover"].mean()),
+        "mean_ic": float(periods.loc[valid, "ic"].mean()),
+    }
+
+
+def rules_grid(per_thresholds, roe_thresholds, base=DEFAULT_LKH_RULES) -> list:
+    """Semua kombinasi batas PER x ROE sebagai LKHRules (lihat lkh_rules_from_thresholds)"""
+    return [
+        lkh_rules_from_thresholds(per, roe, base)
+        for per in per_thresholds
+        for roe in roe_thresholds
+    ]
+
+
+def sweep_rules(panel: BacktestPanel, rules_list: list, top_n: int = 20, min_score: float = 0,
+                max_workers: int = None) -> pd.DataFrame:
+    """
+    Jalankan backtest untuk banyak aturan sekaligus di beberapa proses
+
+    Bentuk ringkas dari analysis.sweep.run_sweep untuk aturan LKH saja:
+    asumsi DCF default hanya memecah skor yang sama, dan urutan baris sama
+    dengan rules_list.
+
+    Parameters:
+    panel (BacktestPanel): Data point-in-time
+    rules_list (list): Daftar LKHRules (misal dari rules_grid)
+    top_n (int): Jumlah saham dalam portofolio
+    min_score (float): Skor minimum agar saham boleh dibeli
+    max_workers (int): Optional; jumlah proses, default jumlah CPU. 1 = tanpa proses tambahan
+
+    Returns:
+    pd.DataFrame: Satu baris per aturan: pita PER/ROE, fingerprint, dan metrik summary
+    """
+    from analysis.sweep import SweepConfig, run_sweep
+
+    configs = [SweepConfig(rules=rules, top_n=top_n, min_score=min_score) for rules in rules_list]
+    df = run_sweep(panel, configs, max_workers=max_workers, ranked=False)
+    return df.drop(columns=[
+        "weights", "growth_rate", "discount_rate", "terminal_growth", "years", "min_margin", "top_n", "min_score"
+    ])
@@ -1,3 +1,7 @@
+import numpy as np
+import pandas as pd
+
+
 def calculate_dcf(
     fcf: float,
     growth_rate: float,
@@ -69,6 +73,9 @@ def dcf_sensitivity_analysis(
     Analisis sensitivitas DCF dengan multiple scenario
     Mengembalikan matriks sensitivitas growth rate vs discount rate
 
+    Dipertahankan untuk kompatibilitas; gunakan dcf_sensitivity_grid untuk
+    grid dengan resolusi bebas.
+
     Parameters:
     base_fcf (float): Free Cash Flow dasar
     base_growth (float): Tingkat pertumbuhan dasar
@@ -82,19 +89,378 @@ def dcf_sensitivity_analysis(
     # Define scenario ranges
     growth_rates = [base_growth * 0.7, base_growth, base_growth * 1.3]
     discount_rates = [base_discount * 0.9, base_discount, base_discount * 1.1]
-    
+    # Pastikan diskonto > terminal growth
+    adjusted_drs = [max(dr, base_terminal + 0.01) for dr in discount_rates]
+
+    if base_fcf <= 0:
+        raise ValueError("Free Cash Flow harus positif")
+    grid = dcf_sensitivity_grid(base_fcf, growth_rates, adjusted_drs, base_terminal, years)
+
     results = {}
-    for i, gr in enumerate(growth_rates):
-        for j, dr in enumerate(discount_rates):
-            # Pastikan diskonto > terminal growth
-            adjusted_dr = max(dr, base_terminal + 0.01)
-            value = calculate_dcf(
-                fcf=base_fcf,
-                growth_rate=gr,
-                discount_rate=adjusted_dr,
-                terminal_growth=base_terminal,
-                years=years
-            )
-            results[f"Scenario_G{i+1}_DR{j+1}"] = round(value, 2)
-    
+    for i in range(len(growth_rates)):
+        for j in range(len(discount_rates)):
+            results[f"Scenario_G{i+1}_DR{j+1}"] = round(float(grid.iat[i, j]), 2)
+
     return results
+
+
+def sensitivity_axis(base: float, low: float, high: float, steps: int) -> np.ndarray:
+    """
+    Membuat sumbu skenario dari base * low sampai base * high
+
+    Dengan steps=3 hasilnya [base*low, base, base*high] jika low dan high
+    simetris terhadap 1, sama seperti skenario 3x3 lama.
+    """
+    if steps < 2:
+        return np.array([base], dtype=np.float64)
+    return np.linspace(base * low, base * high, steps)
+
+
+def dcf_sensitivity_grid(
+    base_fcf: float,
+    growth_rates,
+    discount_rates,
+    terminal_growths=None,
+    years: int = 5
+) -> pd.DataFrame:
+    """
+    Grid sensitivitas DCF dengan resolusi bebas, dihitung sekaligus via broadcasting
+
+    Parameters:
+    base_fcf (float): Free Cash Flow dasar
+    growth_rates (array_like): Sumbu tingkat pertumbuhan (desimal)
+    discount_rates (array_like): Sumbu tingkat diskonto (desimal)
+    terminal_growths (float or array_like): Pertumbuhan terminal; skalar untuk grid
+        2-D, atau array untuk kubus 3-D
+    years (int): Jumlah tahun proyeksi
+
+    Returns:
+    pd.DataFrame: Nilai intrinsik dengan index growth_rate dan kolom discount_rate.
+        Jika terminal_growths berupa array, index menjadi MultiIndex
+        (terminal_growth, growth_rate). Sel dengan discount <= terminal bernilai NaN.
+    """
+    growth_axis = np.atleast_1d(np.asarray(growth_rates, dtype=np.float64))
+    discount_axis = np.atleast_1d(np.asarray(discount_rates, dtype=np.float64))
+    if terminal_growths is None:
+        terminal_growths = 0.03
+
+    if np.ndim(terminal_growths) == 0:
+        values, _ = calculate_dcf_array(
+            base_fcf,
+            growth_axis[:, None],
+            discount_axis[None, :],
+            float(terminal_growths),
+            years
+        )
+        return pd.DataFrame(
+            values,
+            index=pd.Index(growth_axis, name="growth_rate"),
+            columns=pd.Index(discount_axis, name="discount_rate")
+        )
+
+    terminal_axis = np.asarray(terminal_growths, dtype=np.float64)
+    values, _ = calculate_dcf_array(
+        base_fcf,
+        growth_axis[None, :, None],
+        discount_axis[None, None, :],
+        terminal_axis[:, None, None],
+        years
+    )
+    index = pd.MultiIndex.from_product(
+        [terminal_axis, growth_axis], names=["terminal_growth", "growth_rate"]
+    )
+    return pd.DataFrame(
+        values.reshape(len(terminal_axis) * len(growth_axis), len(discount_axis)),
+        index=index,
+        columns=pd.Index(discount_axis, name="discount_rate")
+    )
+
+
+def calculate_dcf_array(
+    fcf,
+    growth_rate,
+    discount_rate,
+    terminal_growth,
+    years: int = 5
+):
+    """
+    Versi vektor dari calculate_dcf untuk banyak saham dan skenario sekaligus
+
+    fcf, growth_rate, discount_rate dan terminal_growth boleh berupa skalar atau
+    array yang bisa di-broadcast satu sama lain (misal fcf berbentuk (N, 1) dan
+    discount_rate berbentuk (1, M) menghasilkan grid N x M). Validasi sama dengan
+    calculate_dcf, tetapi elemen yang tidak valid tidak menimbulkan error:
+    nilainya NaN dan ditandai pada mask.
+
+    Parameters:
+    fcf (array_like): Free Cash Flow tahun terakhir
+    growth_rate (array_like): Tingkat pertumbuhan tahunan (desimal)
+    discount_rate (array_like): Tingkat diskonto (desimal)
+    terminal_growth (array_like): Pertumbuhan terminal (desimal)
+    years (int): Jumlah tahun proyeksi eksplisit (sama untuk semua elemen)
+
+    Returns:
+    tuple: (values, masks)
+        values (np.ndarray): Nilai intrinsik, NaN untuk elemen tidak valid
+        masks (dict): Mask boolean per aturan validasi:
+            "invalid_discount" (discount_rate <= terminal_growth),
+            "invalid_fcf" (fcf <= 0), dan "valid" (lolos semua validasi)
+    """
+    if years <= 0:
+        raise ValueError("Years harus lebih besar dari 0")
+
+    fcf, growth_rate, discount_rate, terminal_growth = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (fcf, growth_rate, discount_rate, terminal_growth))
+    )
+
+    # NaN pada input juga dianggap tidak valid (perbandingan dengan NaN bernilai False)
+    invalid_discount = ~(discount_rate > terminal_growth)
+    invalid_fcf = ~(fcf > 0)
+    valid = ~(invalid_discount | invalid_fcf)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        growth_factor = 1 + growth_rate
+        discount_base = 1 + discount_rate
+
+        # Loop hanya sepanjang tahun proyeksi; setiap langkah adalah operasi array
+        # dengan urutan yang sama seperti calculate_dcf
+        total = np.zeros(fcf.shape)
+        for i in range(1, years + 1):
+            total = total + (fcf * growth_factor ** i) / discount_base ** i
+
+        final_year_fcf = fcf * growth_factor ** years
+        terminal_value = (final_year_fcf * (1 + terminal_growth)) / (discount_rate - terminal_growth)
+        values = total + terminal_value / discount_base ** years
+
+    values = np.where(valid, values, np.nan)
+    masks = {
+        "invalid_discount": invalid_discount,
+        "invalid_fcf": invalid_fcf,
+        "valid": valid
+    }
+    return values, masks
+
+
+def _sample_distribution(rng, spec, size):
+    """
+    Mengambil sampel dari spesifikasi distribusi
+
+    spec boleh berupa angka (nilai tetap) atau dict dengan kunci "dist":
+    - {"dist": "normal", "mean": m, "std": s}
+    - {"dist": "uniform", "low": a, "high": b}
+    - {"dist": "triangular", "low": a, "mode": c, "high": b}
+    - {"dist": "lognormal", "mean": m, "sigma": s}  (parameter log-space)
+    """
+    if not isinstance(spec, dict):
+        return np.full(size, float(spec))
+
+    dist = spec.get("dist", "normal")
+    if dist == "normal":
+        return rng.normal(spec["mean"], spec["std"], size)
+    if dist == "uniform":
+        return rng.uniform(spec["low"], spec["high"], size)
+    if dist == "triangular":
+        return rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+    if dist == "lognormal":
+        return rng.lognormal(spec["mean"], spec["sigma"], size)
+    raise ValueError(f"Distribusi tidak dikenal: {dist}")
+
+
+def dcf_monte_carlo(
+    fcf: float,
+    growth,
+    discount,
+    terminal,
+    years: int = 5,
+    n_paths: int = 100_000,
+    current_price: float = None,
+    seed: int = None,
+    chunk_size: int = 50_000,
+    percentiles: tuple = (5, 10, 25, 50, 75, 90, 95),
+    bins: int = 60
+) -> dict:
+    """
+    Valuasi DCF Monte Carlo: growth, discount dan terminal growth diambil dari distribusi
+
+    Jalur dievaluasi per batch berukuran chunk_size dengan calculate_dcf_array
+    sehingga memori sementara tetap terbatas. Jalur dengan discount <= terminal
+    growth dibuang dan dihitung sebagai tidak valid. Setiap input diambil dari
+    aliran RNG sendiri (turunan seed), sehingga hasil untuk seed yang sama tidak
+    bergantung pada chunk_size.
+
+    Parameters:
+    fcf (float): Free Cash Flow tahun terakhir
+    growth: Distribusi pertumbuhan (angka atau dict, lihat _sample_distribution)
+    discount: Distribusi tingkat diskonto
+    terminal: Distribusi pertumbuhan terminal
+    years (int): Jumlah tahun proyeksi
+    n_paths (int): Jumlah simulasi
+    current_price (float): Optional; harga saat ini untuk probabilitas undervalued
+    seed (int): Optional; seed RNG agar hasil bisa direproduksi
+    chunk_size (int): Jumlah jalur per batch
+    percentiles (tuple): Persentil yang dilaporkan
+    bins (int): Jumlah bin histogram
+
+    Returns:
+    dict: {
+        "n_paths", "n_valid", "mean", "std",
+        "percentiles": {p: nilai},
+        "prob_undervalued": P(nilai > harga) atau None,
+        "histogram": {"counts": array, "edges": array}; ekor di luar persentil
+            0.5-99.5 dihitung di bin paling tepi
+    }
+    """
+    if fcf <= 0:
+        raise ValueError("Free Cash Flow harus positif")
+    if n_paths <= 0:
+        raise ValueError("n_paths harus lebih besar dari 0")
+
+    # Satu aliran per input: urutan sampel tidak bergeser saat ukuran batch berubah
+    rng_growth, rng_discount, rng_terminal = (
+        np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(3)
+    )
+    values = np.empty(n_paths, dtype=np.float64)
+    n_valid = 0
+
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+        g = _sample_distribution(rng_growth, growth, size)
+        d = _sample_distribution(rng_discount, discount, size)
+        t = _sample_distribution(rng_terminal, terminal, size)
+        chunk_values, masks = calculate_dcf_array(fcf, g, d, t, years)
+        chunk_values = chunk_values[masks["valid"] & np.isfinite(chunk_values)]
+        values[n_valid:n_valid + len(chunk_values)] = chunk_values
+        n_valid += len(chunk_values)
+
+    values = values[:n_valid]
+    result = {
+        "n_paths": n_paths,
+        "n_valid": n_valid,
+        "mean": None,
+        "std": None,
+        "percentiles": {p: None for p in percentiles},
+        "prob_undervalued": None,
+        "histogram": {"counts": np.zeros(0, dtype=np.int64), "edges": np.zeros(0)}
+    }
+    if n_valid == 0:
+        return result
+
+    pct_values = np.percentile(values, percentiles)
+    result["mean"] = float(values.mean())
+    result["std"] = float(values.std())
+    result["percentiles"] = {p: float(v) for p, v in zip(percentiles, pct_values)}
+    if current_price is not None:
+        result["prob_undervalued"] = float(np.count_nonzero(values > current_price) / n_valid)
+
+    # Rentang histogram dipotong di persentil 0.5-99.5 agar ekor panjang tidak
+    # meratakan grafik; nilai di luar rentang masuk ke bin paling tepi sehingga
+    # jumlah counts tetap sama dengan n_valid
+    low, high = np.percentile(values, (0.5, 99.5))
+    if high > low:
+        counts, edges = np.histogram(np.clip(values, low, high), bins=bins, range=(low, high))
+    else:
+        counts, edges = np.histogram(values, bins=bins)
+    result["histogram"] = {"counts": counts, "edges": edges}
+    return result
+
+
+def growth_fade_schedule(
+    initial_growth,
+    terminal_growth,
+    high_growth_years: int,
+    fade_years: int,
+    method: str = "linear",
+    fade_rate: float = 3.0
+) -> np.ndarray:
+    """
+    Membuat matriks pertumbuhan per tahun untuk model DCF tiga tahap
+
+    Tahap 1: pertumbuhan tetap initial_growth selama high_growth_years.
+    Tahap 2: pertumbuhan memudar ke terminal_growth selama fade_years
+             (tahun terakhir fade tepat sama dengan terminal_growth).
+    Tahap 3: terminal value (dihitung oleh calculate_dcf_multistage).
+
+    Parameters:
+    initial_growth (array_like): Pertumbuhan awal per saham, bentuk (N,) atau skalar
+    terminal_growth (array_like): Pertumbuhan terminal per saham, bentuk (N,) atau skalar
+    high_growth_years (int): Jumlah tahun tahap pertumbuhan tinggi
+    fade_years (int): Jumlah tahun tahap fade
+    method (str): "linear" atau "exponential"
+    fade_rate (float): Kecepatan peluruhan untuk method="exponential"
+
+    Returns:
+    np.ndarray: Bentuk (N, high_growth_years + fade_years), atau (tahun,) jika input skalar
+    """
+    if high_growth_years < 0 or fade_years < 0 or high_growth_years + fade_years == 0:
+        raise ValueError("Jumlah tahun proyeksi harus lebih besar dari 0")
+
+    initial = np.asarray(initial_growth, dtype=np.float64)
+    terminal = np.asarray(terminal_growth, dtype=np.float64)
+    scalar_input = initial.ndim == 0 and terminal.ndim == 0
+    initial, terminal = np.broadcast_arrays(np.atleast_1d(initial), np.atleast_1d(terminal))
+
+    # Bobot 1 = initial_growth, bobot 0 = terminal_growth
+    k = np.arange(1, fade_years + 1, dtype=np.float64)
+    if method == "linear":
+        fade_weights = 1 - k / max(fade_years, 1)
+    elif method == "exponential":
+        floor = np.exp(-fade_rate)
+        fade_weights = (np.exp(-fade_rate * k / max(fade_years, 1)) - floor) / (1 - floor)
+    else:
+        raise ValueError(f"Metode fade tidak dikenal: {method}")
+
+    weights = np.concatenate([np.ones(high_growth_years), fade_weights])
+    schedule = terminal[:, None] + (initial - terminal)[:, None] * weights[None, :]
+    return schedule[0] if scalar_input else schedule
+
+
+def calculate_dcf_multistage(fcf, growth_matrix, discount_rate, terminal_growth):
+    """
+    DCF dengan pertumbuhan berbeda per tahun untuk banyak saham dalam satu langkah vektor
+
+    FCF proyeksi dihitung dengan produk kumulatif (1 + g) di sepanjang sumbu tahun,
+    jadi tidak ada loop Python per saham maupun per tahun.
+
+    Parameters:
+    fcf (array_like): FCF tahun terakhir, bentuk (N,) atau skalar
+    growth_matrix (array_like): Pertumbuhan per tahun, bentuk (N, tahun) atau (tahun,)
+        untuk jalur yang sama bagi semua saham
+    discount_rate (array_like): Tingkat diskonto, bentuk (N,) atau skalar
+    terminal_growth (array_like): Pertumbuhan terminal, bentuk (N,) atau skalar
+
+    Returns:
+    tuple: (values, masks) dengan semantik yang sama seperti calculate_dcf_array
+    """
+    growth = np.atleast_2d(np.asarray(growth_matrix, dtype=np.float64))
+    years = growth.shape[1]
+    if years == 0:
+        raise ValueError("Years harus lebih besar dari 0")
+
+    fcf, discount_rate, terminal_growth = (
+        np.asarray(x, dtype=np.float64) for x in (fcf, discount_rate, terminal_growth)
+    )
+    n = np.broadcast_shapes(fcf.shape, discount_rate.shape, terminal_growth.shape, growth.shape[:1])
+    fcf, discount_rate, terminal_growth = (
+        np.broadcast_to(x, n) for x in (fcf, discount_rate, terminal_growth)
+    )
+    growth = np.broadcast_to(growth, n + (years,))
+
+    invalid_discount = ~(discount_rate > terminal_growth)
+    invalid_fcf = ~(fcf > 0)
+    valid = ~(invalid_discount | invalid_fcf)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        projected_fcf = fcf[:, None] * np.cumprod(1 + growth, axis=1)
+        discount_factors = (1 + discount_rate)[:, None] ** np.arange(1, years + 1)
+        discounted = (projected_fcf / discount_factors).sum(axis=1)
+
+        terminal_value = (projected_fcf[:, -1] * (1 + terminal_growth)) / (discount_rate - terminal_growth)
+        values = discounted + terminal_value / discount_factors[:, -1]
+
+    values = np.where(valid, values, np.nan)
+    masks = {
+        "invalid_discount": invalid_discount,
+        "invalid_fcf": invalid_fcf,
+        "valid": valid
+    }
+    return values, masks
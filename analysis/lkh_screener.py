@@ -1,84 +1,298 @@
-def screen_stock_lkh(data):
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+LKH_INPUT_COLUMNS = ["PER", "PBV", "ROE", "DER", "EPS_Growth"]
+
+
+@dataclass(frozen=True)
+class LKHRules:
+    """
+    Aturan skoring LKH yang sudah dikompilasi: batas pita, poin, dan bobot
+
+    Objek ini immutable dan hashable sehingga bisa dipakai sebagai kunci cache.
+    Setiap metrik punya 3 pita yang dicek berurutan (pertama yang cocok menang):
+    - PER: nilai <= batas      - PBV: nilai < batas
+    - ROE: nilai >= batas      - EPS_Growth: nilai >= batas
+    - DER: nilai < batas
+    Nilai default sama persis dengan kriteria LKH asli.
+    """
+    per_bands: tuple = (8, 12, 15)
+    per_points: tuple = (50, 30, 10)
+    pbv_bands: tuple = (0.8, 1.2, 2)
+    pbv_points: tuple = (50, 30, 10)
+    roe_bands: tuple = (20, 15, 10)
+    roe_points: tuple = (100, 80, 40)
+    eps_bands: tuple = (15, 10, 5)
+    eps_points: tuple = (100, 70, 40)
+    der_bands: tuple = (0.3, 0.8, 1)
+    der_points: tuple = (100, 80, 30)
+    # Bobot: valuasi, profitabilitas, pertumbuhan, kesehatan keuangan
+    weights: tuple = (0.3, 0.3, 0.2, 0.2)
+    # Skor minimum jika PER/PBV/ROE/DER tidak lengkap
+    incomplete_min_score: float = 30
+
+    def __post_init__(self):
+        for name in ("per", "pbv", "roe", "eps", "der"):
+            bands = getattr(self, f"{name}_bands")
+            points = getattr(self, f"{name}_points")
+            if len(bands) != 3 or len(points) != 3:
+                raise ValueError(f"{name}: harus memiliki tepat 3 pita dan 3 poin")
+        if len(self.weights) != 4:
+            raise ValueError("weights harus berisi 4 bobot")
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash stabil (lintas proses) dari seluruh aturan"""
+        return hashlib.sha1(repr(self).encode("utf-8")).hexdigest()[:16]
+
+
+DEFAULT_LKH_RULES = LKHRules()
+
+
+def lkh_rules_from_thresholds(per_threshold: float, roe_threshold: float,
+                              base: LKHRules = DEFAULT_LKH_RULES) -> LKHRules:
+    """
+    Membangun aturan LKH dari slider sidebar
+
+    Pita PER diskalakan dari batas maksimum PER (12 -> 8/12/15) dan pita ROE
+    digeser dari batas minimum ROE (15 -> 20/15/10), sehingga nilai default
+    slider menghasilkan aturan yang sama dengan DEFAULT_LKH_RULES.
+
+    Parameters:
+    per_threshold (float): Batas maksimum PER (pita "wajar")
+    roe_threshold (float): Batas minimum ROE dalam persen (pita "baik")
+    base (LKHRules): Aturan dasar untuk metrik lain
+
+    Returns:
+    LKHRules: Aturan baru
+    """
+    per_bands = (per_threshold * 2 / 3, per_threshold, per_threshold * 1.25)
+    roe_bands = (roe_threshold + 5, roe_threshold, max(roe_threshold - 5, 0))
+    return LKHRules(**{**base.__dict__, "per_bands": per_bands, "roe_bands": roe_bands})
+
+
+def screen_stock_lkh(data, rules: LKHRules = None):
     """
     Menilai saham berdasarkan prinsip investasi Lo Kheng Hong (LKH)
-    dengan kriteria: Valuasi rendah, Profitabilitas tinggi, 
+    dengan kriteria: Valuasi rendah, Profitabilitas tinggi,
     Pertumbuhan konsisten, dan Kesehatan keuangan.
-    
-    Bobot:
+
+    Bobot (default):
     - Profitabilitas (ROE): 30%
     - Valuasi (PER/PBV): 30%
     - Pertumbuhan (EPS Growth): 20%
     - Kesehatan Keuangan (DER): 20%
-    
+
+    Parameters:
+    data (dict): PER, PBV, ROE, DER, EPS_Growth (None atau NaN = kosong)
+    rules (LKHRules): Optional; aturan skoring, default DEFAULT_LKH_RULES
+
+    Hasil dimemoisasi per (aturan, nilai fundamental) sehingga input yang
+    sama tidak dihitung ulang.
+
     Returns:
         Skor 0-100 mewakili kelayakan investasi
     """
+    return _score_lkh(
+        rules or DEFAULT_LKH_RULES,
+        *(_missing_to_none(data.get(c)) for c in LKH_INPUT_COLUMNS)
+    )
+
+
+def _missing_to_none(value):
+    # NaN berarti data kosong, sama seperti None (dan seperti versi vektor)
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+@lru_cache(maxsize=65536)
+def _score_lkh(rules, per, pbv, roe, der, eps_growth):
     # Inisialisasi subskor
     valuation_score = 0
     profitability_score = 0
     growth_score = 0
     financial_health_score = 0
-    
-    # 1. Valuasi (30% bobot total)
+
+    # 1. Valuasi
     ## Price Earning Ratio (PER)
-    if data.get("PER") is not None:
-        if data["PER"] <= 8:
-            valuation_score += 50  # PER sangat murah
-        elif data["PER"] <= 12:
-            valuation_score += 30  # PER wajar
-        elif data["PER"] <= 15:
-            valuation_score += 10  # PER agak tinggi
-        
+    if per is not None:
+        if per <= rules.per_bands[0]:
+            valuation_score += rules.per_points[0]  # PER sangat murah
+        elif per <= rules.per_bands[1]:
+            valuation_score += rules.per_points[1]  # PER wajar
+        elif per <= rules.per_bands[2]:
+            valuation_score += rules.per_points[2]  # PER agak tinggi
+
     ## Price to Book Value (PBV)
-    if data.get("PBV") is not None:
-        if data["PBV"] < 0.8:
-            valuation_score += 50  # Harga dibawah nilai buku
-        elif data["PBV"] < 1.2:
-            valuation_score += 30  # PBV wajar
-        elif data["PBV"] < 2:
-            valuation_score += 10
-    
-    # 2. Profitabilitas (30% bobot total)
+    if pbv is not None:
+        if pbv < rules.pbv_bands[0]:
+            valuation_score += rules.pbv_points[0]  # Harga dibawah nilai buku
+        elif pbv < rules.pbv_bands[1]:
+            valuation_score += rules.pbv_points[1]  # PBV wajar
+        elif pbv < rules.pbv_bands[2]:
+            valuation_score += rules.pbv_points[2]
+
+    # 2. Profitabilitas
     ## Return on Equity (ROE)
-    if data.get("ROE") is not None:
-        if data["ROE"] >= 20:
-            profitability_score = 100  # ROE sangat tinggi
-        elif data["ROE"] >= 15:
-            profitability_score = 80   # ROE baik
-        elif data["ROE"] >= 10:
-            profitability_score = 40   # ROE minimal
-    
-    # 3. Pertumbuhan (20% bobot total)
+    if roe is not None:
+        if roe >= rules.roe_bands[0]:
+            profitability_score = rules.roe_points[0]  # ROE sangat tinggi
+        elif roe >= rules.roe_bands[1]:
+            profitability_score = rules.roe_points[1]  # ROE baik
+        elif roe >= rules.roe_bands[2]:
+            profitability_score = rules.roe_points[2]  # ROE minimal
+
+    # 3. Pertumbuhan
     ## EPS Growth
-    if data.get("EPS_Growth") is not None:
-        if data["EPS_Growth"] >= 15:
-            growth_score = 100  # Pertumbuhan tinggi
-        elif data["EPS_Growth"] >= 10:
-            growth_score = 70
-        elif data["EPS_Growth"] >= 5:
-            growth_score = 40
-    
-    # 4. Kesehatan Keuangan (20% bobot total)
+    if eps_growth is not None:
+        if eps_growth >= rules.eps_bands[0]:
+            growth_score = rules.eps_points[0]  # Pertumbuhan tinggi
+        elif eps_growth >= rules.eps_bands[1]:
+            growth_score = rules.eps_points[1]
+        elif eps_growth >= rules.eps_bands[2]:
+            growth_score = rules.eps_points[2]
+
+    # 4. Kesehatan Keuangan
     ## Debt to Equity Ratio (DER)
-    if data.get("DER") is not None:
-        if data["DER"] < 0.3:
-            financial_health_score = 100  # Utang sangat rendah
-        elif data["DER"] < 0.8:
-            financial_health_score = 80   # Utang terkendali
-        elif data["DER"] < 1:
-            financial_health_score = 30
-    
+    if der is not None:
+        if der < rules.der_bands[0]:
+            financial_health_score = rules.der_points[0]  # Utang sangat rendah
+        elif der < rules.der_bands[1]:
+            financial_health_score = rules.der_points[1]  # Utang terkendali
+        elif der < rules.der_bands[2]:
+            financial_health_score = rules.der_points[2]
+
     # Hitung skor akhir dengan bobot
+    w_val, w_prof, w_growth, w_health = rules.weights
     total_score = (
-        0.3 * (valuation_score / 2) +       # Rata-rata subskor valuasi (PER+PBV)
-        0.3 * profitability_score +
-        0.2 * growth_score +
-        0.2 * financial_health_score
+        w_val * (valuation_score / 2) +       # Rata-rata subskor valuasi (PER+PBV)
+        w_prof * profitability_score +
+        w_growth * growth_score +
+        w_health * financial_health_score
     )
-    
+
     # Jika data penting tidak tersedia, berikan skor minimum
-    if (data.get("PER") is None or data.get("PBV") is None or 
-        data.get("ROE") is None or data.get("DER") is None):
-        total_score = max(total_score, 30)  # Minimum 30 jika data tidak lengkap
-    
+    if per is None or pbv is None or roe is None or der is None:
+        total_score = max(total_score, rules.incomplete_min_score)
+
     return round(total_score, 2)
+
+
+# Cache hasil batch per (aturan, fingerprint isi kolom input)
+# Sesi Streamlit berjalan sebagai thread, jadi akses cache dijaga lock
+_BATCH_CACHE_SIZE = 32
+_batch_cache = OrderedDict()
+_batch_cache_lock = threading.Lock()
+
+
+def _columns_fingerprint(cols: dict) -> str:
+    h = hashlib.sha1()
+    for c in LKH_INPUT_COLUMNS:
+        h.update(cols[c].tobytes())
+    return h.hexdigest()
+
+
+def screen_stock_lkh_df(df: pd.DataFrame, rules: LKHRules = None) -> pd.DataFrame:
+    """
+    Versi vektor dari screen_stock_lkh untuk banyak saham sekaligus
+
+    Aturan pita dan bobot sama persis dengan screen_stock_lkh, dan hasilnya
+    identik bit-per-bit dengan memanggil fungsi skalar per baris. Nilai kosong
+    (None/NaN) diperlakukan seperti None pada fungsi skalar. Hasil dimemoisasi
+    per (aturan, isi kolom input).
+
+    Parameters:
+    df (pd.DataFrame): Satu baris per saham dengan kolom PER, PBV, ROE, DER, EPS_Growth
+    rules (LKHRules): Optional; aturan skoring, default DEFAULT_LKH_RULES
+
+    Returns:
+    pd.DataFrame: Index sama dengan df, berisi kolom valuation_score,
+        profitability_score, growth_score, financial_health_score dan LKH_Score
+    """
+    rules = rules or DEFAULT_LKH_RULES
+    cols = {c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            for c in LKH_INPUT_COLUMNS}
+
+    key = (rules, _columns_fingerprint(cols))
+    with _batch_cache_lock:
+        result = _batch_cache.get(key)
+        if result is not None:
+            _batch_cache.move_to_end(key)
+    if result is None:
+        # Dihitung di luar lock; dua thread dengan input sama paling buruk menghitung dua kali
+        result = _score_lkh_arrays(rules, cols)
+        with _batch_cache_lock:
+            _batch_cache[key] = result
+            while len(_batch_cache) > _BATCH_CACHE_SIZE:
+                _batch_cache.popitem(last=False)
+
+    result = result.copy()
+    result.index = df.index
+    return result
+
+
+def score_lkh_arrays(cols: dict, rules: LKHRules = None) -> np.ndarray:
+    """
+    Skor LKH untuk array input berbentuk bebas (misal tanggal x saham), tanpa memo
+
+    Parameters:
+    cols (dict): {kolom LKH_INPUT_COLUMNS: array float}, semua berbentuk sama, NaN = kosong
+    rules (LKHRules): Optional; aturan skoring, default DEFAULT_LKH_RULES
+
+    Returns:
+    np.ndarray: LKH_Score dengan bentuk yang sama dengan input
+    """
+    rules = rules or DEFAULT_LKH_RULES
+    shape = np.shape(cols[LKH_INPUT_COLUMNS[0]])
+    flat = {c: np.asarray(cols[c], dtype=np.float64).reshape(-1) for c in LKH_INPUT_COLUMNS}
+    return _score_lkh_arrays(rules, flat)["LKH_Score"].to_numpy().reshape(shape)
+
+
+def _score_lkh_arrays(rules: LKHRules, cols: dict) -> pd.DataFrame:
+    per, pbv, roe, der, eps = (cols[c] for c in LKH_INPUT_COLUMNS)
+
+    # np.select memilih kondisi pertama yang benar, sama seperti rantai if/elif.
+    # Perbandingan dengan NaN selalu False sehingga data kosong mendapat 0.
+    b, p = rules.per_bands, rules.per_points
+    per_score = np.select([per <= b[0], per <= b[1], per <= b[2]], p, 0)
+    b, p = rules.pbv_bands, rules.pbv_points
+    pbv_score = np.select([pbv < b[0], pbv < b[1], pbv < b[2]], p, 0)
+    valuation_score = per_score + pbv_score
+    b, p = rules.roe_bands, rules.roe_points
+    profitability_score = np.select([roe >= b[0], roe >= b[1], roe >= b[2]], p, 0)
+    b, p = rules.eps_bands, rules.eps_points
+    growth_score = np.select([eps >= b[0], eps >= b[1], eps >= b[2]], p, 0)
+    b, p = rules.der_bands, rules.der_points
+    financial_health_score = np.select([der < b[0], der < b[1], der < b[2]], p, 0)
+
+    # Urutan operasi sama dengan versi skalar agar hasil floating point identik
+    w_val, w_prof, w_growth, w_health = rules.weights
+    total_score = (
+        w_val * (valuation_score / 2) +
+        w_prof * profitability_score.astype(np.float64) +
+        w_growth * growth_score.astype(np.float64) +
+        w_health * financial_health_score.astype(np.float64)
+    )
+
+    incomplete = np.isnan(per) | np.isnan(pbv) | np.isnan(roe) | np.isnan(der)
+    total_score = np.where(incomplete, np.maximum(total_score, rules.incomplete_min_score), total_score)
+
+    # Skor hanya punya sedikit nilai unik; bulatkan dengan round() bawaan Python
+    # (bukan np.round) agar pembulatan sama persis dengan fungsi skalar
+    unique_scores, inverse = np.unique(total_score, return_inverse=True)
+    rounded = np.array([round(float(v), 2) for v in unique_scores], dtype=np.float64)
+    lkh_score = rounded[inverse.reshape(-1)]
+
+    return pd.DataFrame({
+        "valuation_score": valuation_score,
+        "profitability_score": profitability_score,
+        "growth_score": growth_score,
+        "financial_health_score": financial_health_score,
+        "LKH_Score": lkh_score
+    })
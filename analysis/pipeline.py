@@ -0,0 +1,111 @@
+from functools import lru_cache
+
+import numpy as np
+
+from analysis.dcf_valuation import calculate_dcf, dcf_sensitivity_grid, sensitivity_axis, dcf_monte_carlo
+
+# Setiap interaksi widget di Streamlit menjalankan ulang seluruh skrip. Tahap-tahap
+# di bawah ini murni (hanya bergantung pada argumennya), sehingga hasilnya
+# dimemoisasi pada input persisnya: mengubah opsi tampilan tidak menghitung
+# ulang apa pun, dan mengubah slider DCF hanya menghitung ulang tahap DCF.
+# Skor LKH sudah dimemoisasi di screen_stock_lkh.
+#
+# Hasil yang dikembalikan dipakai bersama antar-rerun dan antar-sesi, jadi
+# anggap read-only (salin dulu sebelum diubah).
+
+
+def valuation_inputs(data: dict) -> tuple:
+    """
+    Ambil (fcf, price) untuk valuasi dari hasil fetch_stock_info
+
+    Jika FCF tidak tersedia atau negatif, dipakai 5% dari kapitalisasi pasar
+    sebagai pendekatan.
+    """
+    fcf = data.get("FCF", 1e9)
+    price = data.get("price", 0)
+
+    # Fallback jika FCF negatif
+    if fcf is None or fcf <= 0:
+        fcf = data.get("market_cap", 1e9) * 0.05
+    return fcf, price
+
+
+@lru_cache(maxsize=256)
+def dcf_stage(fcf: float, price: float, growth_rate: float, discount_rate: float,
+              terminal_growth: float, years: int) -> tuple:
+    """
+    Nilai intrinsik dan margin of safety
+
+    Returns:
+    tuple: (dcf_value, margin_safety dalam persen)
+    """
+    dcf_value = calculate_dcf(
+        fcf=fcf,
+        growth_rate=growth_rate,
+        discount_rate=discount_rate,
+        terminal_growth=terminal_growth,
+        years=years
+    )
+    margin_safety = ((dcf_value - price) / price) * 100 if price > 0 else 0
+    return dcf_value, margin_safety
+
+
+@lru_cache(maxsize=64)
+def sensitivity_stage(fcf: float, growth_rate: float, discount_rate: float,
+                      terminal_growth: float, years: int, steps: int) -> tuple:
+    """
+    Grid sensitivitas growth vs discount di sekitar parameter dasar
+
+    Sumbu pertumbuhan 70%-130% dan sumbu diskonto 90%-110% dari nilai dasar,
+    dengan diskonto minimal terminal growth + 1%.
+
+    Returns:
+    tuple: (growth_axis, discount_axis, grid) dengan grid dari dcf_sensitivity_grid
+    """
+    growth_axis = sensitivity_axis(growth_rate, 0.7, 1.3, steps)
+    discount_axis = sensitivity_axis(discount_rate, 0.9, 1.1, steps)
+    # Pastikan diskonto > terminal growth
+    discount_axis = np.maximum(discount_axis, terminal_growth + 0.01)
+    growth_axis.flags.writeable = False
+    discount_axis.flags.writeable = False
+
+    grid = dcf_sensitivity_grid(
+        base_fcf=fcf,
+        growth_rates=growth_axis,
+        discount_rates=discount_axis,
+        terminal_growths=terminal_growth,
+        years=years
+    )
+    return growth_axis, discount_axis, grid
+
+
+@lru_cache(maxsize=16)
+def monte_carlo_stage(fcf: float, price: float, growth_rate: float, discount_rate: float,
+                      terminal_growth: float, years: int, growth_std: float,
+                      discount_std: float, n_paths: int, seed: int = 42) -> dict:
+    """
+    Simulasi Monte Carlo DCF dengan growth/discount normal dan terminal segitiga (±1%)
+
+    Seed tetap membuat hasilnya deterministik sehingga aman dimemoisasi.
+
+    Returns:
+    dict: Lihat dcf_monte_carlo
+    """
+    return dcf_monte_carlo(
+        fcf=fcf,
+        growth={"dist": "normal", "mean": growth_rate, "std": growth_std},
+        discount={"dist": "normal", "mean": discount_rate, "std": discount_std},
+        terminal={"dist": "triangular", "low": max(terminal_growth - 0.01, 0),
+                  "mode": terminal_growth, "high": terminal_growth + 0.01},
+        years=years,
+        n_paths=n_paths,
+        current_price=price,
+        seed=seed
+    )
+
+
+def clear_pipeline_cache():
+    """Kosongkan memo semua tahap"""
+    dcf_stage.cache_clear()
+    sensitivity_stage.cache_clear()
+    monte_carlo_stage.cache_clear()
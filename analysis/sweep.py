@@ -0,0 +1,233 @@
+import concurrent.futures
+import dataclasses
+import itertools
+import os
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from analysis.lkh_screener import LKH_INPUT_COLUMNS, LKHRules, DEFAULT_LKH_RULES, lkh_rules_from_thresholds
+from analysis.backtest import BacktestPanel, run_backtest
+
+# Metrik summary run_backtest yang lebih baik jika lebih kecil
+LOWER_IS_BETTER = ("volatility", "mean_turnover")
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    """
+    Satu kombinasi yang diuji: aturan LKH, asumsi DCF, dan aturan portofolio
+
+    Nilai default sama dengan default sidebar aplikasi. min_margin=None berarti
+    DCF hanya memecah skor yang sama; 0 berarti hanya saham undervalued.
+    """
+    rules: LKHRules = DEFAULT_LKH_RULES
+    growth_rate: float = 0.12
+    discount_rate: float = 0.10
+    terminal_growth: float = 0.03
+    years: int = 5
+    min_margin: float = None
+    top_n: int = 20
+    min_score: float = 0
+
+    def as_row(self) -> dict:
+        """Kolom konfigurasi untuk tabel hasil sweep"""
+        return {
+            "weights": tuple(round(w, 4) for w in self.rules.weights),
+            "per_bands": tuple(round(b, 2) for b in self.rules.per_bands),
+            "roe_bands": tuple(round(b, 2) for b in self.rules.roe_bands),
+            "growth_rate": self.growth_rate,
+            "discount_rate": self.discount_rate,
+            "terminal_growth": self.terminal_growth,
+            "years": self.years,
+            "min_margin": self.min_margin,
+            "top_n": self.top_n,
+            "min_score": self.min_score,
+            "fingerprint": self.rules.fingerprint,
+        }
+
+
+def weight_grid(step: float = 0.1, min_weight: float = 0.1) -> list:
+    """
+    Semua bobot (valuasi, profitabilitas, pertumbuhan, kesehatan) kelipatan `step`
+    yang berjumlah 1 dan masing-masing minimal min_weight
+
+    Parameters:
+    step (float): Jarak antar bobot
+    min_weight (float): Bobot minimum setiap kelompok
+
+    Returns:
+    list: Daftar tuple 4 bobot
+    """
+    units = round(1 / step)
+    low = round(min_weight / step)
+    grid = []
+    for a, b, c in itertools.product(range(low, units + 1), repeat=3):
+        d = units - a - b - c
+        if d >= low:
+            grid.append(tuple(round(x * step, 10) for x in (a, b, c, d)))
+    return grid
+
+
+def config_grid(
+    weights: list = None,
+    per_thresholds: list = None,
+    roe_thresholds: list = None,
+    growth_rates: list = None,
+    discount_rates: list = None,
+    terminal_growths: list = None,
+    min_margins: list = None,
+    base: SweepConfig = SweepConfig()
+) -> list:
+    """
+    Produk kartesius dari semua nilai yang diberikan
+
+    Parameter yang None memakai nilai dari base. Batas PER/ROE dikonversi ke
+    pita seperti slider sidebar (lkh_rules_from_thresholds). Kombinasi DCF
+    yang tidak valid (diskonto <= pertumbuhan terminal) dilewati.
+
+    Returns:
+    list: Daftar SweepConfig
+    """
+    configs = []
+    for w, per, roe, g, d, t, m in itertools.product(
+        weights or [base.rules.weights],
+        per_thresholds or [None],
+        roe_thresholds or [None],
+        growth_rates or [base.growth_rate],
+        discount_rates or [base.discount_rate],
+        terminal_growths or [base.terminal_growth],
+        min_margins or [base.min_margin],
+    ):
+        if d <= t:
+            continue
+        rules = base.rules
+        if per is not None or roe is not None:
+            rules = lkh_rules_from_thresholds(
+                per if per is not None else rules.per_bands[1],
+                roe if roe is not None else rules.roe_bands[1],
+                rules
+            )
+        rules = dataclasses.replace(rules, weights=tuple(w))
+        configs.append(dataclasses.replace(
+            base, rules=rules, growth_rate=g, discount_rate=d, terminal_growth=t, min_margin=m
+        ))
+    return configs
+
+
+def evaluate_config(panel: BacktestPanel, config: SweepConfig) -> dict:
+    """Summary run_backtest untuk satu konfigurasi"""
+    dcf = (config.growth_rate, config.discount_rate, config.terminal_growth, config.years)
+    return run_backtest(panel, config.rules, config.top_n, config.min_score, dcf, config.min_margin)["summary"]
+
+
+class SharedPanel:
+    """
+    Salinan BacktestPanel di shared memory untuk proses worker
+
+    Semua array (input LKH, FCF, harga) disalin sekali ke satu blok
+    (field, tanggal, saham). Worker memetakan blok yang sama lewat `spec`
+    tanpa menyalin, sehingga biaya per tugas hanya konfigurasi dan summary.
+    Gunakan sebagai context manager agar blok dihapus setelah sweep.
+    """
+
+    FIELDS = (*LKH_INPUT_COLUMNS, "fcf", "prices")
+
+    def __init__(self, panel: BacktestPanel):
+        arrays = [panel.fundamentals[c] for c in LKH_INPUT_COLUMNS] + [panel.fcf, panel.prices]
+        shape = (len(arrays), *panel.shape)
+        nbytes = int(np.prod(shape)) * np.dtype(np.float64).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        block = np.ndarray(shape, dtype=np.float64, buffer=self._shm.buf)
+        for i, values in enumerate(arrays):
+            block[i] = values
+        del block
+        self.spec = (self._shm.name, shape, panel.dates, panel.tickers, panel.freq)
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_panel(spec) -> tuple:
+    """
+    Buka BacktestPanel dari SharedPanel.spec (array tidak disalin)
+
+    Returns:
+    tuple: (panel, shm); simpan shm selama panel dipakai
+    """
+    name, shape, dates, tickers, freq = spec
+    shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    block.flags.writeable = False
+    fields = dict(zip(SharedPanel.FIELDS, block))
+    panel = BacktestPanel(dates, tickers, fields, fields["prices"], freq, fcf=fields["fcf"])
+    return panel, shm
+
+
+_worker_panel = None
+_worker_shm = None
+
+
+def _init_worker(spec):
+    global _worker_panel, _worker_shm
+    _worker_panel, _worker_shm = attach_panel(spec)
+
+
+def _evaluate_in_worker(config: SweepConfig) -> dict:
+    return evaluate_config(_worker_panel, config)
+
+
+def run_sweep(
+    panel: BacktestPanel,
+    configs: list,
+    objective: str = "sharpe",
+    max_workers: int = None,
+    ranked: bool = True
+) -> pd.DataFrame:
+    """
+    Evaluasi banyak konfigurasi di ProcessPoolExecutor dan urutkan menurut objektif
+
+    Panel dibagikan ke worker lewat shared memory (SharedPanel), bukan dipickle
+    per tugas; tugas dikirim dalam batch agar overhead IPC kecil dibanding
+    waktu backtest, sehingga waktu total turun hampir linear dengan jumlah core.
+
+    Parameters:
+    panel (BacktestPanel): Data point-in-time (BacktestPanel.from_stores)
+    configs (list): Daftar SweepConfig (misal dari config_grid)
+    objective (str): Metrik summary run_backtest untuk peringkat, misal
+        "sharpe", "cagr", "mean_excess_return", "mean_ic", "hit_rate"
+    max_workers (int): Optional; jumlah proses, default jumlah CPU. 1 = tanpa proses tambahan
+    ranked (bool): Urutkan menurut objektif (False = urutan configs)
+
+    Returns:
+    pd.DataFrame: Satu baris per konfigurasi (kolom SweepConfig.as_row dan
+        metrik summary), peringkat dimulai dari 1; objektif NaN paling bawah
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(configs) <= 1:
+        summaries = [evaluate_config(panel, config) for config in configs]
+    else:
+        chunksize = max(1, len(configs) // (max_workers * 4))
+        with SharedPanel(panel) as shared, concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(shared.spec,)
+        ) as executor:
+            summaries = list(executor.map(_evaluate_in_worker, configs, chunksize=chunksize))
+
+    df = pd.DataFrame([{**config.as_row(), **summary} for config, summary in zip(configs, summaries)])
+    if ranked and len(df):
+        if objective not in df.columns:
+            raise ValueError(f"Objektif tidak dikenal: {objective}")
+        df = df.sort_values(
+            objective, ascending=objective in LOWER_IS_BETTER, kind="stable", na_position="last"
+        ).reset_index(drop=True)
+        df.index = df.index + 1  # Peringkat dimulai dari 1
+    return df
@@ -0,0 +1,98 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+TECHNICAL_COLUMNS = [
+    "ticker", "last_close", "low_52w", "high_52w", "pct_above_52w_low",
+    "MA50", "MA200", "pct_vs_MA200", "volatility"
+]
+
+
+def technical_screen(
+    store,
+    lookback: int = TRADING_DAYS,
+    ma_windows: tuple = (50, 200),
+    vol_window: int = 60,
+    min_coverage: float = 0.8,
+    chunk_size: int = 2000
+) -> pd.DataFrame:
+    """
+    Indikator teknikal untuk seluruh saham di PriceHistoryStore
+
+    Hanya baris terakhir (max(lookback, MA terpanjang, vol_window + 1) hari)
+    yang dibaca dari memory map, per blok `chunk_size` saham, sehingga
+    penggunaan RAM tetap kecil berapa pun panjang riwayatnya.
+
+    Parameters:
+    store (PriceHistoryStore): Sumber riwayat harga
+    lookback (int): Jendela 52 minggu dalam hari bursa
+    ma_windows (tuple): Panjang dua moving average (pendek, panjang)
+    vol_window (int): Jendela volatilitas (hari)
+    min_coverage (float): Porsi minimal hari berisi data agar indikator dihitung
+    chunk_size (int): Jumlah saham per blok
+
+    Returns:
+    pd.DataFrame: TECHNICAL_COLUMNS (nama MA mengikuti ma_windows), NaN jika
+        data tidak cukup. Volatilitas adalah deviasi standar log return harian
+        yang disetahunkan, dalam persen.
+    """
+    short_ma, long_ma = ma_windows
+    depth = max(lookback, long_ma, vol_window + 1)
+    # Satu snapshot untuk semua field dan daftar ticker, agar kolom tetap sejajar
+    # walaupun proses lain menambah saham di tengah pembacaan
+    blocks, tickers = store.windows({"close": depth, "low": lookback, "high": lookback})
+    close_all, low_all, high_all = blocks["close"], blocks["low"], blocks["high"]
+    n_tickers = len(tickers)
+
+    result = {name: np.full(n_tickers, np.nan) for name in TECHNICAL_COLUMNS[1:]}
+
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        # Saham tanpa data menghasilkan "All-NaN slice"; hasilnya memang NaN
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        for start in range(0, n_tickers, chunk_size):
+            cols = slice(start, start + chunk_size)
+            close = np.asarray(close_all[:, cols])
+            low = np.asarray(low_all[:, cols])
+            high = np.asarray(high_all[:, cols])
+            # Hari tanpa high/low memakai harga penutupan
+            low = np.where(np.isnan(low), close[len(close) - len(low):], low)
+            high = np.where(np.isnan(high), close[len(close) - len(high):], high)
+
+            # Harga terakhir yang tersedia per saham (saham bisa tidak ditransaksikan)
+            filled = pd.DataFrame(close).ffill().to_numpy()
+            last_close = filled[-1] if len(filled) else np.full(close.shape[1], np.nan)
+            low_52w = np.nanmin(low, axis=0) if len(low) else np.full(close.shape[1], np.nan)
+            high_52w = np.nanmax(high, axis=0) if len(high) else np.full(close.shape[1], np.nan)
+
+            returns = np.diff(np.log(close[-(vol_window + 1):]), axis=0)
+            volatility = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(TRADING_DAYS) * 100
+            volatility[_coverage(returns, vol_window) < min_coverage] = np.nan
+
+            result["last_close"][cols] = last_close
+            result["low_52w"][cols] = low_52w
+            result["high_52w"][cols] = high_52w
+            result["MA50"][cols] = _moving_average(close, short_ma, min_coverage)
+            result["MA200"][cols] = _moving_average(close, long_ma, min_coverage)
+            result["volatility"][cols] = volatility
+
+    result["pct_above_52w_low"] = (result["last_close"] / result["low_52w"] - 1) * 100
+    result["pct_vs_MA200"] = (result["last_close"] / result["MA200"] - 1) * 100
+
+    df = pd.DataFrame({"ticker": tickers, **result}, columns=TECHNICAL_COLUMNS)
+    return df.rename(columns={
+        "MA50": f"MA{short_ma}", "MA200": f"MA{long_ma}", "pct_vs_MA200": f"pct_vs_MA{long_ma}"
+    })
+
+
+def _coverage(block: np.ndarray, window: int) -> np.ndarray:
+    """Porsi hari berisi data dalam `window` baris terakhir per kolom"""
+    return np.count_nonzero(~np.isnan(block[-window:]), axis=0) / window
+
+
+def _moving_average(close: np.ndarray, window: int, min_coverage: float) -> np.ndarray:
+    """Rata-rata `window` hari terakhir, NaN jika data kurang dari min_coverage"""
+    mean = np.nanmean(close[-window:], axis=0) if len(close) else np.full(close.shape[1], np.nan)
+    return np.where(_coverage(close, window) >= min_coverage, mean, np.nan)
@@ -0,0 +1,282 @@
+import numpy as np
+import pandas as pd
+from analysis.lkh_screener import screen_stock_lkh_df, LKHRules
+from analysis.dcf_valuation import calculate_dcf_array
+from data.records import FundamentalsTable
+
+SCREENING_COLUMNS = [
+    "ticker", "LKH_Score", "price", "DCF_Value", "Margin_of_Safety",
+    "PER", "PBV", "ROE", "DER", "EPS_Growth", "FCF", "dividend_yield",
+    "market_cap", "last_updated"
+]
+
+
+def screen_universe(
+    stock_data,
+    growth_rate: float,
+    discount_rate: float,
+    terminal_growth: float,
+    years: int = 5,
+    rules: LKHRules = None
+) -> pd.DataFrame:
+    """
+    Menilai seluruh saham hasil get_stock_data dengan skor LKH dan valuasi DCF
+
+    Parameters:
+    stock_data (dict | FundamentalsTable): {ticker: data_dict} dari get_stock_data,
+        atau snapshot yang sama dalam bentuk FundamentalsTable
+    growth_rate (float): Tingkat pertumbuhan DCF (desimal)
+    discount_rate (float): Tingkat diskonto DCF (desimal)
+    terminal_growth (float): Pertumbuhan terminal DCF (desimal)
+    years (int): Jumlah tahun proyeksi
+    rules (LKHRules): Optional; aturan skoring LKH, default DEFAULT_LKH_RULES
+
+    Returns:
+    pd.DataFrame: Satu baris per saham, diurutkan dari skor LKH tertinggi.
+        Saham yang gagal diambil datanya tidak dimasukkan.
+    """
+    df = _screening_frame(stock_data)
+    return _rank(_score_rows(df, growth_rate, discount_rate, terminal_growth, years, rules))
+
+
+def _screening_frame(stock_data) -> pd.DataFrame:
+    """Tabel input SCREENING_COLUMNS dari hasil get_stock_data atau FundamentalsTable (tanpa skor)"""
+    if isinstance(stock_data, FundamentalsTable):
+        return _table_frame(stock_data)
+
+    rows = []
+    for ticker, data in stock_data.items():
+        if not data or "error" in data:
+            continue
+        row = {col: data.get(col) for col in SCREENING_COLUMNS}
+        row["ticker"] = ticker
+        rows.append(row)
+
+    df = pd.DataFrame(rows, columns=SCREENING_COLUMNS)
+    numeric_cols = [c for c in SCREENING_COLUMNS if c not in ("ticker", "last_updated")]
+    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
+    df["price"] = df["price"].fillna(0)
+    return df
+
+
+def _table_frame(table: FundamentalsTable) -> pd.DataFrame:
+    """Sama seperti _screening_frame, langsung dari kolom FundamentalsTable tanpa dict per saham"""
+    frame = table.to_frame()
+    df = pd.DataFrame({"ticker": np.asarray(table.tickers, dtype=object)})
+    for col in SCREENING_COLUMNS[1:-1]:
+        df[col] = frame[col].to_numpy() if col in frame.columns else np.nan
+    df["price"] = df["price"].fillna(0)
+    df["last_updated"] = table.last_updated()
+    return df
+
+
+def _score_rows(df: pd.DataFrame, growth_rate: float, discount_rate: float, terminal_growth: float,
+                years: int, rules: LKHRules) -> pd.DataFrame:
+    """Isi LKH_Score, DCF_Value dan Margin_of_Safety untuk setiap baris df"""
+    df["LKH_Score"] = screen_stock_lkh_df(df, rules)["LKH_Score"]
+
+    # Fallback FCF sama seperti halaman analisis: 5% market cap jika FCF tidak positif
+    fcf = df["FCF"].to_numpy(dtype=np.float64)
+    fallback = df["market_cap"].fillna(0).to_numpy(dtype=np.float64) * 0.05
+    fcf = np.where(fcf > 0, fcf, fallback)
+    dcf_values, _ = calculate_dcf_array(fcf, growth_rate, discount_rate, terminal_growth, years)
+    df["DCF_Value"] = dcf_values
+
+    price = df["price"].to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["Margin_of_Safety"] = np.where(price > 0, (dcf_values - price) / price * 100, np.nan)
+    return df
+
+
+def _rank(df: pd.DataFrame) -> pd.DataFrame:
+    """Urutkan dari skor LKH tertinggi (lalu margin of safety); peringkat mulai dari 1"""
+    df = df.sort_values(["LKH_Score", "Margin_of_Safety"], ascending=False, na_position="last")
+    df = df.reset_index(drop=True)
+    df.index = df.index + 1  # Peringkat dimulai dari 1
+    return df
+
+
+def filter_screening(
+    df: pd.DataFrame,
+    min_score: float = 0,
+    max_per: float = None,
+    min_roe: float = None,
+    undervalued_only: bool = False,
+    max_above_52w_low: float = None
+) -> pd.DataFrame:
+    """
+    Menyaring tabel hasil screen_universe
+
+    Parameters:
+    df (pd.DataFrame): Hasil screen_universe
+    min_score (float): Skor LKH minimum
+    max_per (float): Optional; PER maksimum (saham tanpa PER ikut tersaring)
+    min_roe (float): Optional; ROE minimum dalam persen
+    undervalued_only (bool): Hanya saham dengan nilai DCF di atas harga
+    max_above_52w_low (float): Optional; jarak maksimum (%) dari harga terendah
+        52 minggu, butuh kolom pct_above_52w_low dari add_technical_columns
+
+    Returns:
+    pd.DataFrame: Baris yang memenuhi semua kriteria
+    """
+    mask = df["LKH_Score"] >= min_score
+    if max_per is not None:
+        mask &= df["PER"].notna() & (df["PER"] <= max_per)
+    if min_roe is not None:
+        mask &= df["ROE"].notna() & (df["ROE"] >= min_roe)
+    if undervalued_only:
+        mask &= df["Margin_of_Safety"].notna() & (df["Margin_of_Safety"] > 0)
+    if max_above_52w_low is not None:
+        mask &= df["pct_above_52w_low"].notna() & (df["pct_above_52w_low"] <= max_above_52w_low)
+    return df[mask]
+
+
+def add_technical_columns(df: pd.DataFrame, technical: pd.DataFrame) -> pd.DataFrame:
+    """
+    Menggabungkan hasil technical_screen ke tabel screen_universe per ticker
+
+    Urutan dan peringkat (index) tabel screening dipertahankan; saham tanpa
+    riwayat harga mendapat NaN.
+    """
+    extra = technical.drop(columns=["last_close"]).set_index("ticker")
+    return df.join(extra, on="ticker")
+
+
+# Kolom yang menentukan skor LKH dan valuasi DCF satu saham
+SCORING_INPUT_COLUMNS = ["PER", "PBV", "ROE", "DER", "EPS_Growth", "FCF", "market_cap", "price"]
+
+DIFF_COLUMNS = ["ticker", "event", "old", "new"]
+
+
+class IncrementalScreener:
+    """
+    screen_universe yang hanya menghitung ulang saham yang inputnya berubah
+
+    Setiap saham diberi fingerprint dari SCORING_INPUT_COLUMNS. Pada update()
+    berikutnya hanya baris dengan fingerprint baru (saham baru atau input yang
+    berubah) yang diberi skor dan divaluasi ulang; baris lain memakai hasil
+    sebelumnya. Jika aturan LKH atau asumsi DCF berubah, semua baris dihitung
+    ulang. Hasil identik dengan screen_universe untuk data yang sama.
+    """
+
+    def __init__(self):
+        self.table = None
+        self.last_stats = {"rows": 0, "recomputed": 0, "reused": 0}
+        self._key = None
+        self._fingerprints = pd.Series(dtype=np.uint64)
+        self._results = pd.DataFrame(columns=["LKH_Score", "DCF_Value", "Margin_of_Safety"])
+
+    def update(
+        self,
+        stock_data,
+        growth_rate: float,
+        discount_rate: float,
+        terminal_growth: float,
+        years: int = 5,
+        rules: LKHRules = None,
+        score_threshold: float = 80,
+        min_rank_change: int = 5
+    ) -> tuple:
+        """
+        Menilai universe terbaru dan membandingkannya dengan hasil sebelumnya
+
+        Parameters:
+        stock_data (dict | FundamentalsTable): {ticker: data_dict} dari get_stock_data,
+        atau snapshot yang sama dalam bentuk FundamentalsTable
+        growth_rate, discount_rate, terminal_growth (float): Asumsi DCF (desimal)
+        years (int): Jumlah tahun proyeksi
+        rules (LKHRules): Optional; aturan skoring LKH, default DEFAULT_LKH_RULES
+        score_threshold (float): Batas skor untuk event skor (lihat diff_screenings)
+        min_rank_change (int): Perubahan peringkat minimum yang dilaporkan
+
+        Returns:
+        tuple: (tabel seperti screen_universe, diff dari diff_screenings).
+            Diff kosong pada update pertama.
+        """
+        df = _screening_frame(stock_data)
+        key = (rules, growth_rate, discount_rate, terminal_growth, years)
+        if key != self._key:
+            self._fingerprints = self._fingerprints.iloc[:0]
+
+        fingerprints = pd.util.hash_pandas_object(df[SCORING_INPUT_COLUMNS], index=False).to_numpy()
+        position = self._fingerprints.index.get_indexer(df["ticker"])
+        known = position >= 0
+        dirty = ~known
+        dirty[known] = self._fingerprints.to_numpy()[position[known]] != fingerprints[known]
+
+        computed = ["LKH_Score", "DCF_Value", "Margin_of_Safety"]
+        clean = ~dirty
+        for col in computed:
+            df[col] = np.nan
+        if clean.any():
+            df.loc[clean, computed] = self._results.to_numpy()[position[clean]]
+        if dirty.any():
+            rescored = _score_rows(df.loc[dirty].copy(), growth_rate, discount_rate, terminal_growth, years, rules)
+            df.loc[dirty, computed] = rescored[computed].to_numpy()
+
+        self._key = key
+        self._fingerprints = pd.Series(fingerprints, index=df["ticker"].to_numpy())
+        self._results = df[computed].set_axis(df["ticker"].to_numpy())
+        self.last_stats = {"rows": len(df), "recomputed": int(dirty.sum()), "reused": int(clean.sum())}
+
+        table = _rank(df)
+        if self.table is None:
+            diff = pd.DataFrame(columns=DIFF_COLUMNS)
+        else:
+            diff = diff_screenings(self.table, table, score_threshold, min_rank_change)
+        self.table = table
+        return table, diff
+
+
+def diff_screenings(old: pd.DataFrame, new: pd.DataFrame, score_threshold: float = 80,
+                    min_rank_change: int = 5) -> pd.DataFrame:
+    """
+    Perubahan antara dua hasil screen_universe
+
+    Event yang dilaporkan:
+    - "added" / "removed": saham masuk atau keluar dari tabel
+    - "rank_change": peringkat bergeser minimal min_rank_change posisi
+    - "newly_undervalued" / "no_longer_undervalued": margin of safety menjadi
+      positif atau tidak lagi positif
+    - "score_crossed_above" / "score_crossed_below": skor LKH melewati
+      score_threshold (naik menjadi >= batas, atau turun di bawahnya)
+
+    Parameters:
+    old, new (pd.DataFrame): Tabel screen_universe (index = peringkat)
+    score_threshold (float): Batas skor LKH
+    min_rank_change (int): Perubahan peringkat minimum
+
+    Returns:
+    pd.DataFrame: DIFF_COLUMNS; old/new berisi peringkat, skor atau margin
+        sebelum dan sesudah sesuai event
+    """
+    cols = ["ticker", "LKH_Score", "Margin_of_Safety"]
+    both = old[cols].assign(rank=old.index).set_index("ticker").join(
+        new[cols].assign(rank=new.index).set_index("ticker"), how="outer", lsuffix="_old", rsuffix="_new"
+    )
+    rank_old, rank_new = both["rank_old"], both["rank_new"]
+    score_old, score_new = both["LKH_Score_old"], both["LKH_Score_new"]
+    mos_old, mos_new = both["Margin_of_Safety_old"], both["Margin_of_Safety_new"]
+    present = rank_old.notna() & rank_new.notna()
+    undervalued_old = mos_old > 0
+    undervalued_new = mos_new > 0
+
+    events = [
+        ("added", rank_old.isna(), rank_old, rank_new),
+        ("removed", rank_new.isna(), rank_old, rank_new),
+        ("rank_change", present & ((rank_new - rank_old).abs() >= min_rank_change), rank_old, rank_new),
+        ("newly_undervalued", present & ~undervalued_old & undervalued_new, mos_old, mos_new),
+        ("no_longer_undervalued", present & undervalued_old & ~undervalued_new, mos_old, mos_new),
+        ("score_crossed_above", present & (score_old < score_threshold) & (score_new >= score_threshold),
+         score_old, score_new),
+        ("score_crossed_below", present & (score_old >= score_threshold) & (score_new < score_threshold),
+         score_old, score_new),
+    ]
+    frames = [
+        pd.DataFrame({"ticker": both.index[mask], "event": name,
+                      "old": before[mask].to_numpy(), "new": after[mask].to_numpy()})
+        for name, mask, before, after in events if mask.any()
+    ]
+    if not frames:
+        return pd.DataFrame(columns=DIFF_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[DIFF_COLUMNS]
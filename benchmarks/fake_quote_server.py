@@ -0,0 +1,121 @@
+"""
+Local fake quote server for exercising the fetchers without touching Yahoo
+
+GET /info/<TICKER> returns a deterministic yfinance-style info payload. A
+configurable fraction of requests is answered with HTTP 429 and every request
+can be delayed to mimic network latency.
+
+Run a throughput check against data.async_fetch:
+    python -m benchmarks.fake_quote_server --tickers 500 --throttle 0.1 --rate 200
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from data.providers import synthetic_info
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        if not self.path.startswith("/info/"):
+            self.send_error(404)
+            return
+        if server.rng.random() < server.throttle:
+            with server.lock:
+                server.throttled_count += 1
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.end_headers()
+            return
+
+        body = json.dumps(synthetic_info(self.path[len("/info/"):].upper())).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, throttle: float = 0.0, latency: float = 0.0, seed: int = 0):
+    """
+    Start the fake server on a background thread
+
+    Parameters:
+    port (int): Port to bind (0 picks a free one)
+    throttle (float): Fraction of requests answered with 429
+    latency (float): Seconds to sleep before answering each request
+    seed (int): Seed for the throttling decisions
+
+    Returns:
+    tuple: (server, base_url); call server.shutdown() when done
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.throttle = throttle
+    server.latency = latency
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.throttled_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    from data.async_fetch import AsyncFetcher, CircuitBreaker, http_info_fetcher, get_stock_data_throttled
+    from data.fetch_data import configure_store
+
+    parser = argparse.ArgumentParser(description="Measure AsyncFetcher throughput against a fake quote server")
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--throttle", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--rate", type=float, default=200.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    # Keep fake tickers out of the real fundamentals store
+    configure_store(None)
+    server, url = start_server(throttle=args.throttle, latency=args.latency)
+    fetcher = AsyncFetcher(
+        fetch_info=http_info_fetcher(url),
+        rate=args.rate,
+        burst=args.rate,
+        max_concurrency=args.concurrency,
+        base_delay=0.05,
+        max_delay=1.0,
+        breaker=CircuitBreaker(failure_threshold=50, reset_timeout=1.0)
+    )
+    tickers = [f"T{i:05d}" for i in range(args.tickers)]
+
+    start = time.perf_counter()
+    results = get_stock_data_throttled(tickers, fetcher, use_cache=False)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    errors = sum(1 for r in results.values() if "error" in r)
+    print(json.dumps({
+        "tickers": args.tickers,
+        "elapsed_s": round(elapsed, 3),
+        "tickers_per_s": round(args.tickers / elapsed, 1),
+        "errors": errors,
+        "server_requests": server.request_count,
+        "server_429": server.throttled_count,
+        "fetcher": fetcher.stats,
+        "breaker_opened": fetcher.breaker.times_opened,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Offline benchmark suite for the screener hot paths
+
+Runs entirely on the synthetic data provider (no network) and writes a JSON
+report. Two reports can be compared to catch regressions:
+
+    python -m benchmarks.run_benchmarks --output bench_base.json
+    ... make changes ...
+    python -m benchmarks.run_benchmarks --output bench_new.json --compare bench_base.json --threshold 0.25
+
+With --compare the exit code is 1 if any benchmark's median time grew by more
+than the threshold (0.25 = 25%).
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import data.fetch_data as fetch_data
+from data.providers import SyntheticProvider
+from analysis import lkh_screener
+from analysis.lkh_screener import screen_stock_lkh, screen_stock_lkh_df
+from analysis.backtest import BacktestPanel, run_backtest
+from analysis.sweep import config_grid, run_sweep, weight_grid
+from analysis.alerts import AlertEngine, AlertRule
+from analysis.dcf_valuation import (
+    calculate_dcf, calculate_dcf_array, dcf_sensitivity_analysis,
+    dcf_sensitivity_grid, sensitivity_axis
+)
+from components.charts import build_financial_chart
+
+
+class LatencyProvider(SyntheticProvider):
+    """Synthetic provider that sleeps per request to mimic network latency"""
+
+    bulk = False
+
+    def __init__(self, n_tickers: int, latency: float):
+        super().__init__(n_tickers)
+        self.latency = latency
+
+    def fetch_info(self, ticker: str) -> dict:
+        time.sleep(self.latency)
+        return super().fetch_info(ticker)
+
+
+def measure(func, repeat: int = 5, number: int = 1, setup=None) -> dict:
+    """
+    Time func() `number` times per repeat, `repeat` times
+
+    Returns per-call seconds (median/min/mean over repeats). setup() runs before
+    every repeat and is not timed.
+    """
+    per_call = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call.append((time.perf_counter() - start) / number)
+    return {
+        "median_s": statistics.median(per_call),
+        "min_s": min(per_call),
+        "mean_s": statistics.fmean(per_call),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def _random_fundamentals(n: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    cols = {
+        "PER": rng.uniform(-5, 40, n),
+        "PBV": rng.uniform(0.2, 5, n),
+        "ROE": rng.uniform(-10, 35, n),
+        "DER": rng.uniform(0, 3, n),
+        "EPS_Growth": rng.uniform(-30, 50, n),
+    }
+    for v in cols.values():
+        v[rng.random(n) < 0.05] = np.nan
+    return cols
+
+
+def bench_fetch(quick: bool) -> dict:
+    results = {}
+    fetch_data.configure_store(None)
+    n_tickers = 200 if quick else 1000
+    latency = 0.002
+
+    provider = LatencyProvider(n_tickers, latency)
+    fetch_data.set_provider(provider)
+    tickers = provider.list_tickers()
+
+    results["fetch_stock_info.cold"] = measure(
+        lambda: fetch_data.fetch_stock_info(tickers[0]),
+        repeat=20, setup=fetch_data.invalidate_stock_info
+    )
+    fetch_data.fetch_stock_info(tickers[0])
+    results["fetch_stock_info.cached"] = measure(
+        lambda: fetch_data.fetch_stock_info(tickers[0]), repeat=5, number=1000
+    )
+
+    for workers in (1, 4, 8, 16, 32):
+        stats = measure(
+            lambda: fetch_data.get_stock_data(tickers, max_workers=workers),
+            repeat=3, setup=fetch_data.invalidate_stock_info
+        )
+        stats["tickers"] = n_tickers
+        stats["tickers_per_s"] = n_tickers / stats["median_s"]
+        results[f"get_stock_data.workers_{workers}"] = stats
+
+    bulk = SyntheticProvider(n_tickers * 10)
+    fetch_data.set_provider(bulk)
+    results["get_stock_data.bulk_provider"] = measure(
+        lambda: fetch_data.get_stock_data(bulk.list_tickers()),
+        repeat=3, setup=fetch_data.invalidate_stock_info
+    )
+    results["get_stock_data.bulk_provider"]["tickers"] = n_tickers * 10
+    return results
+
+
+def bench_scoring(quick: bool) -> dict:
+    results = {}
+    n = 2_000 if quick else 10_000
+    cols = _random_fundamentals(n)
+    df = pd.DataFrame(cols)
+    records = [
+        {k: (None if np.isnan(v) else float(v)) for k, v in row.items()}
+        for row in df.to_dict("records")
+    ]
+
+    # Every call sees a different row, and the memo is cleared per repeat
+    rows = itertools.cycle(records)
+    results["screen_stock_lkh.per_call_uncached"] = measure(
+        lambda: screen_stock_lkh(next(rows)), repeat=3, number=n,
+        setup=lkh_screener._score_lkh.cache_clear
+    )
+    results["screen_stock_lkh_df.batch"] = measure(
+        lambda: screen_stock_lkh_df(df), repeat=5, setup=lkh_screener._batch_cache.clear
+    )
+    results["screen_stock_lkh_df.batch"]["rows"] = n
+    return results
+
+
+def bench_dcf(quick: bool) -> dict:
+    results = {}
+    n = 2_000 if quick else 10_000
+    rng = np.random.default_rng(1)
+    fcf = rng.uniform(1e9, 1e12, n)
+    growth = rng.uniform(0, 0.3, n)
+    discount = rng.uniform(0.06, 0.2, n)
+
+    results["calculate_dcf.per_call"] = measure(
+        lambda: calculate_dcf(1e9, 0.12, 0.10, 0.03, 5), repeat=5, number=2000
+    )
+    results["calculate_dcf_array.batch"] = measure(
+        lambda: calculate_dcf_array(fcf, growth, discount, 0.03, 5), repeat=5
+    )
+    results["calculate_dcf_array.batch"]["rows"] = n
+    results["dcf_sensitivity_analysis.3x3"] = measure(
+        lambda: dcf_sensitivity_analysis(1e9, 0.12, 0.10, 0.03, 5), repeat=5, number=200
+    )
+    g_axis = sensitivity_axis(0.12, 0.7, 1.3, 50)
+    d_axis = sensitivity_axis(0.10, 0.9, 1.1, 50)
+    results["dcf_sensitivity_grid.50x50"] = measure(
+        lambda: dcf_sensitivity_grid(1e9, g_axis, d_axis, 0.03, 5), repeat=5, number=50
+    )
+    return results
+
+
+def bench_charts(quick: bool) -> dict:
+    years = list(range(2014, 2034))
+    eps = list(np.linspace(100, 400, len(years)))
+    fcf = list(np.linspace(800, 3000, len(years)))
+    revenue = list(np.linspace(3000, 9000, len(years)))
+    return {
+        "build_financial_chart.20_periods": measure(
+            lambda: build_financial_chart(years, eps, fcf, revenue), repeat=3 if quick else 5, number=5
+        )
+    }
+
+
+def bench_backtest(quick: bool) -> dict:
+    results = {}
+    n_dates, n_tickers = (60, 300) if quick else (120, 900)
+    rng = np.random.default_rng(2)
+    dates = np.arange("2015-01", "2035-01", dtype="datetime64[M]")[:n_dates].astype("datetime64[D]")
+    shape = (n_dates, n_tickers)
+    fundamentals = {c: v.reshape(shape) for c, v in _random_fundamentals(n_dates * n_tickers).items()}
+    prices = 1000 * np.cumprod(1 + rng.normal(0.005, 0.08, shape), axis=0)
+    fcf = rng.uniform(-1e3, 3e3, shape)
+    panel = BacktestPanel(dates, [f"T{i:04d}" for i in range(n_tickers)], fundamentals, prices, fcf=fcf)
+
+    results["run_backtest.single"] = measure(lambda: run_backtest(panel), repeat=5)
+    results["run_backtest.single"]["cells"] = n_dates * n_tickers
+    grid = config_grid(
+        weights=weight_grid(0.1, 0.2), per_thresholds=[8, 12, 16], discount_rates=[0.08, 0.12], min_margins=[0]
+    )
+    # Serial vs. all cores shows how the shared-memory sweep scales
+    for workers in sorted({1, os.cpu_count() or 1}):
+        stats = measure(lambda: run_sweep(panel, grid, max_workers=workers), repeat=1 if quick else 3)
+        stats["configs"] = len(grid)
+        stats["configs_per_s"] = len(grid) / stats["median_s"]
+        results[f"run_sweep.workers_{workers}"] = stats
+    return results
+
+
+def bench_alerts(quick: bool) -> dict:
+    n_tickers = 900
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(_random_fundamentals(n_tickers))
+    df["ticker"] = [f"T{i:04d}" for i in range(n_tickers)]
+    df["LKH_Score"] = rng.uniform(0, 100, n_tickers)
+    df["Margin_of_Safety"] = rng.normal(0, 40, n_tickers)
+    df["price"] = rng.uniform(50, 20000, n_tickers)
+    columns = ["Margin_of_Safety", "LKH_Score", "PER", "PBV", "ROE", "DER"]
+    rules = [
+        AlertRule(f"rule_{i}", f"{columns[i % len(columns)]} > {i % 50} and ROE > min_roe or PER < 5")
+        for i in range(100)
+    ]
+    engine = AlertEngine(rules, params={"min_roe": 15})
+    engine.evaluate(df)
+    # Steady state: conditions unchanged, so nothing fires and no state is written
+    stats = measure(lambda: engine.evaluate(df), repeat=5, number=20)
+    stats.update(rules=len(rules), tickers=n_tickers)
+    return {"AlertEngine.evaluate.100_rules": stats}
+
+
+BENCHMARKS = {
+    "fetch": bench_fetch,
+    "scoring": bench_scoring,
+    "dcf": bench_dcf,
+    "charts": bench_charts,
+    "backtest": bench_backtest,
+    "alerts": bench_alerts,
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Return [(name, baseline_median, current_median, ratio)] for regressions above threshold"""
+    regressions = []
+    for name, stats in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("median_s"):
+            continue
+        ratio = stats["median_s"] / base["median_s"]
+        if ratio > 1 + threshold:
+            regressions.append((name, base["median_s"], stats["median_s"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run screener benchmarks offline")
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), action="append",
+                        help="Run only these groups (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs for a fast smoke run")
+    parser.add_argument("--output", help="Write the JSON report to this file (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative slowdown of the median before failing")
+    args = parser.parse_args()
+
+    original_provider = fetch_data.get_provider()
+    results = {}
+    try:
+        for group in args.only or BENCHMARKS:
+            results.update(BENCHMARKS[group](args.quick))
+    finally:
+        fetch_data.set_provider(original_provider)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for name, base, cur, ratio in regressions:
+            print(f"REGRESSION {name}: {base * 1e3:.3f} ms -> {cur * 1e3:.3f} ms ({ratio:.2f}x)",
+                  file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions above {args.threshold:.0%}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
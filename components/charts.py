@@ -15,6 +15,33 @@ def plot_financial_chart(years, eps_values, fcf_values, revenue_values=None, net
     revenue_values (list): Optional revenue values
     net_income_values (list): Optional net income values
     """
+    fig, df, eps_growth, fcf_growth = build_financial_chart(
+        years, eps_values, fcf_values, revenue_values, net_income_values
+    )
+    
+    # Display in Streamlit
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Add metrics summary
+    if len(df) > 1:
+        with st.expander("📈 Ringkasan Pertumbuhan", expanded=False):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("EPS CAGR", 
+                          f"{calculate_cagr(df['EPS']):+.1f}%",
+                          f"{eps_growth[-1] if eps_growth[-1] else 0:+.1f}% YoY")
+            with col2:
+                st.metric("FCF CAGR", 
+                          f"{calculate_cagr(df['FCF']):+.1f}%",
+                          f"{fcf_growth[-1] if fcf_growth[-1] else 0:+.1f}% YoY")
+
+def build_financial_chart(years, eps_values, fcf_values, revenue_values=None, net_income_values=None):
+    """
+    Build the financial performance figure without rendering it
+    
+    Returns:
+    tuple: (plotly Figure, source DataFrame, EPS YoY growth list, FCF YoY growth list)
+    """
     # Create DataFrame with proper data handling
     df = pd.DataFrame({
         "Year": years,
@@ -159,21 +186,7 @@ def plot_financial_chart(years, eps_values, fcf_values, revenue_values=None, net
         font=dict(size=10, color="gray")
     )
     
-    # Display in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Add metrics summary
-    if len(df) > 1:
-        with st.expander("📈 Ringkasan Pertumbuhan", expanded=False):
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("EPS CAGR", 
-                          f"{calculate_cagr(df['EPS']):+.1f}%",
-                          f"{eps_growth[-1] if eps_growth[-1] else 0:+.1f}% YoY")
-            with col2:
-                st.metric("FCF CAGR", 
-                          f"{calculate_cagr(df['FCF']):+.1f}%",
-                          f"{fcf_growth[-1] if fcf_growth[-1] else 0:+.1f}% YoY")
+    return fig, df, eps_growth, fcf_growth
 
 def calculate_growth_rate(series):
     """Calculate year-over-year growth rates"""
@@ -195,6 +208,112 @@ def calculate_cagr(series):
     years = len(series) - 1
     return ((end / start) ** (1/years) - 1) * 100
 
+def plot_sensitivity_heatmap(grid, current_price=None, title="Sensitivitas Nilai Intrinsik"):
+    """
+    Render a DCF sensitivity grid as an interactive heatmap
+    
+    Parameters:
+    grid (pd.DataFrame): Output of dcf_sensitivity_grid (growth_rate x discount_rate).
+        For a 3-D grid pass a single terminal-growth slice, e.g. grid.xs(0.03)
+    current_price (float): Optional; cells above this value are shown as undervalued
+        and the colour scale is centred on it
+    title (str): Chart title
+    """
+    growth_labels = [f"{g * 100:.1f}%" for g in grid.index]
+    discount_labels = [f"{d * 100:.1f}%" for d in grid.columns]
+    values = grid.to_numpy()
+    
+    heatmap_kwargs = {}
+    if current_price:
+        heatmap_kwargs = dict(zmid=current_price)
+    
+    fig = go.Figure(
+        go.Heatmap(
+            z=values,
+            x=discount_labels,
+            y=growth_labels,
+            colorscale="RdYlGn",
+            colorbar=dict(title="Rp", tickformat=",.0f"),
+            hovertemplate="Growth %{y}<br>Discount %{x}<br>Nilai: Rp %{z:,.0f}<extra></extra>",
+            **heatmap_kwargs
+        )
+    )
+    
+    # Label angka hanya untuk grid kecil agar tetap terbaca
+    if values.size <= 49:
+        fig.update_traces(texttemplate="%{z:,.0f}", textfont=dict(size=10))
+    
+    fig.update_layout(
+        title=f"<b>{title}</b>",
+        title_x=0.03,
+        xaxis_title="Tingkat Diskonto",
+        yaxis_title="Pertumbuhan",
+        template="plotly_white",
+        margin=dict(t=60, b=60, l=60, r=60),
+        height=500
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+
+def plot_dcf_distribution(mc_result, current_price=None):
+    """
+    Render the intrinsic value histogram from dcf_monte_carlo
+    
+    Parameters:
+    mc_result (dict): Output of dcf_monte_carlo
+    current_price (float): Optional; drawn as a reference line
+    """
+    counts = mc_result["histogram"]["counts"]
+    edges = mc_result["histogram"]["edges"]
+    if len(counts) == 0:
+        st.info("Tidak ada simulasi valid untuk ditampilkan")
+        return
+    
+    centers = (edges[:-1] + edges[1:]) / 2
+    widths = np.diff(edges)
+    
+    fig = go.Figure(
+        go.Bar(
+            x=centers,
+            y=counts,
+            width=widths,
+            marker_color="#1f77b4",
+            opacity=0.8,
+            name="Simulasi",
+            hovertemplate="Nilai: Rp %{x:,.0f}<br>Jumlah: %{y:,}<extra></extra>"
+        )
+    )
+    
+    # Garis referensi: median, P5/P95 dan harga saat ini
+    pct = mc_result["percentiles"]
+    reference_lines = [
+        (pct.get(50), "Median", "#2c3e50", "solid"),
+        (pct.get(5), "P5", "#7f8c8d", "dot"),
+        (pct.get(95), "P95", "#7f8c8d", "dot"),
+        (current_price, "Harga", "#e74c3c", "dash")
+    ]
+    for value, label, color, dash in reference_lines:
+        if value is not None:
+            fig.add_vline(
+                x=value, line=dict(color=color, dash=dash, width=2),
+                annotation_text=label, annotation_position="top"
+            )
+    
+    fig.update_layout(
+        title="<b>Distribusi Nilai Intrinsik (Monte Carlo)</b>",
+        title_x=0.03,
+        xaxis_title="Nilai Intrinsik (Rp)",
+        yaxis_title="Jumlah Simulasi",
+        template="plotly_white",
+        bargap=0,
+        showlegend=False,
+        margin=dict(t=60, b=60, l=60, r=60),
+        height=400
+    )
+    fig.update_xaxes(tickformat=",.0f")
+    
+    st.plotly_chart(fig, use_container_width=True)
+
 # Example usage in Streamlit app
 if __name__ == "__main__":
     st.title("Analisis Kinerja Perusahaan")
@@ -0,0 +1 @@
+# Makes the top-level packages (data, analysis, utils, ...) importable from tests/
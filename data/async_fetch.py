@@ -0,0 +1,358 @@
+import asyncio
+import concurrent.futures
+import inspect
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from data.fetch_data import (
+    parse_stock_info, remember_stock_info, lookup_cached_stock_info, get_provider, run_coalesced_async
+)
+
+
+class ThrottledError(Exception):
+    """Upstream rejected the request because of rate limiting (HTTP 429)"""
+
+
+class CircuitOpenError(Exception):
+    """Request rejected locally because the circuit breaker is open"""
+
+
+# Error types worth retrying; anything else (bad ticker, parse error) fails immediately.
+# URLError covers network failures; its subclass HTTPError is checked by status code.
+RETRYABLE_ERRORS = (ThrottledError, ConnectionError, TimeoutError, asyncio.TimeoutError, urllib.error.URLError)
+
+# The HTTP clients yfinance uses raise their own connection/timeout types, which
+# derive from OSError rather than the built-in ConnectionError/TimeoutError
+try:
+    import requests.exceptions as _requests_errors
+    RETRYABLE_ERRORS += (_requests_errors.ConnectionError, _requests_errors.Timeout)
+except ImportError:
+    pass
+
+try:
+    import curl_cffi.requests.exceptions as _curl_errors
+    RETRYABLE_ERRORS += (_curl_errors.ConnectionError, _curl_errors.Timeout)
+except ImportError:
+    pass
+
+
+def _status_code(exc: Exception):
+    """HTTP status carried by the exception (urllib, requests/curl_cffi style), or None"""
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None) or getattr(exc, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_throttling_error(exc: Exception) -> bool:
+    """Recognize rate-limit errors by type (ours, yfinance's YFRateLimitError) or HTTP 429"""
+    if isinstance(exc, ThrottledError):
+        return True
+    if any("RateLimit" in cls.__name__ for cls in type(exc).__mro__):
+        return True
+    return _status_code(exc) == 429
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    """Throttling and transient errors; HTTP errors only for 429 and 5xx"""
+    if is_throttling_error(exc):
+        return True
+    code = _status_code(exc)
+    if code is not None:
+        return code >= 500
+    return isinstance(exc, RETRYABLE_ERRORS)
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket: `rate` tokens per second with bursts up to `capacity`
+
+    Parameters:
+    rate (float): Sustained requests per second
+    capacity (float): Maximum burst size
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate harus lebih besar dari 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available and take them"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Stops calling upstream after repeated failures
+
+    After `failure_threshold` consecutive failures the breaker opens and every
+    call fails fast for `reset_timeout` seconds. It then lets a single probe
+    through (half-open); success closes it, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not go upstream"""
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("circuit breaker open")
+            self.state = "half-open"
+            self._probe_in_flight = False
+        if self.state == "half-open":
+            if self._probe_in_flight:
+                raise CircuitOpenError("circuit breaker half-open, probe in flight")
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self._failures = 0
+        self._probe_in_flight = False
+        self.state = "closed"
+
+    def record_failure(self):
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == "half-open" or self._failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+
+def http_info_fetcher(base_url: str, timeout: float = 10.0):
+    """
+    Build a blocking fetcher that reads raw info payloads from `{base_url}/info/{ticker}`
+
+    Used with benchmarks/fake_quote_server.py to measure throughput and retry
+    behaviour under simulated 429 responses without touching Yahoo.
+    """
+    base_url = base_url.rstrip("/")
+
+    def fetch(ticker: str) -> dict:
+        try:
+            with urllib.request.urlopen(f"{base_url}/info/{ticker}", timeout=timeout) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                raise ThrottledError(f"HTTP 429 for {ticker}") from e
+            raise
+
+    return fetch
+
+
+class AsyncFetcher:
+    """
+    Asyncio fundamentals fetcher with rate limiting, retries and a circuit breaker
+
+    Parameters:
+    fetch_info (callable): Optional; fetch_info(ticker) -> raw yfinance-style info
+        dict, either a plain function (run in a worker thread) or a coroutine
+        function. Defaults to the active provider's fetch_info
+    rate (float): Sustained upstream requests per second (token bucket)
+    burst (float): Token bucket capacity
+    max_concurrency (int): Ceiling on simultaneous in-flight requests; blocking
+        fetchers run on a pool of this size, so attempts that time out but keep
+        running in their thread still count against it
+    max_retries (int): Retries per ticker for throttling/transient errors
+    base_delay (float): First backoff delay in seconds (doubles each retry, jittered)
+    max_delay (float): Upper bound for a single backoff delay
+    timeout (float): Per-attempt timeout in seconds
+    breaker (CircuitBreaker): Optional; shared breaker (a default one is created)
+    """
+
+    def __init__(
+        self,
+        fetch_info=None,
+        rate: float = 5.0,
+        burst: float = 10.0,
+        max_concurrency: int = 8,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        timeout: float = 30.0,
+        breaker: CircuitBreaker = None
+    ):
+        self.fetch_info = fetch_info
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {"requests": 0, "succeeded": 0, "failed": 0, "retries": 0, "throttled": 0}
+
+    def _backoff(self, attempt: int) -> float:
+        # Exponential backoff with "equal jitter": half fixed, half random
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _call(self, ticker: str, executor: concurrent.futures.Executor) -> dict:
+        fetch_info = self.fetch_info or get_provider().fetch_info
+        if inspect.iscoroutinefunction(fetch_info):
+            coro = fetch_info(ticker)
+        else:
+            # A thread cannot be cancelled on timeout; the bounded executor keeps
+            # abandoned attempts from piling up beyond max_concurrency
+            coro = asyncio.get_running_loop().run_in_executor(executor, fetch_info, ticker)
+        return await asyncio.wait_for(coro, timeout=self.timeout)
+
+    async def _fetch_one(self, ticker: str, bucket: TokenBucket, semaphore: asyncio.Semaphore,
+                         executor: concurrent.futures.Executor) -> dict:
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as e:
+                self.stats["failed"] += 1
+                return {"ticker": ticker, "error": str(e)}
+
+            await bucket.acquire()
+            async with semaphore:
+                self.stats["requests"] += 1
+                try:
+                    info = await self._call(ticker, executor)
+                except Exception as e:
+                    if is_throttling_error(e):
+                        self.stats["throttled"] += 1
+                    if is_retryable_error(e):
+                        self.breaker.record_failure()
+                        if attempt < self.max_retries:
+                            attempt += 1
+                            self.stats["retries"] += 1
+                            delay = self._backoff(attempt)
+                        else:
+                            self.stats["failed"] += 1
+                            return {"ticker": ticker, "error": f"{type(e).__name__}: {e}"}
+                    else:
+                        # Permanent error for this ticker, upstream itself is healthy
+                        self.breaker.record_success()
+                        self.stats["failed"] += 1
+                        return {"ticker": ticker, "error": str(e)}
+                else:
+                    self.breaker.record_success()
+                    try:
+                        result = parse_stock_info(ticker, info)
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        return {"ticker": ticker, "error": str(e)}
+                    self.stats["succeeded"] += 1
+                    return result
+            # Sleep outside the semaphore so other tickers keep flowing
+            await asyncio.sleep(delay)
+
+    async def _fetch_and_remember(self, ticker: str, bucket: TokenBucket, semaphore: asyncio.Semaphore,
+                                  executor: concurrent.futures.Executor) -> dict:
+        data = await self._fetch_one(ticker, bucket, semaphore, executor)
+        if "error" not in data:
+            remember_stock_info(ticker, data)
+        return data
+
+    async def fetch_many(self, tickers: list, use_cache: bool = True, progress_callback=None) -> dict:
+        """
+        Fetch many tickers concurrently; same return shape as get_stock_data
+
+        Cached/stored tickers are served without a request when use_cache is True,
+        and successful fetches are written back to the cache and store. A ticker
+        already being fetched elsewhere in the process (another session or
+        fetch_stock_info call) joins that fetch instead of requesting it again.
+        """
+        if use_cache:
+            results, pending = lookup_cached_stock_info(tickers)
+        else:
+            results, pending = {}, list(dict.fromkeys(tickers))
+
+        total = len(results) + len(pending)
+        if progress_callback is not None:
+            progress_callback(len(results), total)
+
+        bucket = TokenBucket(self.rate, self.burst)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        executor = concurrent.futures.ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="async-fetch")
+        try:
+            tasks = [
+                asyncio.create_task(run_coalesced_async(t, self._fetch_and_remember, t, bucket, semaphore, executor))
+                for t in pending
+            ]
+            for task in asyncio.as_completed(tasks):
+                data = dict(await task)
+                results[data["ticker"]] = data
+                if progress_callback is not None:
+                    progress_callback(len(results), total)
+        finally:
+            # Attempts abandoned on timeout finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+
+
+def _run_coroutine(coro):
+    """Run a coroutine to completion even if the calling thread already has a running loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    outcome = {}
+
+    def runner():
+        try:
+            outcome["result"] = asyncio.run(coro)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+async def get_stock_data_async(tickers: list, fetcher: AsyncFetcher = None, **kwargs) -> dict:
+    """
+    Async counterpart of get_stock_data
+
+    Parameters:
+    tickers (list): List of stock tickers (without .JK suffix)
+    fetcher (AsyncFetcher): Optional; preconfigured fetcher (default settings otherwise)
+    **kwargs: Passed to AsyncFetcher.fetch_many (use_cache, progress_callback)
+
+    Returns:
+    dict: {ticker: data_dict}
+    """
+    fetcher = fetcher or AsyncFetcher()
+    return await fetcher.fetch_many(tickers, **kwargs)
+
+
+def get_stock_data_throttled(tickers: list, fetcher: AsyncFetcher = None, **kwargs) -> dict:
+    """Blocking wrapper around get_stock_data_async with the same return shape as get_stock_data"""
+    return _run_coroutine(get_stock_data_async(tickers, fetcher, **kwargs))
@@ -1,81 +1,466 @@
-import yfinance as yf
+import asyncio
 import concurrent.futures
-from functools import lru_cache
+import os
+import threading
 import time
+import numpy as np
+from data.cache import TTLCache
+from data.records import FundamentalsTable, _parse_time
+from data.store import FundamentalsStore, DEFAULT_STORE_PATH
+from data.providers import DataProvider, provider_from_spec
+from data.singleflight import SingleFlight
+from utils.timing import span
 
-# Cache with 10-minute expiration (600 seconds) to reduce API calls
-@lru_cache(maxsize=128, typed=True)
-def get_cached_ticker(ticker: str, expiration: int = 600) -> yf.Ticker:
-    """Cache mechanism with expiration for Ticker objects"""
-    current_time = time.time()
-    if not hasattr(get_cached_ticker, "cache_times"):
-        get_cached_ticker.cache_times = {}
-    
-    if (ticker in get_cached_ticker.cache_times and 
-        current_time - get_cached_ticker.cache_times[ticker] < expiration):
-        return yf.Ticker(ticker)
-    
-    # Refresh cache
-    ticker_obj = yf.Ticker(ticker)
-    get_cached_ticker.cache_times[ticker] = current_time
-    return ticker_obj
+# Cache fundamentals for 10 minutes (600 seconds) to reduce API calls
+CACHE_TTL = 600
+CACHE_MAXSIZE = 1024
+_info_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+
+# Concurrent misses for the same ticker (several sessions opening BBCA at once,
+# or a session racing the refresher) share one upstream fetch
+_inflight = SingleFlight()
+
+# Quotes (price/volume) are a separate, much cheaper tier: fetched in bulk and
+# kept for QUOTE_TTL seconds, then overlaid on the slower fundamentals with
+# price-dependent ratios rescaled to the quoted price (see apply_quote)
+QUOTE_TTL = 120
+QUOTE_CHUNK_SIZE = 200
+_quote_cache = TTLCache(maxsize=8192, ttl=QUOTE_TTL)
+
+# Fields proportional to price (scaled by new/old) and inversely proportional
+PRICE_SCALED_FIELDS = ("PER", "PBV", "market_cap")
+PRICE_INVERSE_FIELDS = ("dividend_yield",)
+
+# Where raw info payloads come from; SCREENER_PROVIDER="synthetic:10000" or
+# "file:<dir>" runs the app offline (see data/providers.py)
+_provider = provider_from_spec(os.environ.get("SCREENER_PROVIDER", "yfinance"))
+
+# Persistent store shared by all workers; snapshots older than STORE_MAX_AGE
+# seconds are treated as stale and refetched. Set SCREENER_STORE_PATH="" to disable.
+# Offline providers do not persist unless a path is given explicitly, so fake
+# data never lands in the real store.
+STORE_MAX_AGE = 4 * 3600
+_store_path = os.environ.get(
+    "SCREENER_STORE_PATH", DEFAULT_STORE_PATH if _provider.name == "yfinance" else ""
+)
+_store = None
+_store_lock = threading.Lock()
+
+# Stale-while-revalidate: while a background refresher is registered (see
+# data/refresher.py), snapshots older than STORE_MAX_AGE but younger than
+# STALE_MAX_AGE are served immediately and handed to the refresher instead of
+# blocking the request. Stale hits stay in memory for STALE_CACHE_TTL seconds.
+STALE_MAX_AGE = 7 * 24 * 3600
+STALE_CACHE_TTL = 60
+_revalidate = None
+_access_listener = None
+
+def set_provider(provider: DataProvider) -> None:
+    """Swap the data provider used by fetch_stock_info and get_stock_data"""
+    global _provider
+    _provider = provider
+
+def get_provider() -> DataProvider:
+    """Return the active data provider"""
+    return _provider
 
-def fetch_stock_info(ticker: str) -> dict:
-    """Fetch comprehensive stock data with error handling and fallbacks"""
+BULK_CHUNK_SIZE = 500
+
+# The bundled list is a partial sample (about 80 liquid names), not every IDX
+# listing; point SCREENER_UNIVERSE at a complete export from idx.co.id to
+# screen the whole exchange.
+BUNDLED_UNIVERSE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "idx_tickers.txt")
+UNIVERSE_PATH = os.environ.get("SCREENER_UNIVERSE") or BUNDLED_UNIVERSE_PATH
+
+def is_bundled_universe() -> bool:
+    """True if load_universe() falls back to the partial list shipped with the app"""
+    return not _provider.list_tickers() and os.path.abspath(UNIVERSE_PATH) == BUNDLED_UNIVERSE_PATH
+
+def load_universe(path: str = None) -> list:
+    """
+    Load the list of IDX tickers used for universe screening
+
+    Parameters:
+    path (str): Optional; text file with one ticker per line, blank lines and
+        '#' comments are skipped. When omitted, a provider with its own universe
+        (file fixtures, synthetic) supplies it, otherwise UNIVERSE_PATH is read.
+
+    Returns:
+    list: Unique upper-case tickers in file order
+    """
+    if path is None:
+        provider_tickers = _provider.list_tickers()
+        if provider_tickers:
+            return list(dict.fromkeys(provider_tickers))
+        path = UNIVERSE_PATH
+
+    tickers = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            code = line.split("#", 1)[0].strip().upper()
+            if code:
+                tickers.append(code.replace(".JK", ""))
+    return list(dict.fromkeys(tickers))
+
+def configure_store(path: str = DEFAULT_STORE_PATH, max_age: float = None) -> None:
+    """
+    Point the read-through store at another file, or disable it with path=None
+
+    Parameters:
+    path (str): SQLite file location; None or "" disables persistence
+    max_age (float): Optional; new staleness limit in seconds
+    """
+    global _store, _store_path, STORE_MAX_AGE
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = None
+        _store_path = path or ""
+        if max_age is not None:
+            STORE_MAX_AGE = max_age
+
+def get_store():
+    """Return the shared FundamentalsStore (created lazily), or None if disabled"""
+    global _store
+    if not _store_path:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = FundamentalsStore(_store_path)
+                except Exception as e:
+                    print(f"Error opening fundamentals store {_store_path}: {str(e)}")
+                    return None
+    return _store
+
+def set_revalidator(revalidate=None, on_access=None) -> None:
+    """
+    Register background refresh hooks (None unregisters)
+
+    Parameters:
+    revalidate (callable): revalidate(ticker) queues a background refetch; while
+        set, stale snapshots are served instead of fetching on the request path
+    on_access (callable): on_access(ticker) is called for every fetch_stock_info
+        request, used to prioritize frequently viewed tickers
+    """
+    global _revalidate, _access_listener
+    _revalidate = revalidate
+    _access_listener = on_access
+
+def data_age(data: dict) -> float:
+    """Seconds since a fetch_stock_info result was fetched (None if unknown)"""
     try:
-        yf_ticker = get_cached_ticker(ticker + ".JK")
-        info = yf_ticker.info
-        
-        # Get price with multiple fallbacks
-        price = (info.get("currentPrice") or 
-                info.get("regularMarketPrice") or 
-                info.get("previousClose") or 
-                info.get("open") or 0)
-        
-        # Calculate Free Cash Flow if not available
-        fcf = info.get("freeCashflow")
-        if not fcf:
-            op_cashflow = info.get("operatingCashflow", 0)
-            capex = abs(info.get("capitalExpenditures", 0))
-            fcf = op_cashflow - capex if op_cashflow and capex else None
-
-        # Handle missing values and calculate metrics
-        roe = info.get("returnOnEquity")
-        roe = roe * 100 if roe else None
-        
-        eps_growth = info.get("earningsQuarterlyGrowth")
-        eps_growth = eps_growth * 100 if eps_growth else None
-        
-        der = info.get("debtToEquity")
-        der = der / 100 if der else None  # Convert to decimal
-        
-        # Get additional fundamental data
-        dividend_yield = info.get("dividendYield", 0) * 100 if info.get("dividendYield") else 0
-        current_ratio = info.get("currentRatio")
-        quick_ratio = info.get("quickRatio")
-        profit_margin = info.get("profitMargins", 0) * 100 if info.get("profitMargins") else None
-        beta = info.get("beta")
-        
-        return {
-            "ticker": ticker,
-            "price": price,
-            "PER": info.get("trailingPE"),
-            "PBV": info.get("priceToBook"),
-            "ROE": roe,
-            "DER": der,
-            "EPS_Growth": eps_growth,
-            "FCF": fcf,
-            "dividend_yield": dividend_yield,
-            "current_ratio": current_ratio,
-            "quick_ratio": quick_ratio,
-            "profit_margin": profit_margin,
-            "beta": beta,
-            "market_cap": info.get("marketCap"),
-            "volume": info.get("volume"),
-            "currency": info.get("currency", "IDR"),
-            "last_updated": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
+        fetched_at = time.mktime(time.strptime(data["last_updated"], "%Y-%m-%d %H:%M:%S"))
+    except (KeyError, TypeError, ValueError):
+        return None
+    return max(time.time() - fetched_at, 0.0)
+
+def is_stale(data: dict) -> bool:
+    """True if the result is older than STORE_MAX_AGE (a refresh is due)"""
+    age = data_age(data)
+    return age is not None and age > STORE_MAX_AGE
+
+def _load_from_store(ticker: str):
+    store = get_store()
+    if store is None:
+        return None
+    revalidate = _revalidate
+    max_age = STALE_MAX_AGE if revalidate is not None else STORE_MAX_AGE
+    try:
+        hit = store.get_latest(ticker, max_age=max_age)
+    except Exception as e:
+        print(f"Error reading store for {ticker}: {str(e)}")
+        return None
+    if hit is None:
+        return None
+    data, fetched_at = hit
+    _cache_stored(ticker, data, time.time() - fetched_at > STORE_MAX_AGE, revalidate)
+    return data
+
+def _cache_stored(ticker: str, data: dict, stale: bool, revalidate) -> None:
+    """Cache a store row; stale rows get STALE_CACHE_TTL and go to `revalidate` if one was registered"""
+    if not stale:
+        _info_cache.set(ticker, data)
+        return
+    _info_cache.set(ticker, data, ttl=STALE_CACHE_TTL)
+    # The hook is read once before the query: without a refresher a stale row
+    # only gets here by ageing past STORE_MAX_AGE after it, and is served once
+    # until the short TTL forces a refetch
+    if revalidate is not None:
+        revalidate(ticker)
+
+def _save_to_store(ticker: str, data: dict) -> None:
+    store = get_store()
+    if store is None:
+        return
+    try:
+        store.put(ticker, data)
+    except Exception as e:
+        print(f"Error writing store for {ticker}: {str(e)}")
+
+def fetch_stock_info(ticker: str, use_cache: bool = True) -> dict:
+    """
+    Fetch comprehensive stock data with error handling and fallbacks
+
+    Lookup order: in-memory cache (CACHE_TTL), then the persistent store
+    (snapshots younger than STORE_MAX_AGE), then yfinance. Successful fetches
+    are written to both; errors are never cached so the next call retries.
+    Pass use_cache=False to bypass both layers and force a refetch.
+
+    With a refresher registered (set_revalidator), older snapshots up to
+    STALE_MAX_AGE are returned at once and refreshed in the background; use
+    is_stale/data_age on the result to show how old it is.
+    """
+    if _access_listener is not None:
+        _access_listener(ticker)
+    if use_cache:
+        cached = _info_cache.get(ticker)
+        if cached is not None:
+            return _with_quote(cached)
+        stored = _load_from_store(ticker)
+        if stored is not None:
+            return _with_quote(stored)
+
+    return dict(_inflight.do(ticker, _fetch_and_remember, ticker))
+
+async def fetch_stock_info_async(ticker: str, use_cache: bool = True) -> dict:
+    """Async fetch_stock_info; the fetch runs in a worker thread and joins in-flight calls"""
+    if _access_listener is not None:
+        _access_listener(ticker)
+    if use_cache:
+        cached = _info_cache.get(ticker)
+        if cached is not None:
+            return _with_quote(cached)
+        stored = await asyncio.to_thread(_load_from_store, ticker)
+        if stored is not None:
+            return _with_quote(stored)
+
+    return dict(await _inflight.do_async(ticker, _fetch_and_remember, ticker))
+
+def refresh_stock_info(ticker: str) -> dict:
+    """
+    Refetch a ticker and write it through to the cache and store
+
+    Same as fetch_stock_info(ticker, use_cache=False) but not counted as a user
+    access; used by the background refresher.
+    """
+    return dict(_inflight.do(ticker, _fetch_and_remember, ticker))
+
+def _fetch_and_remember(ticker: str) -> dict:
+    # Runs once per in-flight ticker; every coalesced caller gets this result
+    result = _fetch_stock_info(ticker)
+    if "error" not in result:
+        remember_stock_info(ticker, result)
+    return result
+
+async def run_coalesced_async(ticker: str, func, *args):
+    """
+    Run func(*args) as the single in-flight fundamentals fetch for ticker
+
+    For async fetchers with their own retry logic: concurrent fetch_stock_info
+    callers and other tasks for the same ticker share the outcome. func must
+    return a fetch_stock_info-shaped dict and write successes to the cache
+    itself (e.g. via remember_stock_info).
+    """
+    return await _inflight.do_async(ticker, func, *args)
+
+def coalescing_stats() -> dict:
+    """How many fundamentals fetches ran upstream vs. joined an in-flight fetch"""
+    return _inflight.stats()
+
+def remember_stock_info(ticker: str, data: dict) -> None:
+    """Write a freshly fetched result into the memory cache and the persistent store"""
+    _info_cache.set(ticker, data)
+    _save_to_store(ticker, data)
+
+def lookup_cached_stock_info(tickers: list, revalidate: bool = True):
+    """
+    Resolve tickers from the memory cache and the store without hitting yfinance
+
+    Parameters:
+    tickers (list): Tickers to resolve
+    revalidate (bool): Queue stale store rows for a background refresh and
+        cache them briefly (request path). False only reads, for periodic
+        consumers that must not trigger refetches (e.g. the alert listener).
+
+    Returns:
+    tuple: ({ticker: data_dict} for hits, [tickers still to fetch])
+    """
+    results = {}
+    pending = []
+    for ticker in dict.fromkeys(tickers):
+        cached = _info_cache.get(ticker)
+        if cached is not None:
+            results[ticker] = _with_quote(cached)
+        else:
+            pending.append(ticker)
+
+    store = get_store()
+    if store is not None and pending:
+        revalidator = _revalidate
+        try:
+            stored = store.get_many(
+                pending, max_age=STALE_MAX_AGE if revalidator is not None else STORE_MAX_AGE
+            )
+        except Exception as e:
+            print(f"Error reading store: {str(e)}")
+            stored = {}
+        fresh_after = time.time() - STORE_MAX_AGE
+        for ticker, (data, fetched_at) in stored.items():
+            stale = fetched_at < fresh_after
+            if revalidate or not stale:
+                _cache_stored(ticker, data, stale, revalidator)
+            results[ticker] = _with_quote(data)
+        pending = [t for t in pending if t not in stored]
+
+    return results, pending
+
+def fetch_quotes(tickers: list, use_cache: bool = True) -> dict:
+    """
+    Latest price and volume for many tickers from the provider's bulk quote endpoint
+
+    Quotes are cached for QUOTE_TTL seconds and picked up automatically by
+    fetch_stock_info, lookup_cached_stock_info and with_latest_quotes.
+
+    Returns:
+    dict: {ticker: {"price", "volume", "quoted_at"}}; failed tickers are omitted
+    """
+    results = {}
+    pending = []
+    for ticker in dict.fromkeys(tickers):
+        cached = _quote_cache.get(ticker) if use_cache else None
+        if cached is not None:
+            results[ticker] = cached
+        else:
+            pending.append(ticker)
+
+    provider = _provider
+    for start in range(0, len(pending), QUOTE_CHUNK_SIZE):
+        chunk = pending[start:start + QUOTE_CHUNK_SIZE]
+        try:
+            with span("provider.fetch_quotes"):
+                batch = provider.fetch_quotes(chunk)
+        except Exception as e:
+            print(f"Error fetching quotes: {str(e)}")
+            continue
+        quoted_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        fresh = {}
+        for ticker, quote in batch.items():
+            if isinstance(quote, Exception) or not quote.get("price"):
+                continue
+            quote = dict(quote, quoted_at=quoted_at)
+            _quote_cache.set(ticker, quote)
+            fresh[ticker] = quote
+        results.update(fresh)
+        _save_quotes(fresh)
+    return results
+
+def _save_quotes(quotes: dict) -> None:
+    store = get_store()
+    if store is None or not quotes:
+        return
+    try:
+        store.put_quotes(quotes)
+    except Exception as e:
+        print(f"Error writing quotes to store: {str(e)}")
+
+def load_stored_quotes(tickers: list) -> dict:
+    """
+    Load quotes another process wrote to the store into the quote cache
+
+    Lets processes that do not run the intraday job (see BackgroundRefresher)
+    pick up its quotes without calling the provider themselves.
+
+    Returns:
+    dict: {ticker: quote} for tickers quoted within QUOTE_TTL seconds
+    """
+    store = get_store()
+    if store is None:
+        return {}
+    try:
+        quotes = store.get_quotes(tickers, max_age=QUOTE_TTL)
+    except Exception as e:
+        print(f"Error reading quotes from store: {str(e)}")
+        return {}
+    for ticker, quote in quotes.items():
+        _quote_cache.set(ticker, quote)
+    return quotes
+
+def apply_quote(data: dict, quote: dict) -> dict:
+    """
+    Overlay a quote on a fetch_stock_info result
+
+    PER, PBV and market cap scale with price and dividend yield inversely, so
+    they are rescaled by new_price / snapshot_price instead of refetched.
+    Earnings, book value and share count only change with a new report.
+
+    Returns:
+    dict: Copy of data with price, volume, rescaled ratios and "price_updated"
+    """
+    result = dict(data)
+    new_price = quote.get("price")
+    old_price = data.get("price")
+    if not new_price:
+        return result
+    if old_price:
+        ratio = new_price / old_price
+        for field in PRICE_SCALED_FIELDS:
+            if result.get(field) is not None:
+                result[field] = result[field] * ratio
+        for field in PRICE_INVERSE_FIELDS:
+            if result.get(field) is not None:
+                result[field] = result[field] / ratio
+    result["price"] = new_price
+    if quote.get("volume") is not None:
+        result["volume"] = quote["volume"]
+    result["price_updated"] = quote.get("quoted_at")
+    return result
+
+def _with_quote(data: dict) -> dict:
+    quote = _quote_cache.get(data.get("ticker"))
+    # Timestamps share one format, so string comparison orders them
+    if quote is not None and quote["quoted_at"] > (data.get("last_updated") or ""):
+        return apply_quote(data, quote)
+    return dict(data)
+
+def with_latest_quotes(stock_data):
+    """
+    Apply cached quotes to a {ticker: data_dict} mapping (errors pass through)
+    or to a FundamentalsTable (returns a new table)
+    """
+    if isinstance(stock_data, FundamentalsTable):
+        n = len(stock_data)
+        prices, volumes, quoted_at = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+        for i, ticker in enumerate(stock_data.tickers):
+            quote = _quote_cache.get(ticker)
+            if quote is not None:
+                prices[i] = quote.get("price") or np.nan
+                volumes[i] = quote["volume"] if quote.get("volume") is not None else np.nan
+                quoted_at[i] = _parse_time(quote["quoted_at"])
+        return stock_data.with_quotes(prices, volumes, quoted_at, PRICE_SCALED_FIELDS, PRICE_INVERSE_FIELDS)
+    return {
+        ticker: _with_quote(data) if data and "error" not in data else data
+        for ticker, data in stock_data.items()
+    }
+
+def invalidate_stock_info(ticker: str = None) -> None:
+    """Drop cached fundamentals for one ticker, or for all tickers if None"""
+    if ticker is None:
+        _info_cache.clear()
+    else:
+        _info_cache.invalidate(ticker)
+
+def cache_stats() -> dict:
+    """Return hit/miss/eviction counters of the fundamentals cache"""
+    return _info_cache.stats()
+
+def _fetch_stock_info(ticker: str) -> dict:
+    """Fetch and normalize info for a single ticker from the active provider (no caching)"""
+    try:
+        with span("provider.fetch_info"):
+            info = _provider.fetch_info(ticker)
+        return parse_stock_info(ticker, info)
     except Exception as e:
         print(f"Error fetching data for {ticker}: {str(e)}")
         return {
@@ -83,30 +468,138 @@ def fetch_stock_info(ticker: str) -> dict:
             "error": str(e)
         }
 
-def get_stock_data(tickers: list, max_workers: int = 8) -> dict:
-    """
-    Fetch data for multiple stocks concurrently with enhanced error handling
+def parse_stock_info(ticker: str, info: dict) -> dict:
+    """Normalize a raw yfinance info payload into the fetch_stock_info result shape"""
+    # Get price with multiple fallbacks
+    price = (info.get("currentPrice") or 
+            info.get("regularMarketPrice") or 
+            info.get("previousClose") or 
+            info.get("open") or 0)
+    
+    # Calculate Free Cash Flow if not available
+    fcf = info.get("freeCashflow")
+    if not fcf:
+        op_cashflow = info.get("operatingCashflow", 0)
+        capex = abs(info.get("capitalExpenditures", 0))
+        fcf = op_cashflow - capex if op_cashflow and capex else None
+
+    # Handle missing values and calculate metrics
+    roe = info.get("returnOnEquity")
+    roe = roe * 100 if roe else None
+    
+    eps_growth = info.get("earningsQuarterlyGrowth")
+    eps_growth = eps_growth * 100 if eps_growth else None
+    
+    der = info.get("debtToEquity")
+    der = der / 100 if der else None  # Convert to decimal
+    
+    # Get additional fundamental data
+    dividend_yield = info.get("dividendYield", 0) * 100 if info.get("dividendYield") else 0
+    current_ratio = info.get("currentRatio")
+    quick_ratio = info.get("quickRatio")
+    profit_margin = info.get("profitMargins", 0) * 100 if info.get("profitMargins") else None
+    beta = info.get("beta")
     
+    return {
+        "ticker": ticker,
+        "price": price,
+        "PER": info.get("trailingPE"),
+        "PBV": info.get("priceToBook"),
+        "ROE": roe,
+        "DER": der,
+        "EPS_Growth": eps_growth,
+        "FCF": fcf,
+        "dividend_yield": dividend_yield,
+        "current_ratio": current_ratio,
+        "quick_ratio": quick_ratio,
+        "profit_margin": profit_margin,
+        "beta": beta,
+        "market_cap": info.get("marketCap"),
+        "volume": info.get("volume"),
+        "currency": info.get("currency", "IDR"),
+        "last_updated": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def iter_stock_data(tickers: list, max_workers: int = 8):
+    """
+    Yield (ticker, data_dict) pairs as soon as each result is available
+
+    Cached and stored tickers are yielded first, then fetched tickers in
+    completion order, so callers can render the first rows without waiting
+    for the slowest ticker. Closing the generator early cancels fetches that
+    have not started yet.
+
     Parameters:
     tickers (list): List of stock tickers (without .JK suffix)
     max_workers (int): Number of concurrent threads
-    
-    Returns:
-    dict: {ticker: data_dict}
     """
-    results = {}
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    results, pending = lookup_cached_stock_info(tickers)
+    yield from results.items()
+    if not pending:
+        return
+
+    provider = _provider
+    if provider.bulk:
+        # Local providers answer whole batches at once; no thread per ticker needed
+        for start in range(0, len(pending), BULK_CHUNK_SIZE):
+            chunk = pending[start:start + BULK_CHUNK_SIZE]
+            try:
+                with span("provider.fetch_batch"):
+                    batch = provider.fetch_batch(chunk)
+            except Exception as e:
+                # A failed batch fails its tickers only; later chunks still run
+                print(f"Error fetching batch of {len(chunk)} tickers: {str(e)}")
+                for ticker in chunk:
+                    yield ticker, {"ticker": ticker, "error": str(e)}
+                continue
+            for ticker, info in batch.items():
+                try:
+                    if isinstance(info, Exception):
+                        raise info
+                    data = parse_stock_info(ticker, info)
+                except Exception as e:
+                    yield ticker, {"ticker": ticker, "error": str(e)}
+                    continue
+                remember_stock_info(ticker, data)
+                yield ticker, dict(data)
+        return
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
         future_to_ticker = {
             executor.submit(fetch_stock_info, ticker): ticker 
-            for ticker in tickers
+            for ticker in pending
         }
         
         for future in concurrent.futures.as_completed(future_to_ticker):
             ticker = future_to_ticker[future]
             try:
-                results[ticker] = future.result()
+                data = future.result()
             except Exception as e:
-                results[ticker] = {"ticker": ticker, "error": str(e)}
+                data = {"ticker": ticker, "error": str(e)}
+            yield ticker, data
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def get_stock_data(tickers: list, max_workers: int = 8, progress_callback=None) -> dict:
+    """
+    Fetch data for multiple stocks concurrently with enhanced error handling
+    
+    Parameters:
+    tickers (list): List of stock tickers (without .JK suffix)
+    max_workers (int): Number of concurrent threads
+    progress_callback (callable): Optional; called as progress_callback(done, total)
+        after every ticker (cached or fetched)
+    
+    Returns:
+    dict: {ticker: data_dict}
+    """
+    results = {}
+    total = len(dict.fromkeys(tickers))
+    
+    for ticker, data in iter_stock_data(tickers, max_workers=max_workers):
+        results[ticker] = data
+        if progress_callback is not None:
+            progress_callback(len(results), total)
     
     return results
@@ -0,0 +1,112 @@
+import pandas as pd
+from data.cache import TTLCache
+from data.fetch_data import get_provider
+from utils.timing import span
+
+# Statements only change when a company reports (quarterly), so keep them for a day
+STATEMENTS_TTL = 24 * 3600
+_statements_cache = TTLCache(maxsize=512, ttl=STATEMENTS_TTL)
+
+STATEMENT_COLUMNS = ["period", "year", "Revenue", "Net Income", "EPS", "Operating Cash Flow", "FCF"]
+
+# yfinance row labels in order of preference for each normalized column
+_INCOME_ROWS = {
+    "Revenue": ["Total Revenue", "Operating Revenue"],
+    "Net Income": ["Net Income", "Net Income Common Stockholders"],
+    "EPS": ["Diluted EPS", "Basic EPS"],
+}
+_CASHFLOW_ROWS = {
+    "Operating Cash Flow": ["Operating Cash Flow", "Cash Flow From Continuing Operating Activities"],
+    "Capital Expenditure": ["Capital Expenditure"],
+    "FCF": ["Free Cash Flow"],
+}
+
+
+def _pick_rows(statement: pd.DataFrame, mapping: dict) -> pd.DataFrame:
+    """Select the first available yfinance row for each field, one column per field"""
+    picked = {}
+    for field, candidates in mapping.items():
+        for label in candidates:
+            if statement is not None and label in statement.index:
+                picked[field] = pd.to_numeric(statement.loc[label], errors="coerce")
+                break
+    return pd.DataFrame(picked)
+
+
+def normalize_statements(income: pd.DataFrame, cashflow: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert yfinance income and cash-flow statements into one compact frame
+
+    Parameters:
+    income (pd.DataFrame): yfinance income statement (rows = items, columns = period end)
+    cashflow (pd.DataFrame): yfinance cash-flow statement in the same layout
+
+    Returns:
+    pd.DataFrame: One row per period, oldest first, with STATEMENT_COLUMNS as float64
+        (except period/year); missing items are NaN
+    """
+    frame = _pick_rows(income, _INCOME_ROWS).join(_pick_rows(cashflow, _CASHFLOW_ROWS), how="outer")
+    if frame.empty:
+        return pd.DataFrame(columns=STATEMENT_COLUMNS)
+
+    # Free Cash Flow = Operating Cash Flow + Capital Expenditure (capex is reported negative)
+    if "Operating Cash Flow" in frame and "Capital Expenditure" in frame:
+        derived_fcf = frame["Operating Cash Flow"] - frame["Capital Expenditure"].abs()
+        frame["FCF"] = frame["FCF"].fillna(derived_fcf) if "FCF" in frame else derived_fcf
+
+    frame.index = pd.to_datetime(frame.index)
+    frame = frame.sort_index()
+    frame["period"] = frame.index
+    frame["year"] = frame.index.year
+    frame = frame.reindex(columns=STATEMENT_COLUMNS).reset_index(drop=True)
+    value_cols = STATEMENT_COLUMNS[2:]
+    frame[value_cols] = frame[value_cols].astype("float64")
+    # Drop periods yfinance lists without any data
+    return frame.dropna(how="all", subset=value_cols).reset_index(drop=True)
+
+
+def fetch_financial_statements(ticker: str, frequency: str = "annual", use_cache: bool = True) -> pd.DataFrame:
+    """
+    Fetch annual or quarterly income/cash-flow history for a ticker
+
+    Results are cached for STATEMENTS_TTL seconds. These calls are much heavier
+    than fetch_stock_info, so callers should only invoke this when the data is
+    actually displayed. Statements come from the active data provider (see
+    data.fetch_data.set_provider). Errors return an empty frame and are not cached.
+
+    Parameters:
+    ticker (str): Stock ticker (without .JK suffix)
+    frequency (str): "annual" or "quarterly"
+    use_cache (bool): Set False to force a refetch
+
+    Returns:
+    pd.DataFrame: See normalize_statements
+    """
+    if frequency not in ("annual", "quarterly"):
+        raise ValueError("frequency harus 'annual' atau 'quarterly'")
+
+    key = (ticker, frequency)
+    if use_cache:
+        cached = _statements_cache.get(key)
+        if cached is not None:
+            return cached.copy()
+
+    try:
+        with span("provider.statements"):
+            income, cashflow = get_provider().fetch_statements(ticker, frequency)
+        frame = normalize_statements(income, cashflow)
+    except Exception as e:
+        print(f"Error fetching statements for {ticker}: {str(e)}")
+        return pd.DataFrame(columns=STATEMENT_COLUMNS)
+
+    _statements_cache.set(key, frame)
+    return frame.copy()
+
+
+def invalidate_financial_statements(ticker: str = None) -> None:
+    """Drop cached statements for one ticker (both frequencies), or all if None"""
+    if ticker is None:
+        _statements_cache.clear()
+    else:
+        _statements_cache.invalidate((ticker, "annual"))
+        _statements_cache.invalidate((ticker, "quarterly"))
@@ -0,0 +1,346 @@
+import contextlib
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from utils.timing import span
+
+DEFAULT_PRICES_DIR = os.path.join(os.path.expanduser("~"), ".cache", "screener", "prices")
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+# How far back the first download goes
+HISTORY_YEARS = 5
+HISTORY_CHUNK_SIZE = 100
+
+
+class PriceHistoryStore:
+    """
+    Daily OHLCV history as memory-mapped float64 arrays, one file per field
+
+    Each `<field>.f64` file holds a (days, tickers) matrix with one row per
+    trading day, so appending new days only writes to the end of the files and
+    a trailing window (e.g. the last 252 days for all tickers) is one
+    contiguous block on disk. Missing values are NaN. `meta.json` holds the
+    ticker columns and the day count and is replaced atomically after the data
+    files are written, so readers never see half-appended rows.
+
+    Several processes may share the directory: writers hold an exclusive
+    flock on `.lock` and reload meta.json before changing anything, and readers
+    take a shared lock and reload meta.json whenever it changed on disk, so a
+    mapping always matches the width and length it was opened with.
+
+    Parameters:
+    directory (str): Folder for the field files and meta.json
+    """
+
+    def __init__(self, directory: str = DEFAULT_PRICES_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._meta_key = None
+        with self._file_lock(shared=True):
+            self._load_meta()
+
+    # ---- metadata ----
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, "meta.json")
+
+    def _field_path(self, field: str) -> str:
+        return os.path.join(self.directory, f"{field}.f64")
+
+    def _dates_path(self) -> str:
+        return os.path.join(self.directory, "dates.i8")
+
+    @contextlib.contextmanager
+    def _file_lock(self, shared: bool = False):
+        """flock on <directory>/.lock shared between processes (no-op without fcntl)"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @contextlib.contextmanager
+    def _reading(self):
+        """Consistent view for readers: current meta, no writer in between"""
+        with self._lock, self._file_lock(shared=True):
+            self._sync_meta()
+            yield
+
+    def _stat_meta(self):
+        try:
+            st = os.stat(self._meta_path())
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _sync_meta(self):
+        if self._stat_meta() != self._meta_key:
+            self._load_meta()
+
+    def _load_meta(self):
+        self._meta_key = self._stat_meta()
+        try:
+            with open(self._meta_path(), encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = {"tickers": [], "n_days": 0}
+        self.tickers = list(meta["tickers"])
+        self.n_days = int(meta["n_days"])
+        self._columns = {t: i for i, t in enumerate(self.tickers)}
+
+    def _write_meta(self, tickers: list, n_days: int):
+        tmp = self._meta_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"tickers": tickers, "n_days": n_days, "fields": list(PRICE_FIELDS)}, f)
+        os.replace(tmp, self._meta_path())
+        self._meta_key = self._stat_meta()
+        self.tickers = list(tickers)
+        self.n_days = n_days
+        self._columns = {t: i for i, t in enumerate(self.tickers)}
+
+    def refresh(self):
+        """Re-read meta.json to see days appended by another process"""
+        with self._reading():
+            pass
+
+    # ---- reading ----
+
+    def _dates(self) -> np.ndarray:
+        if self.n_days == 0:
+            return np.empty(0, dtype="datetime64[D]")
+        days = np.memmap(self._dates_path(), dtype=np.int64, mode="r", shape=(self.n_days,))
+        return np.asarray(days).astype("datetime64[D]")
+
+    def _field(self, name: str) -> np.ndarray:
+        if name not in PRICE_FIELDS:
+            raise ValueError(f"Field harga tidak dikenal: {name}")
+        if self.n_days == 0 or not self.tickers:
+            return np.empty((0, len(self.tickers)))
+        return np.memmap(
+            self._field_path(name), dtype=np.float64, mode="r", shape=(self.n_days, len(self.tickers))
+        )
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Trading days as datetime64[D], oldest first"""
+        with self._reading():
+            return self._dates()
+
+    @property
+    def last_date(self):
+        """Most recent stored day (numpy datetime64) or None if empty"""
+        with self._reading():
+            dates = self._dates()
+        return dates[-1] if len(dates) else None
+
+    def field(self, name: str) -> np.ndarray:
+        """
+        Read-only memory-mapped (days, tickers) matrix for one field
+
+        The mapping keeps the shape it was opened with; later appends or new
+        ticker columns from other writers show up on the next call.
+        """
+        with self._reading():
+            return self._field(name)
+
+    def window(self, name: str, days: int) -> np.ndarray:
+        """Last `days` rows of a field (still memory-mapped)"""
+        with self._reading():
+            return self._field(name)[max(self.n_days - days, 0):]
+
+    def windows(self, days: dict) -> tuple:
+        """
+        Trailing windows of several fields plus the ticker columns, from one view
+
+        Separate window() calls can straddle another writer's append and
+        return blocks of different widths or a ticker list that no longer
+        matches the columns.
+
+        Parameters:
+        days (dict): {field: number of trailing rows}
+
+        Returns:
+        tuple: ({field: memory-mapped block}, tickers)
+        """
+        with self._reading():
+            blocks = {name: self._field(name)[max(self.n_days - n, 0):] for name, n in days.items()}
+            return blocks, list(self.tickers)
+
+    def series(self, ticker: str, name: str = "close") -> pd.Series:
+        """History of one ticker as a Series indexed by date"""
+        with self._reading():
+            column = self._columns[ticker]
+            values = np.array(self._field(name)[:, column])
+            dates = self._dates()
+        return pd.Series(values, index=pd.DatetimeIndex(dates), name=ticker)
+
+    # ---- writing ----
+
+    def _widen(self, tickers: list):
+        """Rewrite the field files with extra ticker columns (rare: universe changes)"""
+        old_width = len(self.tickers)
+        new_width = len(tickers)
+        if self.n_days == 0:
+            self._write_meta(tickers, 0)
+            return
+        for name in PRICE_FIELDS:
+            path = self._field_path(name)
+            tmp = path + ".tmp"
+            out = np.memmap(tmp, dtype=np.float64, mode="w+", shape=(self.n_days, new_width))
+            out[:] = np.nan
+            if old_width:
+                src = self._field(name)
+                # Copy in row blocks to keep memory bounded
+                for start in range(0, self.n_days, 1024):
+                    out[start:start + 1024, :old_width] = src[start:start + 1024]
+            out.flush()
+            del out
+            os.replace(tmp, path)
+        self._write_meta(tickers, self.n_days)
+
+    def append(self, frames: dict) -> int:
+        """
+        Add new trading days and fill in stored ones
+
+        Parameters:
+        frames (dict): {field: DataFrame} with a date index and one column per
+            ticker. Days after the last stored day are appended. Values for days
+            already stored are written in place where not NaN, which completes
+            an intraday last bar and back-fills tickers added later. Days before
+            the first stored day, or missing from the stored calendar, are ignored.
+            Unknown tickers become new columns.
+
+        Returns:
+        int: Number of days appended
+        """
+        frames = {name: frame for name, frame in frames.items() if name in PRICE_FIELDS and not frame.empty}
+        if not frames:
+            return 0
+        with self._lock, self._file_lock():
+            # Another process may have appended or widened since our last read
+            self._load_meta()
+            index = None
+            columns = []
+            for frame in frames.values():
+                index = frame.index if index is None else index.union(frame.index)
+                columns.extend(frame.columns)
+            index = pd.DatetimeIndex(index).sort_values()
+            dates = index.normalize().values.astype("datetime64[D]")
+
+            stored = self._dates()
+            if len(stored):
+                is_new = dates > stored[-1]
+                rows = np.searchsorted(stored, dates).clip(max=len(stored) - 1)
+                in_place = ~is_new & (stored[rows] == dates)
+            else:
+                is_new = np.ones(len(dates), dtype=bool)
+                rows = np.zeros(len(dates), dtype=np.intp)
+                in_place = np.zeros(len(dates), dtype=bool)
+            if not is_new.any() and not in_place.any():
+                return 0
+
+            new_tickers = [t for t in dict.fromkeys(columns) if t not in self._columns]
+            if new_tickers:
+                self._widen(self.tickers + new_tickers)
+            width = len(self.tickers)
+
+            for name in PRICE_FIELDS:
+                frame = frames.get(name)
+                path = self._field_path(name)
+                if frame is not None:
+                    cols = np.array([self._columns[t] for t in frame.columns])
+                    values = frame.set_axis(pd.DatetimeIndex(frame.index)).reindex(index).to_numpy(dtype=np.float64)
+                if frame is not None and in_place.any():
+                    current = np.memmap(path, dtype=np.float64, mode="r+", shape=(self.n_days, width))
+                    target = np.ix_(rows[in_place], cols)
+                    update = values[in_place]
+                    current[target] = np.where(np.isnan(update), current[target], update)
+                    current.flush()
+                    del current
+                if is_new.any():
+                    block = np.full((int(is_new.sum()), width), np.nan)
+                    if frame is not None:
+                        block[:, cols] = values[is_new]
+                    with open(path, "ab") as f:
+                        f.write(block.tobytes())
+
+            n_new = int(is_new.sum())
+            if n_new:
+                with open(self._dates_path(), "ab") as f:
+                    f.write(dates[is_new].astype(np.int64).tobytes())
+            self._write_meta(self.tickers, self.n_days + n_new)
+            return n_new
+
+
+_price_store = None
+_price_store_lock = threading.Lock()
+
+
+def get_price_store(directory: str = None) -> PriceHistoryStore:
+    """Shared PriceHistoryStore (SCREENER_PRICES_DIR or DEFAULT_PRICES_DIR)"""
+    global _price_store
+    with _price_store_lock:
+        if _price_store is None or (directory and _price_store.directory != directory):
+            _price_store = PriceHistoryStore(
+                directory or os.environ.get("SCREENER_PRICES_DIR", DEFAULT_PRICES_DIR)
+            )
+        return _price_store
+
+
+def update_price_history(tickers: list = None, store: PriceHistoryStore = None, progress_callback=None) -> int:
+    """
+    Download missing daily bars from the active provider and append them
+
+    The first run fetches HISTORY_YEARS of history; later runs only request
+    days from the last stored day onwards.
+
+    Parameters:
+    tickers (list): Optional; default load_universe()
+    store (PriceHistoryStore): Optional; default get_price_store()
+    progress_callback (callable): Optional; progress_callback(done, total) per chunk
+
+    Returns:
+    int: Number of new trading days stored
+    """
+    from data.fetch_data import get_provider, load_universe
+
+    store = store or get_price_store()
+    tickers = list(dict.fromkeys(tickers or load_universe()))
+    last = store.last_date
+    start = (
+        pd.Timestamp(last).date() if last is not None
+        else (pd.Timestamp.today() - pd.DateOffset(years=HISTORY_YEARS)).date()
+    )
+    # Tickers new to the store need their full history
+    known = [t for t in tickers if t in store.tickers]
+    unknown = [t for t in tickers if t not in store.tickers]
+    history_start = (pd.Timestamp.today() - pd.DateOffset(years=HISTORY_YEARS)).date()
+
+    provider = get_provider()
+    appended = 0
+    done = 0
+    for group, group_start in ((known, start), (unknown, history_start)):
+        for i in range(0, len(group), HISTORY_CHUNK_SIZE):
+            chunk = group[i:i + HISTORY_CHUNK_SIZE]
+            with span("provider.fetch_history"):
+                frames = provider.fetch_history(chunk, start=group_start)
+            appended += store.append(frames)
+            done += len(chunk)
+            if progress_callback is not None:
+                progress_callback(done, len(tickers))
+    return appended
@@ -0,0 +1,395 @@
+import json
+import os
+import random
+import string
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+
+class DataProvider:
+    """
+    Source of raw yfinance-style `info` payloads for IDX tickers
+
+    Subclasses implement fetch_info; fetch_batch falls back to calling it per
+    ticker, so bulk sources only need to override fetch_batch. Payloads are
+    normalized by data.fetch_data.parse_stock_info.
+
+    Providers with bulk = True are served through fetch_batch in large chunks
+    instead of one thread-pool task per ticker.
+
+    fetch_quotes returns only price and volume and should be much cheaper than
+    fetch_info; the default derives quotes from full info payloads.
+
+    fetch_statements returns raw income and cash-flow statements for
+    data.financials; providers without them raise NotImplementedError.
+    """
+
+    name = "base"
+    bulk = False
+
+    def fetch_info(self, ticker: str) -> dict:
+        """Return the raw info dict for one ticker (without .JK suffix); raise on failure"""
+        raise NotImplementedError
+
+    def fetch_batch(self, tickers: list) -> dict:
+        """
+        Fetch many tickers at once
+
+        Returns:
+        dict: {ticker: info_dict or Exception} for every requested ticker
+        """
+        results = {}
+        for ticker in tickers:
+            try:
+                results[ticker] = self.fetch_info(ticker)
+            except Exception as e:
+                results[ticker] = e
+        return results
+
+    def fetch_quotes(self, tickers: list) -> dict:
+        """
+        Fetch the latest price and volume for many tickers
+
+        Returns:
+        dict: {ticker: {"price": float, "volume": float} or Exception}
+        """
+        results = {}
+        for ticker, info in self.fetch_batch(tickers).items():
+            results[ticker] = info if isinstance(info, Exception) else quote_from_info(info)
+        return results
+
+    def fetch_history(self, tickers: list, start=None) -> dict:
+        """
+        Daily OHLCV bars from `start` (date) to today for many tickers
+
+        Returns:
+        dict: {field: DataFrame} for open/high/low/close/volume, each indexed by
+            date with one column per ticker (NaN where a ticker has no bar)
+        """
+        raise NotImplementedError(f"Provider {self.name} tidak menyediakan riwayat harga")
+
+    def fetch_statements(self, ticker: str, frequency: str = "annual") -> tuple:
+        """
+        Income and cash-flow statements for one ticker
+
+        Parameters:
+        ticker (str): Stock ticker (without .JK suffix)
+        frequency (str): "annual" or "quarterly"
+
+        Returns:
+        tuple: (income, cashflow) DataFrames in yfinance layout (rows = items,
+            columns = period end); raise on failure
+        """
+        raise NotImplementedError(f"Provider {self.name} tidak menyediakan laporan keuangan")
+
+    def list_tickers(self):
+        """Tickers this provider knows about, or None if it has no fixed universe"""
+        return None
+
+
+def quote_from_info(info: dict) -> dict:
+    """Extract the quote fields from a raw info payload (same price fallbacks as parse_stock_info)"""
+    price = (info.get("currentPrice") or
+             info.get("regularMarketPrice") or
+             info.get("previousClose") or
+             info.get("open"))
+    if not price:
+        raise ValueError("Harga tidak tersedia")
+    return {"price": price, "volume": info.get("volume")}
+
+
+class YFinanceProvider(DataProvider):
+    """Live data from Yahoo Finance through yfinance"""
+
+    name = "yfinance"
+
+    def fetch_info(self, ticker: str) -> dict:
+        return yf.Ticker(ticker + ".JK").info
+
+    def fetch_quotes(self, tickers: list) -> dict:
+        # One download request returns daily bars for every ticker; during the
+        # session today's bar holds the last price and cumulative volume
+        frame = yf.download(
+            [t + ".JK" for t in tickers], period="5d", interval="1d",
+            group_by="ticker", auto_adjust=False, threads=True, progress=False
+        )
+        results = {}
+        for ticker in tickers:
+            try:
+                bars = frame[ticker + ".JK"] if isinstance(frame.columns, pd.MultiIndex) else frame
+                bars = bars.dropna(subset=["Close"])
+                if bars.empty:
+                    raise ValueError(f"Tidak ada data harga untuk {ticker}")
+                last = bars.iloc[-1]
+                results[ticker] = {"price": float(last["Close"]), "volume": float(last["Volume"])}
+            except Exception as e:
+                results[ticker] = e
+        return results
+
+    def fetch_history(self, tickers: list, start=None) -> dict:
+        frame = yf.download(
+            [t + ".JK" for t in tickers], start=start, period=None if start else "max",
+            interval="1d", group_by="column", auto_adjust=True, threads=True, progress=False
+        )
+        if not isinstance(frame.columns, pd.MultiIndex):
+            frame.columns = pd.MultiIndex.from_product([frame.columns, [tickers[0] + ".JK"]])
+        frame.index = pd.DatetimeIndex(frame.index).tz_localize(None)
+        history = {}
+        for field in ("Open", "High", "Low", "Close", "Volume"):
+            part = frame[field] if field in frame.columns.get_level_values(0) else pd.DataFrame(index=frame.index)
+            part = part.rename(columns=lambda c: c.replace(".JK", ""))
+            history[field.lower()] = part
+        return history
+
+    def fetch_statements(self, ticker: str, frequency: str = "annual") -> tuple:
+        yf_ticker = yf.Ticker(ticker + ".JK")
+        if frequency == "annual":
+            return yf_ticker.income_stmt, yf_ticker.cashflow
+        return yf_ticker.quarterly_income_stmt, yf_ticker.quarterly_cashflow
+
+
+class FileProvider(DataProvider):
+    """
+    Replays recorded info payloads from `<directory>/<TICKER>.json`, daily
+    bars from `<directory>/history/<TICKER>.csv` and statements from
+    `<directory>/statements/<TICKER>_<frequency>_<income|cashflow>.csv`
+
+    Use record(), record_history() and record_statements() to capture live
+    data once, then run the app or benchmarks fully offline.
+    """
+
+    name = "file"
+    bulk = True
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.directory, f"{ticker.upper()}.json")
+
+    def fetch_info(self, ticker: str) -> dict:
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Tidak ada data rekaman untuk {ticker}")
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def record(self, ticker: str, info: dict) -> None:
+        """Save a raw info payload as a fixture"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(ticker), "w", encoding="utf-8") as f:
+            json.dump(info, f, default=str)
+
+    def _history_path(self, ticker: str) -> str:
+        return os.path.join(self.directory, "history", f"{ticker.upper()}.csv")
+
+    def fetch_history(self, tickers: list, start=None) -> dict:
+        # Tickers without a recording are left out, like tickers Yahoo has no bars for
+        bars = {}
+        for ticker in tickers:
+            path = self._history_path(ticker)
+            if not os.path.exists(path):
+                continue
+            frame = pd.read_csv(path, index_col=0, parse_dates=True)
+            if start is not None:
+                frame = frame[frame.index >= pd.Timestamp(start)]
+            bars[ticker] = frame
+        history = {}
+        for field in ("open", "high", "low", "close", "volume"):
+            history[field] = pd.DataFrame(
+                {t: frame[field] for t, frame in bars.items() if field in frame.columns}
+            )
+        return history
+
+    def record_history(self, ticker: str, bars: pd.DataFrame) -> None:
+        """Save daily bars (date index, open/high/low/close/volume columns) as a fixture"""
+        os.makedirs(os.path.dirname(self._history_path(ticker)), exist_ok=True)
+        bars.to_csv(self._history_path(ticker), index_label="date")
+
+    def _statement_path(self, ticker: str, frequency: str, kind: str) -> str:
+        return os.path.join(self.directory, "statements", f"{ticker.upper()}_{frequency}_{kind}.csv")
+
+    def fetch_statements(self, ticker: str, frequency: str = "annual") -> tuple:
+        statements = []
+        for kind in ("income", "cashflow"):
+            path = self._statement_path(ticker, frequency, kind)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Tidak ada laporan keuangan rekaman untuk {ticker}")
+            frame = pd.read_csv(path, index_col=0)
+            frame.columns = pd.to_datetime(frame.columns)
+            statements.append(frame)
+        return tuple(statements)
+
+    def record_statements(self, ticker: str, frequency: str, income: pd.DataFrame, cashflow: pd.DataFrame) -> None:
+        """Save raw statements (yfinance layout, as returned by fetch_statements) as fixtures"""
+        os.makedirs(os.path.dirname(self._statement_path(ticker, frequency, "income")), exist_ok=True)
+        income.to_csv(self._statement_path(ticker, frequency, "income"), index_label="item")
+        cashflow.to_csv(self._statement_path(ticker, frequency, "cashflow"), index_label="item")
+
+    def list_tickers(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+
+def synthetic_info(ticker: str) -> dict:
+    """Deterministic pseudo-random info payload for a ticker (same ticker, same payload)"""
+    rng = random.Random(zlib.crc32(ticker.encode("utf-8")))
+    price = round(rng.uniform(50, 20000), 0)
+    shares = rng.uniform(1e8, 1e11)
+    return {
+        "symbol": f"{ticker}.JK",
+        "currentPrice": price,
+        "trailingPE": round(rng.uniform(2, 40), 2),
+        "priceToBook": round(rng.uniform(0.3, 6), 2),
+        "returnOnEquity": round(rng.uniform(-0.1, 0.35), 4),
+        "debtToEquity": round(rng.uniform(5, 250), 2),
+        "earningsQuarterlyGrowth": round(rng.uniform(-0.3, 0.5), 4),
+        "freeCashflow": round(rng.uniform(-0.02, 0.1) * price * shares, 0),
+        "dividendYield": round(rng.uniform(0, 0.08), 4),
+        "currentRatio": round(rng.uniform(0.5, 3), 2),
+        "quickRatio": round(rng.uniform(0.3, 2.5), 2),
+        "profitMargins": round(rng.uniform(-0.05, 0.4), 4),
+        "beta": round(rng.uniform(0.2, 2), 2),
+        "marketCap": round(price * shares, 0),
+        "volume": int(rng.uniform(1e4, 1e8)),
+        "currency": "IDR",
+    }
+
+
+def synthetic_tickers(n: int) -> list:
+    """Generate n distinct four-letter IDX-style codes (AAAA, AAAB, ...)"""
+    letters = string.ascii_uppercase
+    if n > len(letters) ** 4:
+        raise ValueError("Maksimum 456976 ticker sintetis")
+    codes = []
+    for i in range(n):
+        code = ""
+        for _ in range(4):
+            i, r = divmod(i, len(letters))
+            code = letters[r] + code
+        codes.append(code)
+    return codes
+
+
+SYNTHETIC_HISTORY_ORIGIN = "2015-01-01"
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Generates N fake IDX tickers with plausible fundamentals, no network needed
+
+    Parameters:
+    n_tickers (int): Size of the synthetic universe
+    missing_rate (float): Fraction of fields dropped to mimic incomplete Yahoo data
+    """
+
+    name = "synthetic"
+    bulk = True
+
+    def __init__(self, n_tickers: int = 1000, missing_rate: float = 0.05):
+        self.n_tickers = n_tickers
+        self.missing_rate = missing_rate
+        self._tickers = synthetic_tickers(n_tickers)
+
+    def fetch_info(self, ticker: str) -> dict:
+        info = synthetic_info(ticker)
+        if self.missing_rate:
+            rng = random.Random(zlib.crc32(ticker.encode("utf-8")) ^ 0x5EED)
+            for key in list(info):
+                if key not in ("symbol", "currentPrice", "currency") and rng.random() < self.missing_rate:
+                    del info[key]
+        return info
+
+    def fetch_quotes(self, tickers: list) -> dict:
+        # Prices drift within ±3% of the fundamentals price, changing every minute
+        minute = int(time.time() // 60)
+        results = {}
+        for ticker in tickers:
+            info = synthetic_info(ticker)
+            rng = random.Random(zlib.crc32(ticker.encode("utf-8")) ^ minute)
+            results[ticker] = {
+                "price": round(info["currentPrice"] * rng.uniform(0.97, 1.03), 0),
+                "volume": int(rng.uniform(1e4, 1e8)),
+            }
+        return results
+
+    def fetch_history(self, tickers: list, start=None) -> dict:
+        # Deterministic random walk per ticker on a fixed business-day calendar
+        # ending today at the synthetic fundamentals price, so overlapping
+        # requests return the same bars
+        end = pd.Timestamp.today().normalize()
+        calendar = pd.bdate_range(SYNTHETIC_HISTORY_ORIGIN, end)
+        start = pd.Timestamp(start) if start is not None else end - pd.DateOffset(years=5)
+        keep = calendar >= start
+        fields = {name: {} for name in ("open", "high", "low", "close", "volume")}
+        for ticker in tickers:
+            rng = np.random.default_rng(zlib.crc32(ticker.encode("utf-8")))
+            vol = rng.uniform(0.01, 0.04)
+            log_path = np.cumsum(rng.normal(0, vol, len(calendar)))
+            close = synthetic_info(ticker)["currentPrice"] * np.exp(log_path - log_path[-1])
+            spread = np.abs(rng.normal(0, vol / 2, len(calendar)))
+            fields["close"][ticker] = close[keep]
+            fields["open"][ticker] = (close * (1 - spread / 2))[keep]
+            fields["high"][ticker] = (close * (1 + spread))[keep]
+            fields["low"][ticker] = (close * (1 - spread))[keep]
+            fields["volume"][ticker] = rng.integers(10_000, 100_000_000, len(calendar))[keep].astype(np.float64)
+        index = calendar[keep]
+        return {name: pd.DataFrame(cols, index=index) for name, cols in fields.items()}
+
+    def fetch_statements(self, ticker: str, frequency: str = "annual") -> tuple:
+        # Four fiscal years or five quarters scaled from the synthetic
+        # fundamentals, so the detail view works offline
+        info = synthetic_info(ticker)
+        rng = np.random.default_rng(zlib.crc32(ticker.encode("utf-8")) ^ 0x57A7)
+        end = pd.Timestamp.today().normalize()
+        if frequency == "annual":
+            periods = pd.date_range(end=end - pd.offsets.YearEnd(1), periods=4, freq="YE")
+            scale = 1.0
+        else:
+            periods = pd.date_range(end=end - pd.offsets.QuarterEnd(1), periods=5, freq="QE")
+            scale = 0.25
+        shares = info["marketCap"] / info["currentPrice"]
+        growth = np.cumprod(1 + rng.normal(0.08, 0.1, len(periods)))
+        revenue = info["marketCap"] * rng.uniform(0.2, 1.5) * scale * growth / growth[-1]
+        net_income = revenue * (info["profitMargins"] + rng.normal(0, 0.02, len(periods)))
+        operating_cf = net_income * rng.uniform(0.8, 1.5, len(periods))
+        capex = -revenue * rng.uniform(0.02, 0.1, len(periods))
+        income = pd.DataFrame(
+            [revenue, net_income, net_income / shares], columns=periods,
+            index=["Total Revenue", "Net Income", "Diluted EPS"]
+        )
+        cashflow = pd.DataFrame(
+            [operating_cf, capex, operating_cf + capex], columns=periods,
+            index=["Operating Cash Flow", "Capital Expenditure", "Free Cash Flow"]
+        )
+        # yfinance lists the latest period first
+        return income[periods[::-1]], cashflow[periods[::-1]]
+
+    def list_tickers(self):
+        return list(self._tickers)
+
+
+def provider_from_spec(spec: str) -> DataProvider:
+    """
+    Build a provider from a short spec string (used for SCREENER_PROVIDER)
+
+    "yfinance"            -> YFinanceProvider
+    "file:<directory>"    -> FileProvider
+    "synthetic[:<n>]"     -> SyntheticProvider with n tickers (default 1000)
+    """
+    kind, _, arg = (spec or "yfinance").partition(":")
+    kind = kind.strip().lower()
+    if kind == "yfinance":
+        return YFinanceProvider()
+    if kind == "file":
+        if not arg:
+            raise ValueError("Provider file membutuhkan direktori, contoh file:fixtures/")
+        return FileProvider(arg)
+    if kind == "synthetic":
+        return SyntheticProvider(int(arg) if arg else 1000)
+    raise ValueError(f"Provider tidak dikenal: {spec}")
@@ -0,0 +1,220 @@
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Numeric fields of a fetch_stock_info result, in storage order
+NUMERIC_FIELDS = (
+    "price", "PER", "PBV", "ROE", "DER", "EPS_Growth", "FCF", "dividend_yield",
+    "current_ratio", "quick_ratio", "profit_margin", "beta", "market_cap", "volume"
+)
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value) if value is not None else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _parse_time(text) -> float:
+    if not text:
+        return math.nan
+    try:
+        return time.mktime(time.strptime(text, _TIME_FORMAT))
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _format_time(epoch: float):
+    return time.strftime(_TIME_FORMAT, time.localtime(epoch)) if not math.isnan(epoch) else None
+
+
+@dataclass(slots=True)
+class StockRecord:
+    """
+    Compact typed form of one fetch_stock_info result
+
+    Missing values are NaN and the fetch time is kept as an epoch float instead
+    of a formatted string. Use from_dict/to_dict to convert to and from the dict
+    shape the rest of the app uses.
+    """
+    ticker: str
+    price: float = math.nan
+    PER: float = math.nan
+    PBV: float = math.nan
+    ROE: float = math.nan
+    DER: float = math.nan
+    EPS_Growth: float = math.nan
+    FCF: float = math.nan
+    dividend_yield: float = math.nan
+    current_ratio: float = math.nan
+    quick_ratio: float = math.nan
+    profit_margin: float = math.nan
+    beta: float = math.nan
+    market_cap: float = math.nan
+    volume: float = math.nan
+    currency: str = "IDR"
+    fetched_at: float = math.nan
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StockRecord":
+        """Build a record from a fetch_stock_info dict"""
+        return cls(
+            data["ticker"],
+            *(_to_float(data.get(f)) for f in NUMERIC_FIELDS),
+            data.get("currency") or "IDR",
+            _parse_time(data.get("last_updated"))
+        )
+
+    def to_dict(self) -> dict:
+        """Convert back to the fetch_stock_info dict shape (NaN becomes None)"""
+        result = {"ticker": self.ticker}
+        for f in NUMERIC_FIELDS:
+            value = getattr(self, f)
+            result[f] = None if math.isnan(value) else value
+        result["currency"] = self.currency
+        result["last_updated"] = _format_time(self.fetched_at)
+        return result
+
+
+class FundamentalsTable:
+    """
+    Struct-of-arrays container for many fundamentals records
+
+    All numeric fields live in one float64 block of shape (fields, tickers) with
+    NaN for missing values; tickers and currencies are pandas Categoricals. The
+    block layout matches pandas' internal column-major storage, so to_frame()
+    wraps it without copying.
+
+    Parameters:
+    tickers (array_like): Ticker codes, one per row
+    values (np.ndarray): float64 array of shape (len(NUMERIC_FIELDS), n)
+    fetched_at (np.ndarray): Optional; float64 epoch seconds per row
+    currency (array_like): Optional; currency per row (default IDR)
+    """
+
+    def __init__(self, tickers, values: np.ndarray, fetched_at: np.ndarray = None, currency=None):
+        n = len(tickers)
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        if values.shape != (len(NUMERIC_FIELDS), n):
+            raise ValueError(f"values harus berbentuk ({len(NUMERIC_FIELDS)}, {n})")
+        self.tickers = pd.Categorical(tickers)
+        self.values = values
+        self.fetched_at = (
+            np.full(n, np.nan) if fetched_at is None else np.asarray(fetched_at, dtype=np.float64)
+        )
+        self.currency = pd.Categorical(["IDR"] * n if currency is None else currency)
+        self._positions = None
+
+    @classmethod
+    def from_records(cls, records) -> "FundamentalsTable":
+        """Build from an iterable of fetch_stock_info dicts or StockRecord objects (errors skipped)"""
+        rows = [
+            r if isinstance(r, StockRecord) else StockRecord.from_dict(r)
+            for r in records
+            if isinstance(r, StockRecord) or (r and "error" not in r)
+        ]
+        values = np.empty((len(NUMERIC_FIELDS), len(rows)), dtype=np.float64)
+        for i, field in enumerate(NUMERIC_FIELDS):
+            values[i] = [getattr(r, field) for r in rows]
+        return cls(
+            [r.ticker for r in rows],
+            values,
+            np.array([r.fetched_at for r in rows], dtype=np.float64),
+            [r.currency for r in rows]
+        )
+
+    @classmethod
+    def from_stock_data(cls, stock_data: dict) -> "FundamentalsTable":
+        """Build from the {ticker: data_dict} output of get_stock_data"""
+        return cls.from_records(
+            dict(data, ticker=ticker) for ticker, data in stock_data.items()
+            if data and "error" not in data
+        )
+
+    def with_quotes(self, prices, volumes, quoted_at, scaled_fields=(), inverse_fields=()) -> "FundamentalsTable":
+        """
+        Copy with quoted prices overlaid, following fetch_data.apply_quote row by row
+
+        A quote applies where its price is positive and it is newer than the
+        snapshot (or the snapshot time is unknown). Fields in scaled_fields are
+        multiplied by new_price / snapshot_price and inverse_fields divided by it.
+
+        Parameters:
+        prices, volumes, quoted_at (array_like): One value per row, NaN = no quote
+        scaled_fields, inverse_fields (tuple): Price-dependent field names
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        quoted_at = np.asarray(quoted_at, dtype=np.float64)
+        use = (prices > 0) & ~np.isnan(quoted_at) & ~(quoted_at <= self.fetched_at)
+
+        values = self.values.copy()
+        price_row = NUMERIC_FIELDS.index("price")
+        old = values[price_row]
+        rescale = use & (old != 0) & ~np.isnan(old)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(rescale, prices / old, 1.0)
+        for field in scaled_fields:
+            values[NUMERIC_FIELDS.index(field)] *= ratio
+        for field in inverse_fields:
+            values[NUMERIC_FIELDS.index(field)] /= ratio
+        values[price_row] = np.where(use, prices, old)
+        volume_row = NUMERIC_FIELDS.index("volume")
+        values[volume_row] = np.where(use & ~np.isnan(volumes), volumes, values[volume_row])
+        return FundamentalsTable(self.tickers, values, self.fetched_at, self.currency)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def column(self, field: str) -> np.ndarray:
+        """View (no copy) of one numeric field"""
+        return self.values[NUMERIC_FIELDS.index(field)]
+
+    def _position(self, ticker: str) -> int:
+        if self._positions is None:
+            self._positions = {t: i for i, t in enumerate(self.tickers)}
+        return self._positions[ticker]
+
+    def get(self, ticker: str) -> StockRecord:
+        """Return a single row as a StockRecord"""
+        i = self._position(ticker)
+        return StockRecord(
+            ticker, *(float(v) for v in self.values[:, i]),
+            self.currency[i], float(self.fetched_at[i])
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame view indexed by ticker
+
+        The numeric columns share memory with this table (no copy), so treat the
+        frame as read-only or call .copy() before modifying it.
+        """
+        frame = pd.DataFrame(
+            self.values.T,
+            index=pd.CategoricalIndex(self.tickers, name="ticker"),
+            columns=list(NUMERIC_FIELDS),
+            copy=False
+        )
+        frame["currency"] = self.currency
+        frame["fetched_at"] = self.fetched_at
+        return frame
+
+    def last_updated(self) -> list:
+        """fetched_at formatted like the last_updated field of fetch_stock_info (None if unknown)"""
+        return [_format_time(t) for t in self.fetched_at.tolist()]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the arrays"""
+        return (
+            self.values.nbytes + self.fetched_at.nbytes
+            + self.tickers.codes.nbytes + self.tickers.categories.memory_usage(deep=True)
+            + self.currency.codes.nbytes + self.currency.categories.memory_usage(deep=True)
+        )
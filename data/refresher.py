@@ -0,0 +1,366 @@
+import heapq
+import itertools
+import math
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import data.fetch_data as fetch_data
+
+# IDX trades in WIB (UTC+7, no daylight saving)
+WIB = timezone(timedelta(hours=7), "WIB")
+
+
+class AccessTracker:
+    """
+    Exponentially decaying per-ticker access counts
+
+    Each access adds 1 to the ticker's score and scores halve every
+    `half_life` seconds, so tickers viewed often and recently rank first.
+    Repeated accesses within `min_interval` seconds (Streamlit reruns of the
+    same page) count once.
+    """
+
+    def __init__(self, half_life: float = 24 * 3600, min_interval: float = 30.0):
+        self.half_life = half_life
+        self.min_interval = min_interval
+        self._scores = {}  # ticker -> (score, last_access)
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, since: float, now: float) -> float:
+        return score * math.pow(0.5, (now - since) / self.half_life)
+
+    def record(self, ticker: str):
+        now = time.time()
+        with self._lock:
+            score, last = self._scores.get(ticker, (0.0, now))
+            if score and now - last < self.min_interval:
+                return
+            self._scores[ticker] = (self._decayed(score, last, now) + 1.0, now)
+
+    def score(self, ticker: str) -> float:
+        now = time.time()
+        with self._lock:
+            entry = self._scores.get(ticker)
+        return self._decayed(entry[0], entry[1], now) if entry else 0.0
+
+    def top(self, n: int = None) -> list:
+        """Tickers ordered by current score, highest first"""
+        now = time.time()
+        with self._lock:
+            items = [(self._decayed(s, t, now), k) for k, (s, t) in self._scores.items()]
+        items.sort(reverse=True)
+        return [k for _, k in items[:n]]
+
+
+class BackgroundRefresher:
+    """
+    Keeps the fundamentals cache warm from a daemon thread
+
+    Two scheduled jobs feed the caches the request path reads from:
+
+    - "close": once per trading day after IDX close, refresh the fundamentals of
+      the whole watchlist through refresh_stock_info (memory cache and store)
+    - "intraday": during market hours every `intraday_interval` seconds, fetch
+      bulk quotes for the watchlist (fetch_quotes), which fetch_stock_info
+      overlays on the cached fundamentals
+
+    Fundamentals work is queued by priority: revalidations of stale data a user
+    is waiting on first, then tickers by access frequency, then the rest of the
+    watchlist. Quote refreshes run on the scheduler thread.
+
+    Listeners added with add_listener(callback) are called as callback(job)
+    once a job's data is in the caches: after the intraday quotes are fetched,
+    and after the last ticker queued by the close job has been refreshed.
+
+    Every Streamlit process starts its own refresher, so the scheduled jobs only
+    run in the process holding the "refresher" lease in the fundamentals store
+    (renewed on each poll, taken over once it expires). The other processes skip
+    the close job and load the leader's quotes from the store for "intraday".
+    Without a store every process is its own leader.
+
+    Parameters:
+    tickers (list): Watchlist/universe to keep fresh (default: load_universe())
+    close_time (str): "HH:MM" WIB for the daily full refresh
+    market_open, market_close (str): "HH:MM" WIB trading window (Mon-Fri)
+    intraday_interval (float): Seconds between intraday quote refreshes; 0 disables
+    max_workers (int): Concurrent refetches
+    tracker (AccessTracker): Optional; shared access statistics
+    lease_ttl (float): Seconds the leader lease stays valid without renewal
+    """
+
+    LEASE_NAME = "refresher"
+
+    def __init__(
+        self,
+        tickers: list = None,
+        close_time: str = "16:15",
+        market_open: str = "09:00",
+        market_close: str = "16:00",
+        intraday_interval: float = 60,
+        max_workers: int = 4,
+        tracker: AccessTracker = None,
+        lease_ttl: float = 180
+    ):
+        self.tickers = list(dict.fromkeys(tickers if tickers is not None else fetch_data.load_universe()))
+        self.close_time = _parse_hhmm(close_time)
+        self.market_open = _parse_hhmm(market_open)
+        self.market_close = _parse_hhmm(market_close)
+        self.intraday_interval = intraday_interval
+        self.max_workers = max_workers
+        self.tracker = tracker or AccessTracker()
+        self.lease_ttl = lease_ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.is_leader = False
+
+        self._queue = []  # heap of (priority, seq, ticker)
+        self._queued = {}  # ticker -> best queued priority
+        self._in_flight = set()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        self._listeners = []
+        self._close_batch = False
+        self.last_run = {"close": None, "intraday": None}
+        self.stats = {"refreshed": 0, "failed": 0, "revalidations": 0, "quotes": 0}
+
+    # ---- queue ----
+
+    def _enqueue(self, ticker: str, priority: float):
+        with self._cond:
+            queued = self._queued.get(ticker)
+            if ticker in self._in_flight or (queued is not None and queued <= priority):
+                return
+            self._queued[ticker] = priority
+            heapq.heappush(self._queue, (priority, next(self._seq), ticker))
+            self._cond.notify()
+
+    def _next_ticker(self):
+        with self._cond:
+            while not self._stop.is_set():
+                while self._queue:
+                    priority, _, ticker = heapq.heappop(self._queue)
+                    # Skip heap entries superseded by a higher-priority push
+                    if self._queued.get(ticker) == priority:
+                        del self._queued[ticker]
+                        self._in_flight.add(ticker)
+                        return ticker
+                self._cond.wait()
+            return None
+
+    def _count(self, key: str, n: int = 1):
+        # Workers, the scheduler and request threads all update stats
+        with self._cond:
+            self.stats[key] += n
+
+    def revalidate(self, ticker: str):
+        """Refresh a ticker that was just served stale, ahead of scheduled work"""
+        self._count("revalidations")
+        self._enqueue(ticker, float("-inf"))
+
+    def schedule(self, tickers: list):
+        """Queue tickers for refresh, most accessed first"""
+        for ticker in tickers:
+            self._enqueue(ticker, -self.tracker.score(ticker))
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queued) + len(self._in_flight)
+
+    # ---- listeners ----
+
+    def add_listener(self, callback):
+        """Call callback(job) after each completed "close" or "intraday" refresh"""
+        self._listeners.append(callback)
+
+    def _notify(self, job: str):
+        for callback in list(self._listeners):
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Error in refresh listener: {str(e)}")
+
+    # ---- workers ----
+
+    def _worker(self):
+        while True:
+            ticker = self._next_ticker()
+            if ticker is None:
+                return
+            try:
+                data = fetch_data.refresh_stock_info(ticker)
+                self._count("failed" if "error" in data else "refreshed")
+            except Exception as e:
+                print(f"Error refreshing {ticker}: {str(e)}")
+                self._count("failed")
+            finally:
+                with self._cond:
+                    self._in_flight.discard(ticker)
+                    batch_done = self._close_batch and not self._queued and not self._in_flight
+                    if batch_done:
+                        self._close_batch = False
+                if batch_done:
+                    self._notify("close")
+
+    # ---- schedule ----
+
+    def _due_jobs(self, now: datetime) -> list:
+        jobs = []
+        today_close = now.replace(hour=self.close_time[0], minute=self.close_time[1], second=0, microsecond=0)
+        last_close = self.last_run["close"]
+        if now >= today_close and now.weekday() < 5 and (last_close is None or last_close < today_close):
+            jobs.append("close")
+
+        if self.intraday_interval and now.weekday() < 5:
+            open_at = now.replace(hour=self.market_open[0], minute=self.market_open[1], second=0, microsecond=0)
+            close_at = now.replace(hour=self.market_close[0], minute=self.market_close[1], second=0, microsecond=0)
+            last_intraday = self.last_run["intraday"]
+            if open_at <= now <= close_at and (
+                last_intraday is None or (now - last_intraday).total_seconds() >= self.intraday_interval
+            ):
+                jobs.append("intraday")
+        return jobs
+
+    def run_job(self, job: str):
+        """Run one scheduled job now ("close" queues fundamentals, "intraday" fetches quotes)"""
+        if job == "close":
+            # Accessed tickers outside the watchlist are refreshed too; skip those
+            # already fetched since today's close (e.g. after a restart)
+            tickers = list(dict.fromkeys(self.tracker.top() + self.tickers))
+            stale = self._not_fetched_since(tickers, self._last_close_time(datetime.now(WIB)))
+            with self._cond:
+                self._close_batch = bool(stale)
+            self.schedule(stale)
+            if not stale:
+                self._notify("close")
+        elif job == "intraday":
+            tickers = list(dict.fromkeys(self.tracker.top() + self.tickers))
+            self._count("quotes", len(fetch_data.fetch_quotes(tickers, use_cache=False)))
+            self._notify("intraday")
+        else:
+            raise ValueError(f"Job tidak dikenal: {job}")
+        self.last_run[job] = datetime.now(WIB)
+
+    def _last_close_time(self, now: datetime) -> datetime:
+        close_at = now.replace(hour=self.close_time[0], minute=self.close_time[1], second=0, microsecond=0)
+        return close_at if now >= close_at else close_at - timedelta(days=1)
+
+    def _not_fetched_since(self, tickers: list, since: datetime) -> list:
+        store = fetch_data.get_store()
+        if store is None:
+            return tickers
+        try:
+            fresh = store.get_many(tickers, max_age=time.time() - since.timestamp())
+        except Exception as e:
+            print(f"Error reading store: {str(e)}")
+            return tickers
+        return [t for t in tickers if t not in fresh]
+
+    def _acquire_lease(self) -> bool:
+        store = fetch_data.get_store()
+        if store is None:
+            return True
+        try:
+            return store.acquire_lease(self.LEASE_NAME, self.owner, self.lease_ttl)
+        except Exception as e:
+            print(f"Error taking refresher lease: {str(e)}")
+            return False
+
+    def _follow_quotes(self):
+        """Intraday job of a non-leader: reuse the quotes the leader stored"""
+        tickers = list(dict.fromkeys(self.tracker.top() + self.tickers))
+        fetch_data.load_stored_quotes(tickers)
+        self._notify("intraday")
+        self.last_run["intraday"] = datetime.now(WIB)
+
+    def tick(self, now: datetime = None):
+        """Renew the leader lease and run the jobs that are due (one scheduler poll)"""
+        now = now or datetime.now(WIB)
+        self.is_leader = self._acquire_lease()
+        for job in self._due_jobs(now):
+            if self.is_leader:
+                self.run_job(job)
+            elif job == "intraday":
+                self._follow_quotes()
+            # A follower leaves "close" due so it runs it if it takes over the lease
+
+    def _scheduler(self, poll_interval: float):
+        while not self._stop.wait(poll_interval):
+            self.tick()
+
+    def start(self, poll_interval: float = 30.0):
+        """Start the scheduler and worker threads and register the fetch_data hooks"""
+        if self._threads:
+            return
+        self._stop.clear()
+        # A restart during the trading day should not immediately refetch everything
+        now = datetime.now(WIB)
+        if "close" not in self._due_jobs(now):
+            self.last_run["close"] = now
+        threads = [threading.Thread(target=self._scheduler, args=(poll_interval,), daemon=True,
+                                    name="refresher-scheduler")]
+        threads += [threading.Thread(target=self._worker, daemon=True, name=f"refresher-{i}")
+                    for i in range(self.max_workers)]
+        for t in threads:
+            t.start()
+        self._threads = threads
+        fetch_data.set_revalidator(self.revalidate, self.tracker.record)
+
+    def stop(self, timeout: float = 5.0):
+        """Unregister the hooks, stop the threads and release the lease (queued work is dropped)"""
+        fetch_data.set_revalidator(None)
+        self._stop.set()
+        with self._cond:
+            self._queue.clear()
+            self._queued.clear()
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        store = fetch_data.get_store()
+        if self.is_leader and store is not None:
+            try:
+                store.release_lease(self.LEASE_NAME, self.owner)
+            except Exception as e:
+                print(f"Error releasing refresher lease: {str(e)}")
+        self.is_leader = False
+
+    def status(self) -> dict:
+        with self._cond:
+            stats = dict(self.stats)
+        return {
+            "running": bool(self._threads),
+            "leader": self.is_leader,
+            "watchlist": len(self.tickers),
+            "pending": self.pending(),
+            "last_close": self.last_run["close"],
+            "last_intraday": self.last_run["intraday"],
+            **stats,
+        }
+
+
+def _parse_hhmm(text: str) -> tuple:
+    hour, minute = text.split(":")
+    return int(hour), int(minute)
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def start_refresher(tickers: list = None, **kwargs) -> BackgroundRefresher:
+    """Start the process-wide refresher once; later calls return the running one"""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = BackgroundRefresher(tickers, **kwargs)
+            _refresher.start()
+        return _refresher
+
+
+def get_refresher() -> BackgroundRefresher:
+    """Return the process-wide refresher, or None if it was never started"""
+    return _refresher
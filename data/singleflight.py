@@ -0,0 +1,97 @@
+import asyncio
+import concurrent.futures
+import inspect
+import threading
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight wait for and share its result or exception.
+    Once the call finishes the key is released, so later calls run again
+    (combine with a cache to serve those).
+
+    Threads and asyncio tasks share the same in-flight table: each call is a
+    concurrent.futures.Future, awaited via asyncio.wrap_future from coroutines.
+    A cancelled follower only stops waiting; the call and the other waiters
+    are unaffected.
+    Do not call do() from an event loop thread while a do_async() leader for the
+    same key runs on that loop; it would block the loop it waits on.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> Future
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = concurrent.futures.Future()
+            # A running future cannot be cancelled, so no waiter can cancel it
+            # for the others and the leader can always set its outcome
+            future.set_running_or_notify_cancel()
+            self.executed += 1
+            return future, True
+
+    def _finish(self, key, future, value=None, error=None):
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def do(self, key, func, *args):
+        """Run func(*args) unless a call for key is already in flight, then share its outcome"""
+        future, leader = self._join(key)
+        if leader:
+            try:
+                value = func(*args)
+            except BaseException as e:
+                self._finish(key, future, error=e)
+                raise
+            self._finish(key, future, value)
+            return value
+        return future.result()
+
+    async def do_async(self, key, func, *args):
+        """
+        Async counterpart of do(); func may be a coroutine function or a
+        blocking function (run in a worker thread)
+        """
+        future, leader = self._join(key)
+        if leader:
+            try:
+                if inspect.iscoroutinefunction(func):
+                    value = await func(*args)
+                else:
+                    value = await asyncio.to_thread(func, *args)
+            except BaseException as e:
+                self._finish(key, future, error=e)
+                raise
+            self._finish(key, future, value)
+            return value
+        # shield: cancelling this follower must not cancel the shared future
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        """Executed vs. coalesced call counters"""
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                "coalesced_ratio": self.coalesced / total if total else 0.0,
+            }
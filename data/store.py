@@ -0,0 +1,276 @@
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "screener", "fundamentals.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    ticker TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (ticker, fetched_at)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_latest ON snapshots (ticker, fetched_at DESC);
+CREATE TABLE IF NOT EXISTS quotes (
+    ticker TEXT PRIMARY KEY,
+    quoted_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Names of the in-memory databases behind FundamentalsStore(":memory:")
+_memory_ids = itertools.count()
+
+
+class FundamentalsStore:
+    """
+    Persistent SQLite store of fetch_stock_info snapshots keyed by ticker + fetch time
+
+    Every put() appends a new snapshot so history is kept; readers take the
+    latest one. The database runs in WAL mode with a busy timeout, so several
+    Streamlit workers (threads or processes) can read and write it at once.
+    Each thread gets its own connection; close() closes all of them.
+
+    path=":memory:" gives an in-memory database private to this store and
+    shared by its threads (a named shared-cache database). It lives until
+    close() and uses table-level locking instead of WAL, so it suits tests and
+    single-writer use; give a file path for concurrent writers.
+
+    Parameters:
+    path (str): Location of the SQLite file (":memory:" for a private in-memory store)
+    timeout (float): Seconds to wait on a locked database before failing
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+        # A plain ":memory:" connection would give every thread its own empty database
+        self._uri = f"file:fundamentals-{next(_memory_ids)}?mode=memory&cache=shared" if path == ":memory:" else None
+        if path != ":memory:":
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn not in self._connections:
+            # check_same_thread=False only so close() can close it from another
+            # thread; each connection is still used by a single thread
+            conn = sqlite3.connect(
+                self._uri or self.path, timeout=self.timeout, check_same_thread=False, uri=self._uri is not None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            with self._connections_lock:
+                self._connections.add(conn)
+            self._local.conn = conn
+        return conn
+
+    def put(self, ticker: str, data: dict, fetched_at: float = None) -> float:
+        """Append a snapshot for ticker; returns the timestamp used"""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        payload = json.dumps(data, default=str)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (ticker, fetched_at, payload) VALUES (?, ?, ?)",
+                (ticker, fetched_at, payload)
+            )
+        return fetched_at
+
+    def put_many(self, items: dict, fetched_at: float = None) -> float:
+        """Append snapshots for {ticker: data} in a single transaction"""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [(t, fetched_at, json.dumps(d, default=str)) for t, d in items.items()]
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO snapshots (ticker, fetched_at, payload) VALUES (?, ?, ?)",
+                rows
+            )
+        return fetched_at
+
+    def get_latest(self, ticker: str, max_age: float = None):
+        """
+        Return (data, fetched_at) of the newest snapshot, or None
+
+        Parameters:
+        ticker (str): Stock ticker (without .JK suffix)
+        max_age (float): Optional; ignore snapshots older than this many seconds
+        """
+        min_time = time.time() - max_age if max_age is not None else float("-inf")
+        row = self._connect().execute(
+            "SELECT payload, fetched_at FROM snapshots WHERE ticker = ? AND fetched_at >= ? "
+            "ORDER BY fetched_at DESC LIMIT 1",
+            (ticker, min_time)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def get_many(self, tickers: list, max_age: float = None) -> dict:
+        """Return {ticker: (data, fetched_at)} of the newest snapshot for each ticker found"""
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        min_time = time.time() - max_age if max_age is not None else float("-inf")
+        conn = self._connect()
+        results = {}
+        # SQLite limits bound parameters per statement, so query in chunks
+        for start in range(0, len(tickers), 500):
+            chunk = tickers[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT s.ticker, s.payload, s.fetched_at FROM snapshots s "
+                f"JOIN (SELECT ticker, MAX(fetched_at) AS latest FROM snapshots "
+                f"      WHERE ticker IN ({placeholders}) GROUP BY ticker) m "
+                f"ON s.ticker = m.ticker AND s.fetched_at = m.latest "
+                f"WHERE s.fetched_at >= ?",
+                (*chunk, min_time)
+            ).fetchall()
+            for ticker, payload, fetched_at in rows:
+                results[ticker] = (json.loads(payload), fetched_at)
+        return results
+
+    def history(self, ticker: str, limit: int = None) -> list:
+        """Return [(fetched_at, data), ...] newest first"""
+        query = "SELECT fetched_at, payload FROM snapshots WHERE ticker = ? ORDER BY fetched_at DESC"
+        params = (ticker,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (ticker, limit)
+        rows = self._connect().execute(query, params).fetchall()
+        return [(fetched_at, json.loads(payload)) for fetched_at, payload in rows]
+
+    def as_of(self, tickers: list, until: float, since: float = None) -> dict:
+        """
+        Point-in-time lookup: newest snapshot fetched before `until` for each ticker
+
+        Parameters:
+        tickers (list): Tickers to resolve
+        until (float): Epoch time; only snapshots fetched strictly before it count
+        since (float): Optional; ignore snapshots fetched before this epoch time
+
+        Returns:
+        dict: {ticker: (data, fetched_at)} for tickers that have such a snapshot
+        """
+        tickers = list(dict.fromkeys(tickers))
+        since = float("-inf") if since is None else since
+        conn = self._connect()
+        results = {}
+        for start in range(0, len(tickers), 500):
+            chunk = tickers[start:start + 500]
+            values = ",".join(["(?)"] * len(chunk))
+            # One index seek per ticker instead of scanning the whole time range
+            rows = conn.execute(
+                f"WITH wanted(ticker) AS (VALUES {values}) "
+                f"SELECT s.ticker, s.payload, s.fetched_at FROM wanted w "
+                f"JOIN snapshots s ON s.ticker = w.ticker AND s.fetched_at = ("
+                f"    SELECT MAX(fetched_at) FROM snapshots WHERE ticker = w.ticker AND fetched_at < ?) "
+                f"WHERE s.fetched_at >= ?",
+                (*chunk, until, since)
+            ).fetchall()
+            for ticker, payload, fetched_at in rows:
+                results[ticker] = (json.loads(payload), fetched_at)
+        return results
+
+    def prune(self, older_than: float, keep_latest: bool = True) -> int:
+        """
+        Delete snapshots older than `older_than` seconds; returns rows deleted
+
+        With keep_latest=True the newest snapshot of every ticker is never removed.
+        """
+        cutoff = time.time() - older_than
+        conn = self._connect()
+        with conn:
+            if keep_latest:
+                cur = conn.execute(
+                    "DELETE FROM snapshots WHERE fetched_at < ? AND fetched_at < "
+                    "(SELECT MAX(fetched_at) FROM snapshots s2 WHERE s2.ticker = snapshots.ticker)",
+                    (cutoff,)
+                )
+            else:
+                cur = conn.execute("DELETE FROM snapshots WHERE fetched_at < ?", (cutoff,))
+        return cur.rowcount
+
+    def put_quotes(self, quotes: dict, quoted_at: float = None) -> float:
+        """Replace the latest quote of each ticker in {ticker: quote}; returns the timestamp used"""
+        quoted_at = time.time() if quoted_at is None else quoted_at
+        rows = [(t, quoted_at, json.dumps(q, default=str)) for t, q in quotes.items()]
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO quotes (ticker, quoted_at, payload) VALUES (?, ?, ?)",
+                rows
+            )
+        return quoted_at
+
+    def get_quotes(self, tickers: list, max_age: float = None) -> dict:
+        """Return {ticker: quote} for tickers quoted within max_age seconds (missing omitted)"""
+        tickers = list(dict.fromkeys(tickers))
+        min_time = time.time() - max_age if max_age is not None else float("-inf")
+        conn = self._connect()
+        results = {}
+        for start in range(0, len(tickers), 500):
+            chunk = tickers[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT ticker, payload FROM quotes WHERE quoted_at >= ? AND ticker IN ({placeholders})",
+                (min_time, *chunk)
+            ).fetchall()
+            for ticker, payload in rows:
+                results[ticker] = json.loads(payload)
+        return results
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """
+        Take or renew the named lease for `owner` for ttl seconds
+
+        Succeeds if the lease is free, expired or already held by owner, so every
+        process can call it on each poll and exactly one of them holds it.
+
+        Returns:
+        bool: True if owner holds the lease until now + ttl
+        """
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (name, owner, now + ttl, now)
+            )
+        return cur.rowcount > 0
+
+    def release_lease(self, name: str, owner: str) -> None:
+        """Give up the named lease if owner holds it"""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def tickers(self) -> list:
+        """Return every ticker that has at least one snapshot"""
+        rows = self._connect().execute("SELECT DISTINCT ticker FROM snapshots ORDER BY ticker").fetchall()
+        return [r[0] for r in rows]
+
+    def close(self):
+        """Close the connections of every thread (a later call reconnects lazily)"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            conn.close()
+        self._local.conn = None
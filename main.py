@@ -1,11 +1,26 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from data.fetch_data import fetch_stock_info
-from analysis.lkh_screener import screen_stock_lkh
-from analysis.dcf_valuation import calculate_dcf, dcf_sensitivity_analysis
-from components.charts import plot_financial_chart
+from data.fetch_data import (
+    fetch_stock_info, iter_stock_data, load_universe, is_bundled_universe, data_age, is_stale, with_latest_quotes,
+    coalescing_stats, lookup_cached_stock_info
+)
+from data.records import FundamentalsTable
+from data.refresher import start_refresher
+from utils.formatter import format_age
+from data.financials import fetch_financial_statements
+from analysis.lkh_screener import screen_stock_lkh, lkh_rules_from_thresholds
+from analysis.pipeline import valuation_inputs, dcf_stage, sensitivity_stage, monte_carlo_stage
+from analysis.universe_screener import IncrementalScreener, filter_screening, add_technical_columns
+from analysis.technical import technical_screen
+from analysis.alerts import get_alert_engine
+from data.prices import get_price_store, update_price_history
+from components.charts import plot_financial_chart, plot_sensitivity_heatmap, plot_dcf_distribution
+from utils import timing
+from utils.timing import span
 from datetime import datetime
+import os
+import time
 
 # ====================== KONFIGURASI AWAL ======================
 st.set_page_config(
@@ -14,6 +29,51 @@ st.set_page_config(
     page_icon="📊"
 )
 
+# Refresher latar belakang (satu per proses): data fundamental diperbarui setelah
+# bursa tutup dan harga saham yang sering dilihat diperbarui selama jam bursa.
+# Set SCREENER_REFRESHER=0 untuk menonaktifkan.
+REFRESHER_ENABLED = os.environ.get("SCREENER_REFRESHER", "1") not in ("", "0", "false")
+if REFRESHER_ENABLED:
+    start_refresher()
+
+
+@st.cache_resource
+def start_alerts():
+    """
+    Evaluasi aturan alert atas universe di cache setiap kali refresher selesai
+    memperbarui data (sekali per proses), dengan batas LKH dan asumsi DCF dari
+    parameter yang disimpan engine
+    """
+    refresher = start_refresher()
+    engine = get_alert_engine()
+    screener = IncrementalScreener()
+
+    def evaluate(job):
+        with span("alerts"):
+            # Hanya membaca snapshot: tanpa revalidate agar setiap tick tidak
+            # mengantre ambil ulang fundamental seluruh watchlist
+            cached, _ = lookup_cached_stock_info(refresher.tickers, revalidate=False)
+            params = engine.params
+            table, _ = screener.update(
+                cached,
+                growth_rate=params["growth_rate"],
+                discount_rate=params["discount_rate"],
+                terminal_growth=params["terminal_growth"],
+                years=int(params["years"]),
+                rules=lkh_rules_from_thresholds(params["lkh_per_threshold"], params["lkh_roe_threshold"])
+            )
+            engine.evaluate(table)
+
+    refresher.add_listener(evaluate)
+    return engine
+
+
+# Alert ditulis ke ~/.cache/screener/alerts.jsonl (dan SCREENER_ALERT_WEBHOOK jika
+# diisi); butuh refresher. Set SCREENER_ALERTS=0 untuk menonaktifkan.
+ALERTS_ENABLED = REFRESHER_ENABLED and os.environ.get("SCREENER_ALERTS", "1") not in ("", "0", "false")
+if ALERTS_ENABLED:
+    start_alerts()
+
 # Custom CSS untuk tampilan profesional
 st.markdown("""
 <style>
@@ -53,9 +113,12 @@ st.markdown("""
 with st.sidebar:
     st.header("⚙️ Pengaturan Analisis")
     
+    app_mode = st.radio("Mode", ["Analisis Saham", "Screening Universe IDX"])
+    
     st.subheader("Parameter Screening LKH")
     lkh_per_threshold = st.slider("Batas Maksimum PER", 5, 20, 12)
     lkh_roe_threshold = st.slider("Batas Minimum ROE (%)", 5, 30, 15)
+    lkh_rules = lkh_rules_from_thresholds(lkh_per_threshold, lkh_roe_threshold)
     
     st.subheader("Parameter DCF")
     default_growth = st.slider("Pertumbuhan Default (%)", 5, 30, 12)
@@ -66,6 +129,22 @@ with st.sidebar:
     st.subheader("Tampilan")
     show_details = st.checkbox("Tampilkan Detail Data", True)
     show_sensitivity = st.checkbox("Tampilkan Analisis Sensitivitas", True)
+    sensitivity_steps = st.slider("Resolusi Grid Sensitivitas", 3, 51, 3, step=2)
+    show_history = st.checkbox("Tampilkan Tren Historis", True)
+    statement_frequency = st.radio("Periode Laporan", ["Tahunan", "Kuartalan"], horizontal=True)
+    show_monte_carlo = st.checkbox("Tampilkan Simulasi Monte Carlo", False)
+    if show_monte_carlo:
+        mc_growth_std = st.slider("Deviasi Pertumbuhan (%)", 0.5, 10.0, 3.0, step=0.5)
+        mc_discount_std = st.slider("Deviasi Diskonto (%)", 0.5, 5.0, 1.0, step=0.5)
+        mc_paths = st.select_slider("Jumlah Simulasi", [10_000, 50_000, 100_000, 250_000], 100_000)
+    
+    st.subheader("Debug")
+    show_timing = st.checkbox("Tampilkan Panel Timing", False)
+    # Hanya sesi ini yang diukur; pengukuran seluruh proses diatur lewat SCREENER_TIMING
+    if show_timing:
+        timing.bind_session(st.session_state.setdefault("timing_registry", timing.TimingRegistry()))
+    else:
+        timing.unbind_session()
     
     st.markdown("---")
     st.info("""
@@ -75,6 +154,213 @@ with st.sidebar:
     - **FCF**: Free Cash Flow konsisten penting
     """)
 
+def render_timing_panel():
+    """Panel debug di sidebar: p50/p95/p99 per tahap untuk sesi ini dan proses ini"""
+    if not show_timing:
+        return
+    with st.sidebar.expander("⏱️ Timing per Tahap", expanded=True):
+        session_registry = st.session_state["timing_registry"]
+        for label, registry in [("Sesi ini", session_registry), ("Semua sesi (proses)", timing.process_registry)]:
+            st.caption(label)
+            rows = registry.summary()
+            if registry is timing.process_registry and not timing.is_enabled():
+                st.text("Nonaktif (set SCREENER_TIMING=1)")
+                continue
+            if rows:
+                st.dataframe(
+                    pd.DataFrame(rows).set_index("span").style.format("{:,.1f}"),
+                    use_container_width=True
+                )
+            else:
+                st.text("Belum ada data")
+        flight = coalescing_stats()
+        st.caption(
+            f"Fetch digabung: {flight['coalesced']} dari {flight['executed'] + flight['coalesced']} "
+            f"({flight['coalesced_ratio'] * 100:.0f}%) · sedang berjalan: {flight['in_flight']}"
+        )
+        if st.button("Ekspor ke File Metrik"):
+            path = timing.export_metrics(registry=session_registry, label="session")
+            if timing.is_enabled():
+                timing.export_metrics(path)
+            st.success(f"Metrik ditulis ke {path}")
+
+# ====================== MODE SCREENING UNIVERSE ======================
+if app_mode == "Screening Universe IDX":
+    st.subheader("🗂️ Screening Seluruh Saham IDX")
+    
+    try:
+        universe = load_universe()
+    except OSError as e:
+        st.error(f"Gagal membaca daftar saham: {str(e)}")
+        st.stop()
+    
+    st.caption(f"{len(universe)} saham dalam daftar universe")
+    if is_bundled_universe():
+        st.warning(
+            "Daftar bawaan hanya berisi sebagian emiten IDX (bukan seluruh ±900 saham). "
+            "Set SCREENER_UNIVERSE ke file daftar lengkap dari idx.co.id untuk screening seluruh bursa."
+        )
+    button_cols = st.columns([1, 1, 3])
+    with button_cols[0]:
+        run_screening = st.button("Jalankan Screening", type="primary")
+    with button_cols[1]:
+        update_prices = st.button("Perbarui Riwayat Harga")
+    
+    price_store = get_price_store()
+    if update_prices:
+        price_progress = st.progress(0.0)
+        try:
+            with span("screening.price_history"):
+                new_days = update_price_history(
+                    universe, store=price_store,
+                    progress_callback=lambda done, total: price_progress.progress(done / total)
+                )
+            st.success(f"Riwayat harga diperbarui: {new_days} hari bursa baru")
+        except Exception as e:
+            st.error(f"Gagal memperbarui riwayat harga: {str(e)}")
+        price_progress.empty()
+    
+    if run_screening:
+        progress_bar = st.progress(0.0)
+        progress_text = st.empty()
+        live_table = st.empty()
+        
+        # Hasil ditampilkan bertahap begitu tiap saham selesai diambil; setiap
+        # render hanya menilai saham yang baru masuk
+        stock_data = {}
+        live_screener = IncrementalScreener()
+        total = len(universe)
+        start_time = time.perf_counter()
+        last_render = 0.0
+        with span("screening.fetch"):
+            for ticker_code, ticker_data in iter_stock_data(universe, max_workers=16):
+                stock_data[ticker_code] = ticker_data
+                done = len(stock_data)
+                elapsed = time.perf_counter() - start_time
+                eta = elapsed / done * (total - done)
+                progress_bar.progress(done / total)
+                progress_text.text(f"Mengambil data {done}/{total} saham · {elapsed:.1f} dtk · ETA {eta:.0f} dtk")
+                
+                # Batasi render ulang tabel agar tidak membebani browser
+                if elapsed - last_render >= 0.5 or done == total:
+                    last_render = elapsed
+                    live_table.dataframe(
+                        live_screener.update(
+                            stock_data,
+                            growth_rate=default_growth/100,
+                            discount_rate=default_discount/100,
+                            terminal_growth=default_terminal/100,
+                            years=analysis_years,
+                            rules=lkh_rules
+                        )[0][["ticker", "LKH_Score", "price", "DCF_Value", "Margin_of_Safety", "PER", "PBV", "ROE"]],
+                        use_container_width=True
+                    )
+        
+        # Snapshot disimpan sebagai FundamentalsTable (array per kolom), bukan dict per saham
+        st.session_state["screening_data"] = FundamentalsTable.from_stock_data(stock_data)
+        st.session_state["screening_errors"] = sum(
+            1 for d in stock_data.values() if not d or "error" in d
+        )
+        st.session_state["screening_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        progress_bar.empty()
+        progress_text.empty()
+        live_table.empty()
+    
+    if "screening_data" in st.session_state:
+        # Skor dihitung ulang dari data yang sudah diambil setiap kali slider berubah,
+        # tanpa mengambil ulang data dari yfinance; harga terbaru dari refresher
+        # kuotasi diterapkan lebih dulu agar PER/PBV dan margin of safety tetap aktual.
+        # Hanya saham yang inputnya berubah sejak rerun sebelumnya yang dinilai ulang.
+        screener = st.session_state.setdefault("screener", IncrementalScreener())
+        with span("screening.score"):
+            screening_df, screening_diff = screener.update(
+                with_latest_quotes(st.session_state["screening_data"]),
+                growth_rate=default_growth/100,
+                discount_rate=default_discount/100,
+                terminal_growth=default_terminal/100,
+                years=analysis_years,
+                rules=lkh_rules
+            )
+        if not screening_diff.empty:
+            st.session_state["screening_diff"] = screening_diff
+        
+        # Indikator teknikal dari riwayat harga lokal (memory-mapped), jika sudah diunduh
+        has_history = price_store.n_days > 0
+        if has_history:
+            with span("screening.technical"):
+                screening_df = add_technical_columns(screening_df, technical_screen(price_store))
+        
+        filter_cols = st.columns(5 if has_history else 4)
+        with filter_cols[0]:
+            min_score = st.slider("Skor LKH Minimum", 0, 100, 60)
+        with filter_cols[1]:
+            use_per_filter = st.checkbox(f"PER ≤ {lkh_per_threshold}", False)
+        with filter_cols[2]:
+            use_roe_filter = st.checkbox(f"ROE ≥ {lkh_roe_threshold}%", False)
+        with filter_cols[3]:
+            undervalued_only = st.checkbox("Hanya Undervalued", False)
+        max_above_low = None
+        if has_history:
+            with filter_cols[4]:
+                if st.checkbox("Dekat Harga Terendah 52 Minggu", False):
+                    max_above_low = st.slider("Maks. di atas 52W Low (%)", 0, 50, 15)
+        
+        filtered_df = filter_screening(
+            screening_df,
+            min_score=min_score,
+            max_per=lkh_per_threshold if use_per_filter else None,
+            min_roe=lkh_roe_threshold if use_roe_filter else None,
+            undervalued_only=undervalued_only,
+            max_above_52w_low=max_above_low
+        )
+        
+        st.dataframe(
+            filtered_df.style.format({
+                "LKH_Score": "{:.1f}",
+                "price": "Rp {:,.0f}",
+                "DCF_Value": "Rp {:,.0f}",
+                "Margin_of_Safety": "{:+.1f}%",
+                "PER": "{:.1f}",
+                "PBV": "{:.2f}",
+                "ROE": "{:.1f}%",
+                "DER": "{:.2f}",
+                "EPS_Growth": "{:+.1f}%",
+                "FCF": "{:,.0f}",
+                "dividend_yield": "{:.1f}%",
+                "market_cap": "{:,.0f}",
+                "low_52w": "Rp {:,.0f}",
+                "high_52w": "Rp {:,.0f}",
+                "pct_above_52w_low": "{:+.1f}%",
+                "MA50": "Rp {:,.0f}",
+                "MA200": "Rp {:,.0f}",
+                "pct_vs_MA200": "{:+.1f}%",
+                "volatility": "{:.1f}%"
+            }, na_rep="-"),
+            use_container_width=True
+        )
+        st.caption(
+            f"{len(filtered_df)} dari {len(screening_df)} saham lolos filter · "
+            f"{st.session_state.get('screening_errors', 0)} gagal diambil · "
+            f"diperbarui {st.session_state.get('screening_time', '')} · "
+            f"{screener.last_stats['recomputed']} dinilai ulang pada rerun ini"
+        )
+        
+        alert_engine = start_alerts() if ALERTS_ENABLED else None
+        if alert_engine is not None and alert_engine.recent:
+            with st.expander(f"Alert Terbaru ({len(alert_engine.recent)})"):
+                st.dataframe(pd.DataFrame(list(alert_engine.recent)[::-1]), use_container_width=True, hide_index=True)
+        
+        if "screening_diff" in st.session_state:
+            diff = st.session_state["screening_diff"]
+            with st.expander(f"Perubahan Terakhir ({len(diff)} event)"):
+                st.caption(" · ".join(f"{event}: {count}" for event, count in diff["event"].value_counts().items()))
+                st.dataframe(diff, use_container_width=True, hide_index=True)
+    else:
+        st.info("Klik \"Jalankan Screening\" untuk menilai seluruh saham dalam universe.")
+    
+    render_timing_panel()
+    st.stop()
+
 # ====================== BAGIAN UTAMA ======================
 col1, col2 = st.columns([1, 3])
 
@@ -99,12 +385,12 @@ with col2:
         st.subheader(f"📊 Hasil Analisis: {ticker}.JK")
         
         # Ambil data saham
-        with st.spinner(f"Mengambil data {ticker}..."):
+        with st.spinner(f"Mengambil data {ticker}..."), span("fetch"):
             data = fetch_stock_info(ticker)
             
         if data and "error" not in data:
             # 1. Hitung skor LKH
-            with st.spinner("Menghitung skor investasi LKH..."):
+            with st.spinner("Menghitung skor investasi LKH..."), span("lkh"):
                 try:
                     score = screen_stock_lkh({
                         "PER": data.get("PER"),
@@ -112,34 +398,25 @@ with col2:
                         "ROE": data.get("ROE"),
                         "DER": data.get("DER"),
                         "EPS_Growth": data.get("EPS_Growth")
-                    })
+                    }, lkh_rules)
                 except Exception as e:
                     st.error(f"Error menghitung skor LKH: {str(e)}")
                     score = None
             
             # 2. Hitung valuasi DCF
-            with st.spinner("Menghitung valuasi DCF..."):
-                fcf = data.get("FCF", 1e9)
-                price = data.get("price", 0)
-                
-                # Fallback jika FCF negatif
-                if fcf is None or fcf <= 0:
-                    fcf = data.get("market_cap", 1e9) * 0.05
+            with st.spinner("Menghitung valuasi DCF..."), span("dcf"):
+                fcf, price = valuation_inputs(data)
                 
                 try:
-                    dcf_value = calculate_dcf(
-                        fcf=fcf,
-                        growth_rate=default_growth/100,
-                        discount_rate=default_discount/100,
-                        terminal_growth=default_terminal/100,
-                        years=analysis_years
+                    dcf_value, margin_safety = dcf_stage(
+                        fcf, price,
+                        default_growth/100, default_discount/100, default_terminal/100,
+                        analysis_years
                     )
                 except Exception as e:
                     st.error(f"Error menghitung DCF: {str(e)}")
                     dcf_value = 0
-                
-                # Hitung margin of safety
-                margin_safety = ((dcf_value - price) / price) * 100 if price > 0 else 0
+                    margin_safety = ((dcf_value - price) / price) * 100 if price > 0 else 0
             
             # ================= TAMPILAN METRIK UTAMA =================
             col_a, col_b, col_c = st.columns(3)
@@ -251,104 +528,146 @@ with col2:
             if show_sensitivity:
                 st.subheader("📈 Analisis Sensitivitas DCF")
                 
-                with st.spinner("Menghitung sensitivitas..."):
+                with st.spinner("Menghitung sensitivitas..."), span("sensitivity"):
                     try:
-                        sensitivity = dcf_sensitivity_analysis(
-                            base_fcf=fcf,
-                            base_growth=default_growth/100,
-                            base_discount=default_discount/100,
-                            base_terminal=default_terminal/100,
-                            years=analysis_years
+                        growth_axis, discount_axis, sensitivity = sensitivity_stage(
+                            fcf,
+                            default_growth/100, default_discount/100, default_terminal/100,
+                            analysis_years, sensitivity_steps
                         )
                         
-                        # Format hasil sensitivitas
-                        growth_rates = [default_growth*0.7, default_growth, default_growth*1.3]
-                        discount_rates = [default_discount*0.9, default_discount, default_discount*1.1]
-                        
-                        sens_matrix = np.zeros((3, 3))
-                        for i, gr in enumerate(growth_rates):
-                            for j, dr in enumerate(discount_rates):
-                                key = f"Scenario_G{i+1}_DR{j+1}"
-                                sens_matrix[i, j] = sensitivity.get(key, 0)
-                        
-                        # Tabel sensitivitas
-                        sens_df = pd.DataFrame(
-                            sens_matrix,
-                            index=[f"Growth {gr:.1f}%" for gr in growth_rates],
-                            columns=[f"Discount {dr:.1f}%" for dr in discount_rates]
-                        )
+                        plot_sensitivity_heatmap(sensitivity)
                         
-                        st.dataframe(
-                            sens_df.style.format("{:,.0f}").background_gradient(cmap="RdYlGn"), 
-                            use_container_width=True
-                        )
+                        # Tabel sensitivitas untuk grid kecil
+                        if sensitivity_steps <= 7:
+                            sens_df = sensitivity.copy()
+                            sens_df.index = [f"Growth {gr*100:.1f}%" for gr in growth_axis]
+                            sens_df.columns = [f"Discount {dr*100:.1f}%" for dr in discount_axis]
+                            
+                            st.dataframe(
+                                sens_df.style.format("{:,.0f}").background_gradient(cmap="RdYlGn"), 
+                                use_container_width=True
+                            )
                         st.caption("Heatmap Sensitivitas: Nilai Intrinsik (Rp)")
                     except Exception as e:
                         st.error(f"Gagal menghitung analisis sensitivitas: {str(e)}")
             
-            # ================= VISUALISASI DATA =================
-            st.subheader("📊 Tren Historis dan Proyeksi")
-            
-            # Data simulasi (di aplikasi nyata ambil dari API)
-            current_year = datetime.now().year
-            years = list(range(current_year-4, current_year+1))
-            
-            # Simulasi data historis
-            eps_values = [100, 120, 110, 150, 180]
-            fcf_values = [800, 950, 900, 1200, 1500]
-            revenue = [3000, 3500, 3200, 4000, 4800]
-            
-            # Proyeksi masa depan
-            projection_years = list(range(current_year+1, current_year+analysis_years+1))
-            projection_eps = [eps_values[-1] * (1 + default_growth/100)**(i+1) for i in range(analysis_years)]
-            projection_fcf = [fcf_values[-1] * (1 + default_growth/100)**(i+1) for i in range(analysis_years)]
-            projection_revenue = [revenue[-1] * (1 + default_growth/100)**(i+1) for i in range(analysis_years)]
-            
-            # Gabungkan data
-            all_years = years + projection_years
-            all_eps = eps_values + projection_eps
-            all_fcf = fcf_values + projection_fcf
-            all_revenue = revenue + projection_revenue
+            # ================= SIMULASI MONTE CARLO =================
+            if show_monte_carlo:
+                st.subheader("🎲 Simulasi Monte Carlo DCF")
+                
+                with st.spinner("Menjalankan simulasi..."), span("monte_carlo"):
+                    try:
+                        mc_result = monte_carlo_stage(
+                            fcf, price,
+                            default_growth/100, default_discount/100, default_terminal/100,
+                            analysis_years,
+                            mc_growth_std/100, mc_discount_std/100, mc_paths
+                        )
+                        
+                        mc_cols = st.columns(4)
+                        pct = mc_result["percentiles"]
+                        with mc_cols[0]:
+                            st.metric("P5", f"Rp {pct[5] or 0:,.0f}")
+                        with mc_cols[1]:
+                            st.metric("Median", f"Rp {pct[50] or 0:,.0f}")
+                        with mc_cols[2]:
+                            st.metric("P95", f"Rp {pct[95] or 0:,.0f}")
+                        with mc_cols[3]:
+                            prob = mc_result["prob_undervalued"]
+                            st.metric("Peluang Undervalued", f"{prob * 100:.1f}%" if prob is not None else "N/A")
+                        
+                        plot_dcf_distribution(mc_result, current_price=price)
+                        st.caption(f"{mc_result['n_valid']:,} dari {mc_result['n_paths']:,} simulasi valid "
+                                   f"(diskonto > pertumbuhan terminal)")
+                    except Exception as e:
+                        st.error(f"Gagal menjalankan simulasi Monte Carlo: {str(e)}")
             
-            # Plot grafik
-            try:
-                plot_financial_chart(
-                    years=all_years,
-                    eps_values=all_eps,
-                    fcf_values=all_fcf,
-                    revenue_values=all_revenue
-                )
-            except Exception as e:
-                st.error(f"Gagal menampilkan grafik: {str(e)}")
+            # ================= VISUALISASI DATA =================
+            # Laporan keuangan hanya diambil jika bagian ini ditampilkan, setelah
+            # metrik utama di atas sudah dirender
+            if show_history:
+                st.subheader("📊 Tren Historis dan Proyeksi")
+                
+                frequency = "annual" if statement_frequency == "Tahunan" else "quarterly"
+                with st.spinner("Mengambil laporan keuangan..."), span("statements"):
+                    statements = fetch_financial_statements(ticker, frequency)
+                
+                if statements.empty:
+                    st.info("Laporan keuangan historis tidak tersedia untuk saham ini")
+                else:
+                    # Nilai Rupiah ditampilkan dalam juta sesuai label sumbu grafik
+                    eps_values = statements["EPS"].fillna(0).tolist()
+                    fcf_values = (statements["FCF"].fillna(0) / 1e6).tolist()
+                    revenue = (statements["Revenue"].fillna(0) / 1e6).tolist()
+                    
+                    if frequency == "annual":
+                        years = statements["year"].tolist()
+                        
+                        # Proyeksi masa depan dari periode terakhir
+                        last_year = years[-1]
+                        projection_years = list(range(last_year+1, last_year+analysis_years+1))
+                        projection_eps = [eps_values[-1] * (1 + default_growth/100)**(i+1) for i in range(analysis_years)]
+                        projection_fcf = [fcf_values[-1] * (1 + default_growth/100)**(i+1) for i in range(analysis_years)]
+                        projection_revenue = [revenue[-1] * (1 + default_growth/100)**(i+1) for i in range(analysis_years)]
+                        
+                        # Gabungkan data
+                        all_years = years + projection_years
+                        all_eps = eps_values + projection_eps
+                        all_fcf = fcf_values + projection_fcf
+                        all_revenue = revenue + projection_revenue
+                    else:
+                        all_years = [f"{p.year}-Q{p.quarter}" for p in statements["period"]]
+                        all_eps = eps_values
+                        all_fcf = fcf_values
+                        all_revenue = revenue
+                    
+                    # Plot grafik
+                    try:
+                        with span("chart"):
+                            plot_financial_chart(
+                                years=all_years,
+                                eps_values=all_eps,
+                                fcf_values=all_fcf,
+                                revenue_values=all_revenue
+                            )
+                    except Exception as e:
+                        st.error(f"Gagal menampilkan grafik: {str(e)}")
             
             # ================= REKOMENDASI INVESTASI =================
             st.subheader("📝 Rekomendasi Investasi")
-            
-            if score and score >= 80 and dcf_value > price and data.get("DER", 0) < 1:
-                st.success("""
-                **✅ REKOMENDASI BELI**
-                - Memenuhi kriteria ketat investasi nilai (LKH)
-                - Margin of safety yang cukup
-                - Struktur keuangan sehat (DER rendah)
-                """)
-            elif score and score >= 60 and dcf_value > price * 1.1:
-                st.info("""
-                **🟡 POTENSI BELI DENGAN CATATAN**
-                - Memenuhi sebagian kriteria investasi nilai
-                - Masih memiliki margin of safety
-                - Perlu analisis fundamental lebih mendalam
-                """)
-            else:
-                st.warning("""
-                **🔴 TIDAK DISARANKAN SAAT INI**
-                - Tidak memenuhi kriteria investasi nilai
-                - Valuasi sudah mahal (overvalued)
-                - Pertimbangkan untuk mencari alternatif saham lain
-                """)
+            with span("recommendation"):
+                if score and score >= 80 and dcf_value > price and data.get("DER", 0) < 1:
+                    st.success("""
+                    **✅ REKOMENDASI BELI**
+                    - Memenuhi kriteria ketat investasi nilai (LKH)
+                    - Margin of safety yang cukup
+                    - Struktur keuangan sehat (DER rendah)
+                    """)
+                elif score and score >= 60 and dcf_value > price * 1.1:
+                    st.info("""
+                    **🟡 POTENSI BELI DENGAN CATATAN**
+                    - Memenuhi sebagian kriteria investasi nilai
+                    - Masih memiliki margin of safety
+                    - Perlu analisis fundamental lebih mendalam
+                    """)
+                else:
+                    st.warning("""
+                    **🔴 TIDAK DISARANKAN SAAT INI**
+                    - Tidak memenuhi kriteria investasi nilai
+                    - Valuasi sudah mahal (overvalued)
+                    - Pertimbangkan untuk mencari alternatif saham lain
+                    """)
             
             # Footer
+            age = data_age(data)
+            freshness = f" ({format_age(age)} lalu)" if age is not None else ""
+            if is_stale(data):
+                freshness += " · sedang diperbarui di latar belakang"
             st.markdown(f"<div style='text-align:center; color:#7f8c8d; margin-top:30px;'>"
-                        f"Analisis terakhir diperbarui: {st.session_state.get('analysis_time', '')}"
+                        f"Analisis terakhir diperbarui: {st.session_state.get('analysis_time', '')}<br>"
+                        f"Data fundamental per: {data.get('last_updated', '-')}{freshness}"
+                        f"{f' · Harga per: ' + data['price_updated'] if data.get('price_updated') else ''}"
                         f"</div>", unsafe_allow_html=True)
             
         else:
@@ -391,21 +710,23 @@ with col2:
 
         # Metodologi analisis
         with st.expander("📚 Metodologi Analisis"):
-            st.markdown("""
+            st.markdown(f"""
             **Value Investing ala Lo Kheng Hong:**
             - Skoring fundamental (0-100) berdasarkan:
-              - Valuasi (PER ≤ 12, PBV ≤ 1.2) - 30%
-              - Profitabilitas (ROE ≥ 15%) - 30%
+              - Valuasi (PER ≤ {lkh_per_threshold}, PBV ≤ 1.2) - 30%
+              - Profitabilitas (ROE ≥ {lkh_roe_threshold}%) - 30%
               - Pertumbuhan (EPS Growth ≥ 10%) - 20%
               - Kesehatan keuangan (DER ≤ 0.8) - 20%
             
             **Discounted Cash Flow (DCF):**
             - Model 2-tahap: Proyeksi eksplisit + terminal value
             - Free Cash Flow sebagai dasar valuasi
-            - Analisis sensitivitas 3x3 (growth vs discount rate)
+            - Analisis sensitivitas growth vs discount rate (resolusi grid bisa diatur)
             
             **Tren Finansial:**
-            - Visualisasi EPS dan Free Cash Flow 5 tahun terakhir
-            - Proyeksi 5 tahun ke depan
+            - Visualisasi EPS dan Free Cash Flow dari laporan keuangan tahunan/kuartalan
+            - Proyeksi sesuai jumlah tahun proyeksi
             - Pertumbuhan tahunan (YoY)
             """)
+
+render_timing_panel()
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.alerts import AlertEngine, AlertRule, compile_condition, default_alert_rules, DEFAULT_ALERT_PARAMS
+
+CONDITIONS = [
+    "Margin_of_Safety > 30",
+    "PER < lkh_per_threshold and ROE > lkh_roe_threshold",
+    "10 <= PER < 15 or not ROE > 5",
+    "PER * PBV < 22.5 and -DER > -1",
+    "price / (PBV + 1) >= 100",
+    "lkh_per_threshold > 10",
+]
+
+
+def _frame(n: int = 500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "ticker": [f"T{i:03d}" for i in range(n)],
+        "price": rng.uniform(50, 5000, n),
+        "PER": rng.uniform(-5, 40, n),
+        "PBV": rng.uniform(0.2, 5, n),
+        "ROE": rng.uniform(-10, 35, n),
+        "DER": rng.uniform(0, 3, n),
+        "Margin_of_Safety": rng.uniform(-80, 80, n),
+        "LKH_Score": rng.uniform(0, 100, n),
+    })
+    numeric = df.columns[1:]
+    df[numeric] = df[numeric].mask(rng.random((n, len(numeric))) < 0.1)
+    return df
+
+
+@pytest.mark.parametrize("condition", CONDITIONS)
+def test_compiled_predicate_matches_row_by_row(condition):
+    df = _frame()
+    params = {"lkh_per_threshold": 12, "lkh_roe_threshold": 15}
+    predicate, names = compile_condition(condition)
+    columns = {c: df[c].to_numpy() for c in names if c in df.columns}
+    result = predicate(columns, params, len(df))
+
+    # Referensi: eval per baris dengan semantik Python (NaN tidak memenuhi perbandingan)
+    expected = [bool(eval(condition, {}, {**row, **params})) for row in df.to_dict("records")]
+    np.testing.assert_array_equal(result, expected)
+    assert names <= set(df.columns) | set(params)
+
+
+@pytest.mark.parametrize("condition", [
+    "__import__('os').system('true')", "PER.real > 1", "PER ** 2 > 1", "PER in (1, 2)", "PER >", "'a' < PER",
+])
+def test_unsupported_conditions_are_rejected(condition):
+    with pytest.raises(ValueError):
+        compile_condition(condition)
+
+
+def test_unknown_names_are_rejected_when_rule_is_added():
+    with pytest.raises(ValueError, match="PE_Ratio"):
+        AlertEngine([AlertRule("typo", "PE_Ratio < 10")])
+    engine = AlertEngine(default_alert_rules(), params=DEFAULT_ALERT_PARAMS)
+    with pytest.raises(ValueError):
+        engine.add_rule(AlertRule("undervalued", "Margin_of_Safety > 10"))
+    with pytest.raises(ValueError):
+        engine.add_rule(AlertRule("bad_param", "PER < max_per"))
+    assert [r.name for r in engine.rules] == [r.name for r in default_alert_rules()]
+
+
+def test_missing_column_does_not_stop_other_rules():
+    engine = AlertEngine(default_alert_rules(), params=DEFAULT_ALERT_PARAMS)
+    df = _frame().drop(columns=["Margin_of_Safety"])
+    alerts = engine.evaluate(df, now=1000.0)
+    assert set(alerts["rule"]) == {"lkh_80", "lkh_criteria"}
+
+
+def test_engines_sharing_state_file_fire_once(tmp_path):
+    path = str(tmp_path / "alert_state.json")
+    rules = [AlertRule("undervalued", "Margin_of_Safety > 0", cooldown=0)]
+    first = AlertEngine(rules, params=DEFAULT_ALERT_PARAMS, state_path=path)
+    second = AlertEngine(rules, params=DEFAULT_ALERT_PARAMS, state_path=path)
+    df = _frame()
+    df.loc[0, "Margin_of_Safety"] = 50
+
+    fired = first.evaluate(df, now=1000.0)
+    assert "T000" in set(fired["ticker"])
+    # Proses lain melihat status yang sudah ditulis: tidak ada alert ganda
+    assert second.evaluate(df, now=1001.0).empty
+
+    # T000 keluar lalu masuk lagi lewat engine yang berbeda
+    df.loc[0, "Margin_of_Safety"] = -50
+    second.evaluate(df, now=1002.0)
+    df.loc[0, "Margin_of_Safety"] = 50
+    assert list(first.evaluate(df, now=1003.0)["ticker"]) == ["T000"]
+
+    second.set_params(lkh_per_threshold=9)
+    first.evaluate(df, now=1004.0)
+    assert first.params["lkh_per_threshold"] == 9
+    restarted = AlertEngine(rules, params=DEFAULT_ALERT_PARAMS, state_path=path)
+    assert restarted.params["lkh_per_threshold"] == 9
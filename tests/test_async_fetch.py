@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+import urllib.error
+
+import pytest
+
+import data.fetch_data as fetch_data
+from data.async_fetch import AsyncFetcher, ThrottledError, is_retryable_error, is_throttling_error
+
+
+def _http_error(code: int) -> urllib.error.HTTPError:
+    return urllib.error.HTTPError("http://example/info", code, "error", None, None)
+
+
+class YFRateLimitError(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def no_cache():
+    fetch_data.configure_store(None)
+    fetch_data.invalidate_stock_info()
+    yield
+    fetch_data.invalidate_stock_info()
+
+
+@pytest.mark.parametrize("exc, retryable", [
+    (_http_error(404), False),
+    (_http_error(403), False),
+    (_http_error(429), True),
+    (_http_error(503), True),
+    (urllib.error.URLError("connection refused"), True),
+    (ConnectionError(), True),
+    (ValueError("bad ticker"), False),
+])
+def test_retryable_errors(exc, retryable):
+    assert is_retryable_error(exc) is retryable
+
+
+def test_http_client_errors_are_retryable():
+    requests_errors = pytest.importorskip("requests.exceptions")
+    assert is_retryable_error(requests_errors.ConnectionError("connection reset"))
+    assert is_retryable_error(requests_errors.ReadTimeout("read timed out"))
+    assert not is_retryable_error(requests_errors.InvalidURL("bad url"))
+
+    curl_errors = pytest.importorskip("curl_cffi.requests.exceptions")
+    assert is_retryable_error(curl_errors.ConnectionError("Failed to connect", code=7))
+    assert is_retryable_error(curl_errors.Timeout("Operation timed out", code=28))
+    assert not is_retryable_error(curl_errors.InvalidURL("bad url"))
+
+
+def test_throttling_is_detected_by_type_or_status_not_message():
+    assert is_throttling_error(ThrottledError())
+    assert is_throttling_error(YFRateLimitError("Too Many Requests"))
+    assert is_throttling_error(_http_error(429))
+    assert not is_throttling_error(ValueError("ticker 4290 not found"))
+    assert not is_throttling_error(_http_error(404))
+
+
+def test_permanent_http_error_is_not_retried():
+    calls = []
+
+    def fetch(ticker):
+        calls.append(ticker)
+        raise _http_error(404)
+
+    fetcher = AsyncFetcher(fetch, rate=1000, burst=1000, base_delay=0.001)
+    result = asyncio.run(fetcher.fetch_many(["AAAA"], use_cache=False))
+    assert "error" in result["AAAA"]
+    assert calls == ["AAAA"]
+    assert fetcher.stats["retries"] == 0
+    assert fetcher.breaker.state == "closed"
+
+
+def test_timed_out_threads_are_bounded_by_max_concurrency():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_fetch(ticker):
+        with lock:
+            running.append(ticker)
+            peak.append(len(running))
+        time.sleep(0.2)
+        with lock:
+            running.remove(ticker)
+        raise ValueError("gagal")
+
+    fetcher = AsyncFetcher(slow_fetch, rate=1000, burst=1000, max_concurrency=2, timeout=0.01,
+                           max_retries=1, base_delay=0.001)
+    asyncio.run(fetcher.fetch_many([f"T{i:03d}" for i in range(10)], use_cache=False))
+    assert max(peak) <= 2
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.backtest import BacktestPanel, _point_in_time, run_backtest
+from data.store import FundamentalsStore
+
+# Input LKH (PER, PBV, ROE, DER, EPS_Growth) dengan skor default yang mudah dihitung
+SCORE_INPUTS = {
+    85: (5, 0.5, 25, 0.1, 20),   # 0.3*50 + 0.3*100 + 0.2*100 + 0.2*100
+    63: (10, 1.0, 17, 0.5, 12),  # 0.3*30 + 0.3*80 + 0.2*70 + 0.2*80
+    26: (20, 3.0, 12, 0.9, 6),   # 0.3*0 + 0.3*40 + 0.2*40 + 0.2*30
+    0: (30, 5.0, 0, 2.0, 0),
+}
+TICKERS = ["WWWW", "XXXX", "YYYY", "ZZZZ"]
+DATES = ["2026-01-30", "2026-02-27", "2026-03-31"]
+
+
+def _panel(scores: list, prices: list, fcf=None) -> BacktestPanel:
+    inputs = np.array([[SCORE_INPUTS[s] for s in row] for row in scores], dtype=np.float64)
+    fundamentals = {c: inputs[:, :, i] for i, c in enumerate(["PER", "PBV", "ROE", "DER", "EPS_Growth"])}
+    return BacktestPanel(DATES[:len(prices)], TICKERS, fundamentals, prices, fcf=fcf)
+
+
+def test_top_n_returns_hit_rate_turnover_and_ic():
+    panel = _panel(
+        scores=[[85, 63, 26, 0], [26, 85, 63, 0], [26, 85, 63, 0]],
+        prices=[[100, 100, 100, 100], [110, 100, 90, 120], [121, 105, 90, 108]],
+    )
+    result = run_backtest(panel, top_n=2)
+    periods = result["periods"]
+
+    assert list(result["holdings"].values()) == [["WWWW", "XXXX"], ["XXXX", "YYYY"], ["XXXX", "YYYY"]]
+    # t0: W +10%, X 0% vs rata-rata (10 + 0 - 10 + 20) / 4; t1: X +5%, Y 0% vs (10 + 5 + 0 - 10) / 4
+    np.testing.assert_allclose(periods["portfolio_return"][:2], [0.05, 0.025])
+    np.testing.assert_allclose(periods["benchmark_return"][:2], [0.05, 0.0125])
+    # Hanya W (t0) dan X (t1) yang mengalahkan benchmark
+    np.testing.assert_allclose(periods["hit_rate"][:2], [0.5, 0.5])
+    # t1 menukar W dengan Y, t2 tidak berubah
+    np.testing.assert_allclose(periods["turnover"], [np.nan, 0.5, 0.0])
+    # Spearman: t0 sum d^2 = 12 -> 1 - 72/60; t1 sum d^2 = 6 -> 1 - 36/60
+    np.testing.assert_allclose(periods["ic"][:2], [-0.2, 0.4])
+    # Tanggal terakhir belum punya return berikutnya
+    assert np.isnan(periods["portfolio_return"].iloc[-1]) and np.isnan(periods["ic"].iloc[-1])
+
+    summary = result["summary"]
+    assert summary["periods"] == 2
+    assert summary["total_return"] == pytest.approx(1.05 * 1.025 - 1)
+    assert summary["hit_rate"] == pytest.approx(0.5)
+    assert summary["mean_turnover"] == pytest.approx(0.25)
+    assert summary["mean_ic"] == pytest.approx(0.1)
+
+    # min_score membuang saham dengan skor di bawah batas walaupun slot masih ada
+    assert list(run_backtest(panel, top_n=3, min_score=60)["holdings"].values())[0] == ["WWWW", "XXXX"]
+
+
+def test_dcf_margin_breaks_ties_and_filters():
+    # Skor sama semua; DCF 1 tahun tanpa pertumbuhan ~ 10 x FCF, harga 100
+    fcf = [[5.0, 40.0, 30.0, 20.0], [5.0, np.nan, 30.0, 20.0]]
+    panel = _panel(scores=[[63] * 4] * 2, prices=[[100] * 4] * 2, fcf=fcf)
+    dcf = (0.0, 0.1, 0.0, 1)
+
+    # Tanpa DCF: skor sama dipecah menurut urutan kolom
+    assert list(run_backtest(panel, top_n=2)["holdings"].values()) == [["WWWW", "XXXX"]] * 2
+    # Margin -50/300/200/100%: margin tertinggi menang; margin NaN paling akhir
+    holdings = list(run_backtest(panel, top_n=2, dcf=dcf)["holdings"].values())
+    assert holdings == [["XXXX", "YYYY"], ["YYYY", "ZZZZ"]]
+    # min_margin 150%: hanya X dan Y yang lolos walaupun top_n = 3
+    holdings = list(run_backtest(panel, top_n=3, dcf=dcf, min_margin=150)["holdings"].values())
+    assert holdings == [["XXXX", "YYYY"], ["YYYY"]]
+
+
+def _epoch(wib: str) -> float:
+    return pd.Timestamp(wib, tz="Asia/Jakarta").timestamp()
+
+
+def test_point_in_time_ignores_snapshots_after_the_rebalance_date():
+    store = FundamentalsStore(":memory:")
+    store.put("WWWW", {"PER": 5, "price": 100}, fetched_at=_epoch("2026-01-30 23:59:59"))
+    # Tepat tengah malam WIB setelah tanggal rebalance: belum tersedia
+    store.put("WWWW", {"PER": 30, "price": 101}, fetched_at=_epoch("2026-01-31 00:00:00"))
+    store.put("XXXX", {"PER": 8}, fetched_at=_epoch("2026-02-20 10:00:00"))
+    store.put("YYYY", {"PER": 12}, fetched_at=_epoch("2025-12-15 10:00:00"))
+
+    dates = np.array(DATES[:2], dtype="datetime64[D]")
+    fields = _point_in_time(store, TICKERS, dates, max_age=60 * 86400)
+    np.testing.assert_array_equal(fields["PER"][0], [5, np.nan, 12, np.nan])
+    # Snapshot YYYY sudah lebih tua dari max_age pada tanggal kedua
+    np.testing.assert_array_equal(fields["PER"][1], [30, 8, np.nan, np.nan])
+    np.testing.assert_array_equal(fields["price"][:, 0], [100, 101])
+    store.close()
@@ -0,0 +1,60 @@
+import pytest
+
+from data.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("BBCA", 1)
+    cache.set("BBRI", 2, ttl=5)
+
+    clock.now += 4.9
+    assert cache.get("BBRI") == 2 and "BBRI" in cache
+    clock.now += 0.1
+    assert "BBRI" not in cache
+    assert cache.get("BBRI", "gone") == "gone"
+    assert cache.get("BBCA") == 1
+
+    clock.now += 55
+    assert cache.get("BBCA") is None
+    assert cache.stats() == {
+        "size": 0, "maxsize": 10, "ttl": 60, "hits": 2, "misses": 2, "evictions": 0, "expirations": 2,
+    }
+
+
+def test_least_recently_used_is_evicted_first():
+    cache = TTLCache(maxsize=3, ttl=60, clock=FakeClock())
+    for i, key in enumerate(["A", "B", "C"]):
+        cache.set(key, i)
+    assert cache.get("A") == 0  # A menjadi yang terbaru dipakai
+    cache.set("D", 3)  # B dikeluarkan
+    cache.set("C", 20)  # menimpa C memperbarui urutannya
+    cache.set("E", 4)  # A dikeluarkan
+
+    assert [k for k in "ABCDE" if k in cache] == ["C", "D", "E"]
+    assert cache.get("C") == 20
+    stats = cache.stats()
+    assert (stats["size"], stats["evictions"], stats["hits"], stats["misses"]) == (3, 2, 2, 0)
+
+
+def test_missing_keys_and_invalidate():
+    cache = TTLCache(maxsize=2, ttl=60, clock=FakeClock())
+    assert cache.get("X") is None
+    cache.set("X", 1)
+    assert cache.invalidate("X") and not cache.invalidate("X")
+    cache.set("Y", 2)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 1
+
+    with pytest.raises(ValueError):
+        TTLCache(maxsize=0)
@@ -0,0 +1,188 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.dcf_valuation import (
+    calculate_dcf, calculate_dcf_array, calculate_dcf_multistage, dcf_monte_carlo, dcf_sensitivity_analysis,
+    dcf_sensitivity_grid, growth_fade_schedule
+)
+
+FCF = np.array([-100.0, 0.0, 50.0, 1e3, np.nan])
+GROWTH = np.array([-0.1, 0.0, 0.12, 0.3])
+DISCOUNT = np.array([0.02, 0.03, 0.1, 0.15])
+TERMINAL = np.array([0.0, 0.03, 0.1])
+
+
+def _scalar_or_nan(fcf, growth, discount, terminal, years):
+    try:
+        return calculate_dcf(fcf, growth, discount, terminal, years)
+    except ValueError:
+        return np.nan
+
+
+@pytest.mark.parametrize("years", [1, 5, 10])
+def test_array_matches_scalar_over_broadcast_grid(years):
+    values, masks = calculate_dcf_array(
+        FCF[:, None, None, None], GROWTH[None, :, None, None],
+        DISCOUNT[None, None, :, None], TERMINAL[None, None, None, :], years
+    )
+    assert values.shape == (len(FCF), len(GROWTH), len(DISCOUNT), len(TERMINAL))
+
+    for idx in itertools.product(*(range(n) for n in values.shape)):
+        fcf, g, d, t = FCF[idx[0]], GROWTH[idx[1]], DISCOUNT[idx[2]], TERMINAL[idx[3]]
+        assert masks["invalid_discount"][idx] == (not d > t)
+        assert masks["invalid_fcf"][idx] == (not fcf > 0)
+        assert masks["valid"][idx] == (d > t and fcf > 0)
+        expected = _scalar_or_nan(fcf, g, d, t, years) if not np.isnan(fcf) else np.nan
+        np.testing.assert_allclose(values[idx], expected, rtol=1e-12)
+
+
+def test_invalid_elements_are_nan_and_flagged():
+    # discount == terminal, discount < terminal, FCF negatif, dan satu elemen valid
+    values, masks = calculate_dcf_array([100, 100, -5, 100], 0.1, [0.03, 0.02, 0.1, 0.1], 0.03)
+    np.testing.assert_array_equal(masks["invalid_discount"], [True, True, False, False])
+    np.testing.assert_array_equal(masks["invalid_fcf"], [False, False, True, False])
+    np.testing.assert_array_equal(masks["valid"], [False, False, False, True])
+    assert np.isnan(values[:3]).all()
+    assert values[3] == pytest.approx(calculate_dcf(100, 0.1, 0.1, 0.03))
+
+    with pytest.raises(ValueError):
+        calculate_dcf_array(100, 0.1, 0.1, 0.03, years=0)
+
+
+def _old_sensitivity_analysis(base_fcf, base_growth, base_discount, base_terminal, years=5):
+    # Implementasi 3x3 sebelum dcf_sensitivity_grid, sebagai referensi
+    growth_rates = [base_growth * 0.7, base_growth, base_growth * 1.3]
+    discount_rates = [base_discount * 0.9, base_discount, base_discount * 1.1]
+    results = {}
+    for i, gr in enumerate(growth_rates):
+        for j, dr in enumerate(discount_rates):
+            adjusted_dr = max(dr, base_terminal + 0.01)
+            value = calculate_dcf(fcf=base_fcf, growth_rate=gr, discount_rate=adjusted_dr,
+                                  terminal_growth=base_terminal, years=years)
+            results[f"Scenario_G{i+1}_DR{j+1}"] = round(value, 2)
+    return results
+
+
+@pytest.mark.parametrize("args", [
+    (1_000_000, 0.12, 0.10, 0.03, 5),
+    (2_500.5, 0.05, 0.08, 0.025, 10),
+    (50_000, 0.2, 0.035, 0.03, 3),  # 0.9 * diskonto di bawah terminal + 1%: diskonto disesuaikan
+])
+def test_sensitivity_analysis_output_unchanged(args):
+    assert dcf_sensitivity_analysis(*args) == _old_sensitivity_analysis(*args)
+
+
+def test_sensitivity_grid_shapes_and_invalid_cells():
+    grid = dcf_sensitivity_grid(1000, [0.05, 0.1], [0.02, 0.08, 0.12], 0.03, years=5)
+    assert list(grid.index) == [0.05, 0.1] and list(grid.columns) == [0.02, 0.08, 0.12]
+    assert grid[0.02].isna().all()
+    assert grid.at[0.1, 0.08] == pytest.approx(calculate_dcf(1000, 0.1, 0.08, 0.03, 5))
+
+    cube = dcf_sensitivity_grid(1000, [0.05, 0.1], [0.08, 0.12], [0.02, 0.03, 0.04])
+    assert isinstance(cube.index, pd.MultiIndex) and cube.shape == (6, 2)
+    assert cube.loc[(0.04, 0.05), 0.12] == pytest.approx(calculate_dcf(1000, 0.05, 0.12, 0.04, 5))
+
+
+MC_ARGS = dict(
+    fcf=1_000.0,
+    growth={"dist": "normal", "mean": 0.10, "std": 0.04},
+    discount={"dist": "triangular", "low": 0.02, "mode": 0.09, "high": 0.14},
+    terminal={"dist": "uniform", "low": 0.01, "high": 0.04},
+    years=5,
+    n_paths=20_000,
+    current_price=15_000,
+)
+
+
+def test_monte_carlo_is_reproducible_with_seed():
+    first = dcf_monte_carlo(**MC_ARGS, seed=7)
+    second = dcf_monte_carlo(**MC_ARGS, seed=7)
+    assert first["percentiles"] == second["percentiles"]
+    assert (first["mean"], first["prob_undervalued"]) == (second["mean"], second["prob_undervalued"])
+    np.testing.assert_array_equal(first["histogram"]["counts"], second["histogram"]["counts"])
+    assert dcf_monte_carlo(**MC_ARGS, seed=8)["mean"] != first["mean"]
+
+
+@pytest.mark.parametrize("chunk_size", [1_000, 7_777, 20_000, 50_000])
+def test_monte_carlo_does_not_depend_on_chunk_size(chunk_size):
+    reference = dcf_monte_carlo(**MC_ARGS, seed=3, chunk_size=20_000)
+    result = dcf_monte_carlo(**MC_ARGS, seed=3, chunk_size=chunk_size)
+    assert result["n_valid"] == reference["n_valid"]
+    assert result["prob_undervalued"] == reference["prob_undervalued"]
+    for p, value in reference["percentiles"].items():
+        assert result["percentiles"][p] == pytest.approx(value, rel=1e-12)
+
+
+def test_monte_carlo_counts_valid_paths():
+    result = dcf_monte_carlo(**MC_ARGS, seed=1, bins=40)
+    # Diskonto triangular bisa jatuh di bawah terminal growth: jalur itu dibuang
+    assert 0 < result["n_valid"] < result["n_paths"]
+    counts, edges = result["histogram"]["counts"], result["histogram"]["edges"]
+    assert len(counts) == 40 and len(edges) == 41
+    # Ekor di luar persentil 0.5-99.5 masuk ke bin tepi: tidak ada jalur valid yang hilang
+    assert counts.sum() == result["n_valid"]
+    assert edges[0] < result["percentiles"][5] < result["percentiles"][95] < edges[-1]
+
+    full = dcf_monte_carlo(**MC_ARGS, seed=1, bins=40, percentiles=(0, 100))
+    assert full["percentiles"][0] <= result["percentiles"][5] <= result["percentiles"][95] <= full["percentiles"][100]
+
+    fixed = dcf_monte_carlo(1_000.0, 0.1, 0.1, 0.03, n_paths=500, seed=1)
+    assert fixed["n_valid"] == 500 and fixed["std"] == pytest.approx(0, abs=1e-9)
+    assert fixed["histogram"]["counts"].sum() == 500
+    empty = dcf_monte_carlo(1_000.0, 0.1, 0.03, 0.05, n_paths=100, seed=1)
+    assert empty["n_valid"] == 0 and empty["mean"] is None and empty["histogram"]["counts"].sum() == 0
+
+
+def test_linear_fade_schedule():
+    # 2 tahun tetap 20%, lalu turun 4 langkah sama besar ke 4%
+    schedule = growth_fade_schedule(0.20, 0.04, high_growth_years=2, fade_years=4)
+    np.testing.assert_allclose(schedule, [0.20, 0.20, 0.16, 0.12, 0.08, 0.04])
+
+    per_stock = growth_fade_schedule([0.20, 0.10], [0.04, 0.02], high_growth_years=1, fade_years=2)
+    np.testing.assert_allclose(per_stock, [[0.20, 0.12, 0.04], [0.10, 0.06, 0.02]])
+    np.testing.assert_allclose(growth_fade_schedule(0.1, 0.03, 3, 0), [0.1, 0.1, 0.1])
+
+
+def test_exponential_fade_schedule():
+    # fade_rate = 2 ln 2: bobot (2^-k - 1/4) / (3/4) = 1/3 lalu 0
+    schedule = growth_fade_schedule(0.10, 0.04, 1, 2, method="exponential", fade_rate=2 * np.log(2))
+    np.testing.assert_allclose(schedule, [0.10, 0.06, 0.04])
+
+    # Lebih cepat turun daripada linear, tetapi tetap monoton dan berakhir tepat di terminal
+    fast = growth_fade_schedule(0.25, 0.03, 0, 5, method="exponential")
+    linear = growth_fade_schedule(0.25, 0.03, 0, 5)
+    assert np.all(np.diff(fast) < 0) and fast[-1] == pytest.approx(0.03)
+    assert np.all(fast[:-1] < linear[:-1])
+
+    with pytest.raises(ValueError):
+        growth_fade_schedule(0.1, 0.03, 0, 0)
+    with pytest.raises(ValueError):
+        growth_fade_schedule(0.1, 0.03, 2, 2, method="cubic")
+
+
+def test_multistage_matches_scalar_growth_rates_loop():
+    rng = np.random.default_rng(0)
+    n = 200
+    fcf = rng.uniform(-50, 1_000, n)
+    discount = rng.uniform(0.02, 0.15, n)
+    terminal = rng.uniform(0.0, 0.05, n)
+    schedule = growth_fade_schedule(rng.uniform(-0.05, 0.35, n), terminal, 3, 4, method="exponential")
+
+    values, masks = calculate_dcf_multistage(fcf, schedule, discount, terminal)
+    for i in range(n):
+        try:
+            expected = calculate_dcf(fcf[i], 0.0, discount[i], terminal[i], years=schedule.shape[1],
+                                     growth_rates=list(schedule[i]))
+        except ValueError:
+            expected = np.nan
+        np.testing.assert_allclose(values[i], expected, rtol=1e-12)
+        assert masks["valid"][i] == (fcf[i] > 0 and discount[i] > terminal[i])
+    assert 0 < masks["valid"].sum() < n
+
+    # Jalur pertumbuhan yang sama untuk semua saham (bentuk (tahun,))
+    shared, _ = calculate_dcf_multistage(fcf, schedule[0], 0.1, 0.03)
+    expected = [calculate_dcf(f, 0.0, 0.1, 0.03, 7, list(schedule[0])) if f > 0 else np.nan for f in fcf]
+    np.testing.assert_allclose(shared, expected, rtol=1e-12)
@@ -0,0 +1,44 @@
+import pytest
+
+import data.fetch_data as fetch_data
+from data.providers import SyntheticProvider
+
+
+class FlakyBatchProvider(SyntheticProvider):
+    """Batch kedua gagal seluruhnya, seperti permintaan bulk yang terputus"""
+
+    def __init__(self):
+        super().__init__(n_tickers=10, missing_rate=0)
+        self.batches = 0
+
+    def fetch_batch(self, tickers: list) -> dict:
+        self.batches += 1
+        if self.batches == 2:
+            raise ConnectionError("batch gagal")
+        return super().fetch_batch(tickers)
+
+
+@pytest.fixture
+def flaky_provider(monkeypatch):
+    previous = fetch_data.get_provider()
+    provider = FlakyBatchProvider()
+    fetch_data.set_provider(provider)
+    fetch_data.configure_store(None)
+    fetch_data.invalidate_stock_info()
+    monkeypatch.setattr(fetch_data, "BULK_CHUNK_SIZE", 3)
+    yield provider
+    fetch_data.invalidate_stock_info()
+    fetch_data.set_provider(previous)
+
+
+def test_failed_bulk_batch_yields_errors_and_continues(flaky_provider):
+    tickers = flaky_provider.list_tickers()[:8]
+    results = dict(fetch_data.iter_stock_data(tickers))
+
+    assert flaky_provider.batches == 3
+    assert list(results) == tickers
+    failed = [t for t, data in results.items() if "error" in data]
+    # Hanya ticker di batch kedua (indeks 3-5) yang gagal
+    assert failed == tickers[3:6]
+    assert results[tickers[3]] == {"ticker": tickers[3], "error": "batch gagal"}
+    assert all(results[t]["price"] > 0 for t in tickers[:3] + tickers[6:])
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data.fetch_data as fetch_data
+from data.financials import STATEMENT_COLUMNS, fetch_financial_statements, invalidate_financial_statements
+from data.providers import DataProvider, FileProvider, SyntheticProvider
+
+PERIODS = pd.to_datetime(["2025-12-31", "2024-12-31", "2023-12-31"])
+
+
+@pytest.fixture
+def use_provider():
+    previous = fetch_data.get_provider()
+
+    def use(provider):
+        fetch_data.set_provider(provider)
+        invalidate_financial_statements()
+        return provider
+
+    yield use
+    invalidate_financial_statements()
+    fetch_data.set_provider(previous)
+
+
+def test_recorded_statements_are_replayed(tmp_path, use_provider):
+    provider = use_provider(FileProvider(str(tmp_path)))
+    # Urutan seperti yfinance: periode terbaru di kolom pertama
+    income = pd.DataFrame(
+        [[300.0, 200.0, 100.0], [30.0, 20.0, 10.0], [3.0, 2.0, 1.0]], columns=PERIODS,
+        index=["Total Revenue", "Net Income", "Diluted EPS"]
+    )
+    cashflow = pd.DataFrame(
+        [[50.0, 40.0, 30.0], [-20.0, -15.0, -10.0]], columns=PERIODS,
+        index=["Operating Cash Flow", "Capital Expenditure"]
+    )
+    provider.record_statements("BBCA", "annual", income, cashflow)
+
+    frame = fetch_financial_statements("BBCA")
+    assert list(frame.columns) == STATEMENT_COLUMNS
+    assert list(frame["year"]) == [2023, 2024, 2025]
+    np.testing.assert_array_equal(frame["Revenue"], [100, 200, 300])
+    # FCF diturunkan dari arus kas operasi dikurangi capex
+    np.testing.assert_array_equal(frame["FCF"], [20, 25, 30])
+
+    # Frekuensi lain tidak direkam: frame kosong, bukan panggilan jaringan
+    assert fetch_financial_statements("BBCA", "quarterly").empty
+
+
+def test_synthetic_statements_work_offline(use_provider):
+    use_provider(SyntheticProvider(n_tickers=10))
+    annual = fetch_financial_statements("AAAB")
+    quarterly = fetch_financial_statements("AAAB", "quarterly")
+    assert len(annual) == 4 and len(quarterly) == 5
+    assert annual["period"].is_monotonic_increasing
+    assert not annual[STATEMENT_COLUMNS[2:]].isna().any().any()
+    pd.testing.assert_frame_equal(annual, fetch_financial_statements("AAAB", use_cache=False))
+
+
+def test_provider_without_statements_returns_empty_frame(use_provider):
+    use_provider(DataProvider())
+    frame = fetch_financial_statements("BBCA")
+    assert frame.empty and list(frame.columns) == STATEMENT_COLUMNS
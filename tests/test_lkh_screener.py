@@ -0,0 +1,69 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.lkh_screener import (
+    LKH_INPUT_COLUMNS, lkh_rules_from_thresholds, score_lkh_arrays, screen_stock_lkh, screen_stock_lkh_df
+)
+
+
+def _random_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "PER": rng.uniform(-5, 40, n),
+        "PBV": rng.uniform(0.2, 5, n),
+        "ROE": rng.uniform(-10, 35, n),
+        "DER": rng.uniform(0, 3, n),
+        "EPS_Growth": rng.uniform(-30, 50, n),
+    })
+    # Nilai tepat di batas pita dan nilai kosong
+    df.loc[:20, "PER"] = [8, 12, 15] * 7
+    df.loc[:20, "ROE"] = [20, 15, 10] * 7
+    df = df.mask(rng.random(df.shape) < 0.1)
+    return df
+
+
+@pytest.mark.parametrize("rules", [None, lkh_rules_from_thresholds(9, 22)])
+def test_vector_matches_scalar(rules):
+    df = _random_frame(2000)
+    vector = screen_stock_lkh_df(df, rules)["LKH_Score"].to_numpy()
+    # Fungsi skalar menerima NaN dari DataFrame dan None dari dict hasil fetch
+    for records in (df.to_dict("records"), df.astype(object).where(df.notna(), None).to_dict("records")):
+        scalar = np.array([screen_stock_lkh(row, rules) for row in records])
+        np.testing.assert_array_equal(scalar, vector)
+
+
+def test_nan_is_treated_as_missing():
+    data = {"PER": math.nan, "PBV": 0.5, "ROE": 25, "DER": 0.1, "EPS_Growth": 20}
+    assert screen_stock_lkh(data) == screen_stock_lkh({**data, "PER": None})
+    assert screen_stock_lkh(data) == screen_stock_lkh_df(pd.DataFrame([data]))["LKH_Score"].iloc[0]
+
+
+def test_score_lkh_arrays_keeps_shape():
+    df = _random_frame(60)
+    cols = {c: df[c].to_numpy().reshape(6, 10) for c in LKH_INPUT_COLUMNS}
+    scores = score_lkh_arrays(cols)
+    assert scores.shape == (6, 10)
+    np.testing.assert_array_equal(scores.reshape(-1), screen_stock_lkh_df(df)["LKH_Score"].to_numpy())
+
+
+def test_batch_cache_is_thread_safe():
+    frames = [_random_frame(50, seed) for seed in range(40)]  # lebih banyak dari kapasitas cache
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(200):
+                screen_stock_lkh_df(frames[(i + offset) % len(frames)])
+        except Exception as e:  # pragma: no cover - hanya terjadi jika ada race
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
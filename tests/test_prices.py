@@ -0,0 +1,120 @@
+import contextlib
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data.fetch_data as fetch_data
+from analysis.technical import technical_screen
+from data.prices import PRICE_FIELDS, PriceHistoryStore, update_price_history
+from data.providers import FileProvider
+
+DAYS = pd.bdate_range("2026-01-05", periods=10)
+
+
+def _frames(tickers: list, days=DAYS, offset: float = 0) -> dict:
+    frames = {}
+    for k, name in enumerate(PRICE_FIELDS):
+        values = {t: np.arange(len(days)) + 100 * i + 10 * k + offset for i, t in enumerate(tickers)}
+        frames[name] = pd.DataFrame(values, index=days, dtype=np.float64)
+    return frames
+
+
+def test_reader_sees_columns_added_by_another_writer(tmp_path):
+    writer = PriceHistoryStore(str(tmp_path))
+    reader = PriceHistoryStore(str(tmp_path))
+    writer.append(_frames(["BBCA", "BBRI"], DAYS[:6]))
+    before = reader.field("close")
+    assert before.shape == (6, 2)
+
+    # Ticker baru memaksa _widen (file ditulis ulang) sekaligus menambah hari
+    writer.append(_frames(["TLKM", "BBCA"], DAYS[4:]))
+
+    close = reader.field("close")
+    assert reader.tickers == ["BBCA", "BBRI", "TLKM"]
+    assert close.shape == (10, 3)
+    # Hari 4-5 sudah ada: nilai BBCA ditimpa di tempat, lalu 4 hari baru ditambahkan
+    np.testing.assert_array_equal(reader.series("BBCA"), [30, 31, 32, 33, *range(130, 136)])
+    np.testing.assert_array_equal(close[:4, 2], np.full(4, np.nan))
+    np.testing.assert_array_equal(close[4:, 2], np.arange(6) + 30)
+    np.testing.assert_array_equal(close[:6, 1], np.arange(6) + 130)
+    assert np.isnan(close[6:, 1]).all()
+    # Mapping lama tetap konsisten dengan bentuk saat dibuka
+    np.testing.assert_array_equal(before[:, 1], np.arange(6) + 130)
+
+
+def test_technical_screen_reads_one_consistent_view(tmp_path, monkeypatch):
+    days = pd.bdate_range("2025-01-01", periods=300)
+    writer = PriceHistoryStore(str(tmp_path))
+    reader = PriceHistoryStore(str(tmp_path))
+    writer.append(_frames(["BBCA", "BBRI"], days))
+
+    # Penulis lain menambah saham tepat sebelum pembacaan kedua dari store
+    reading, calls = reader._reading, []
+
+    @contextlib.contextmanager
+    def interleaved_reading():
+        calls.append(len(calls))
+        if len(calls) == 2:
+            writer.append(_frames(["TLKM"], days))
+        with reading():
+            yield
+
+    monkeypatch.setattr(reader, "_reading", interleaved_reading)
+    df = technical_screen(reader)
+    assert list(df["ticker"]) == ["BBCA", "BBRI"]
+    # Nilai tiap baris milik ticker yang sama: close = hari + 100 * kolom + 30
+    np.testing.assert_array_equal(df["last_close"], [329, 429])
+    # low = hari + 100 * kolom + 20; hari pertama jendela 52 minggu adalah 300 - 252
+    np.testing.assert_array_equal(df["low_52w"], [48 + 20, 148 + 20])
+
+    blocks, tickers = reader.windows({"close": 252, "low": 10})
+    assert len(calls) == 2 and tickers == ["BBCA", "BBRI", "TLKM"]
+    assert blocks["close"].shape == (252, 3) and blocks["low"].shape == (10, 3)
+
+
+def _append_columns(directory: str, tickers: list):
+    store = PriceHistoryStore(directory)
+    for ticker in tickers:
+        store.append(_frames([ticker]))
+
+
+def test_concurrent_writers_in_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    groups = [[f"A{i:02d}" for i in range(8)], [f"B{i:02d}" for i in range(8)]]
+    procs = [context.Process(target=_append_columns, args=(str(tmp_path), g)) for g in groups]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+
+    store = PriceHistoryStore(str(tmp_path))
+    assert sorted(store.tickers) == sorted(groups[0] + groups[1])
+    assert len(store.dates) == len(DAYS)
+    for ticker in store.tickers:
+        np.testing.assert_array_equal(store.series(ticker), np.arange(len(DAYS)) + 30)
+
+
+@pytest.fixture
+def file_provider(tmp_path):
+    previous = fetch_data.get_provider()
+    provider = FileProvider(str(tmp_path / "fixtures"))
+    fetch_data.set_provider(provider)
+    yield provider
+    fetch_data.set_provider(previous)
+
+
+def test_update_from_recorded_history(tmp_path, file_provider):
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=20)
+    for ticker, frame in _frames(["BBCA", "TLKM"], days)["close"].items():
+        bars = pd.DataFrame({name: frame + k for k, name in enumerate(PRICE_FIELDS)})
+        file_provider.record_history(ticker, bars)
+
+    store = PriceHistoryStore(str(tmp_path / "prices"))
+    assert update_price_history(["BBCA", "TLKM", "MISSING"], store=store) == 20
+    assert store.tickers == ["BBCA", "TLKM"]
+    np.testing.assert_array_equal(store.series("TLKM", "volume"), np.arange(20) + 130 + 4)
+    history = file_provider.fetch_history(["BBCA"], start=days[15])
+    assert list(history["close"].index) == list(days[15:])
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+
+import data.fetch_data as fetch_data
+from data.providers import SyntheticProvider
+from data.refresher import WIB, BackgroundRefresher
+
+TICKERS = ["BBCA", "BBRI", "TLKM"]
+TRADING_HOURS = datetime(2026, 3, 4, 10, 0, tzinfo=WIB)  # Rabu
+
+
+class CountingProvider(SyntheticProvider):
+    def __init__(self):
+        super().__init__(n_tickers=10)
+        self.quote_calls = 0
+
+    def fetch_quotes(self, tickers: list) -> dict:
+        self.quote_calls += 1
+        return super().fetch_quotes(tickers)
+
+
+@pytest.fixture
+def provider(tmp_path):
+    previous = fetch_data.get_provider()
+    provider = CountingProvider()
+    fetch_data.set_provider(provider)
+    fetch_data.configure_store(str(tmp_path / "fundamentals.sqlite"))
+    yield provider
+    fetch_data.configure_store(None)
+    fetch_data.set_provider(previous)
+
+
+def _refresher() -> BackgroundRefresher:
+    refresher = BackgroundRefresher(TICKERS, intraday_interval=60)
+    refresher.jobs = []
+    refresher.add_listener(refresher.jobs.append)
+    return refresher
+
+
+def test_only_the_lease_holder_fetches_quotes(provider):
+    leader, follower = _refresher(), _refresher()
+
+    leader.tick(TRADING_HOURS)
+    follower.tick(TRADING_HOURS)
+
+    assert leader.is_leader and not follower.is_leader
+    assert provider.quote_calls == 1
+    # Follower tetap memberi tahu listener, dengan kuotasi dari store
+    assert leader.jobs == ["intraday"] and follower.jobs == ["intraday"]
+    assert set(fetch_data.load_stored_quotes(TICKERS)) == set(TICKERS)
+
+    leader.stop()
+    follower.last_run["intraday"] = None
+    follower.tick(TRADING_HOURS)
+    assert follower.is_leader
+    assert provider.quote_calls == 2
+
@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+from data.singleflight import SingleFlight
+
+
+def test_cancelled_async_follower_does_not_cancel_the_call():
+    flight = SingleFlight()
+    thread_result = {}
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def fetch(key):
+            await release.wait()
+            return f"info-{key}"
+
+        leader = asyncio.create_task(flight.do_async("BBCA", fetch, "BBCA"))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do_async("BBCA", fetch, "BBCA")) for _ in range(3)]
+        thread = threading.Thread(
+            target=lambda: thread_result.setdefault("value", flight.do("BBCA", lambda: "unused"))
+        )
+        thread.start()
+        await asyncio.sleep(0.05)
+
+        followers[0].cancel()
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(leader, *followers, return_exceptions=True)
+        await asyncio.to_thread(thread.join)
+        return results
+
+    leader, cancelled, *others = asyncio.run(scenario())
+
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert leader == "info-BBCA"
+    assert others == ["info-BBCA", "info-BBCA"]
+    assert thread_result["value"] == "info-BBCA"
+    assert flight.stats()["executed"] == 1 and flight.in_flight() == 0
@@ -0,0 +1,73 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analysis.sweep as sweep
+from analysis.backtest import BacktestPanel, rules_grid, run_backtest, sweep_rules
+from analysis.sweep import SweepConfig, config_grid, run_sweep
+
+
+def _panel(n_dates: int = 24, n_tickers: int = 60, seed: int = 0) -> BacktestPanel:
+    rng = np.random.default_rng(seed)
+    shape = (n_dates, n_tickers)
+    fundamentals = {
+        "PER": rng.uniform(2, 30, shape),
+        "PBV": rng.uniform(0.3, 4, shape),
+        "ROE": rng.uniform(-5, 35, shape),
+        "DER": rng.uniform(0, 2, shape),
+        "EPS_Growth": rng.uniform(-20, 30, shape),
+    }
+    for values in fundamentals.values():
+        values[rng.random(shape) < 0.05] = np.nan
+    prices = 1000 * np.exp(np.cumsum(rng.normal(0.005, 0.08, shape), axis=0))
+    prices[rng.random(shape) < 0.02] = np.nan
+    fcf = prices * rng.uniform(-0.05, 0.2, shape)
+    dates = pd.date_range("2024-01-31", periods=n_dates, freq="ME").to_numpy().astype("datetime64[D]")
+    return BacktestPanel(dates, [f"T{i:03d}" for i in range(n_tickers)], fundamentals, prices, fcf=fcf)
+
+
+@pytest.fixture
+def shared_names(monkeypatch):
+    names = []
+
+    class RecordingSharedPanel(sweep.SharedPanel):
+        def __init__(self, panel):
+            super().__init__(panel)
+            names.append(self.spec[0])
+
+    monkeypatch.setattr(sweep, "SharedPanel", RecordingSharedPanel)
+    return names
+
+
+def test_workers_do_not_change_results(shared_names):
+    panel = _panel()
+    configs = config_grid(per_thresholds=[8, 12, 16, 20], roe_thresholds=[10, 15],
+                          min_margins=[None, 0, 25, 50, 75], base=SweepConfig(top_n=10))
+    assert len(configs) == 40
+
+    serial = run_sweep(panel, configs, max_workers=1)
+    parallel = run_sweep(panel, configs, max_workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial["sharpe"].notna().all()
+
+    # Proses tunggal tidak membuat shared memory; sweep paralel menghapusnya setelah selesai
+    assert len(shared_names) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=shared_names[0])
+
+
+def test_sweep_rules_matches_run_backtest(shared_names):
+    panel = _panel(seed=1)
+    rules_list = rules_grid([8, 12, 16], [10, 15, 20])
+    df = sweep_rules(panel, rules_list, top_n=10, max_workers=2)
+
+    base = SweepConfig()
+    dcf = (base.growth_rate, base.discount_rate, base.terminal_growth, base.years)
+    assert list(df["fingerprint"]) == [rules.fingerprint for rules in rules_list]
+    for row, rules in zip(df.to_dict("records"), rules_list):
+        summary = run_backtest(panel, rules, top_n=10, dcf=dcf)["summary"]
+        assert {k: row[k] for k in summary} == pytest.approx(summary, nan_ok=True)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=shared_names[0])
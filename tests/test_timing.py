@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+from utils import timing
+
+
+@pytest.fixture(autouse=True)
+def _process_timing_off(monkeypatch):
+    monkeypatch.setattr(timing, "_enabled", False)
+    timing.process_registry.clear()
+    yield
+    timing.unbind_session()
+    timing.process_registry.clear()
+
+
+def _spans(registry) -> dict:
+    return {row["span"]: row["count"] for row in registry.summary()}
+
+
+def test_session_binding_does_not_touch_process_switch():
+    session = timing.TimingRegistry()
+    other = {}
+
+    def other_session():
+        # Sesi lain tanpa panel timing: tidak mengukur apa pun
+        timing.unbind_session()
+        other["noop"] = timing.span("other") is timing._NOOP
+
+    timing.bind_session(session)
+    with timing.span("screening"):
+        with timing.span("score"):
+            pass
+    thread = threading.Thread(target=other_session)
+    thread.start()
+    thread.join()
+
+    assert _spans(session) == {"screening": 1, "screening/score": 1}
+    assert other["noop"]
+    assert not timing.is_enabled()
+    assert timing.process_registry.summary() == []
+
+    timing.unbind_session()
+    assert timing.span("after") is timing._NOOP
+
+
+def test_process_switch_survives_unbound_sessions(monkeypatch):
+    monkeypatch.setattr(timing, "_enabled", True)
+    thread = threading.Thread(target=timing.unbind_session)
+    thread.start()
+    thread.join()
+
+    with timing.span("fetch"):
+        pass
+    assert timing.is_enabled()
+    assert _spans(timing.process_registry) == {"fetch": 1}
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from analysis.lkh_screener import lkh_rules_from_thresholds
+from analysis.universe_screener import DIFF_COLUMNS, IncrementalScreener, diff_screenings, screen_universe
+from data.fetch_data import PRICE_INVERSE_FIELDS, PRICE_SCALED_FIELDS, apply_quote
+from data.records import FundamentalsTable, _parse_time
+
+DCF = dict(growth_rate=0.12, discount_rate=0.10, terminal_growth=0.03, years=5)
+
+
+def _stock_data(n: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n):
+        row = {
+            "price": float(rng.uniform(50, 10000)),
+            "PER": float(rng.uniform(-5, 40)),
+            "PBV": float(rng.uniform(0.2, 5)),
+            "ROE": float(rng.uniform(-10, 35)),
+            "DER": float(rng.uniform(0, 3)),
+            "EPS_Growth": float(rng.uniform(-30, 50)),
+            "FCF": float(rng.uniform(-1e11, 1e12)),
+            "dividend_yield": float(rng.uniform(0, 8)),
+            "market_cap": float(rng.uniform(1e11, 1e14)),
+            "volume": float(rng.integers(0, 10**7)),
+            "currency": "IDR",
+            "last_updated": f"2026-01-{1 + i % 28:02d} 10:00:00",
+        }
+        for field in ("PER", "ROE", "FCF", "dividend_yield"):
+            if rng.random() < 0.1:
+                row[field] = None
+        data[f"T{i:03d}.JK"] = row
+    data["ERR.JK"] = {"error": "not found"}
+    return data
+
+
+def _quotes(stock_data: dict, seed: int = 1) -> dict:
+    rng = np.random.default_rng(seed)
+    quotes = {}
+    for ticker, data in stock_data.items():
+        if "error" in data or rng.random() < 0.3:
+            continue
+        day = 1 + int(rng.integers(0, 28))
+        quotes[ticker] = {
+            "price": float(data["price"] * rng.uniform(0.8, 1.2)),
+            "volume": float(rng.integers(0, 10**7)),
+            "quoted_at": f"2026-01-{day:02d} 12:00:00",
+        }
+    return quotes
+
+
+def test_table_snapshot_screens_like_dicts():
+    stock_data = _stock_data(300)
+    expected = screen_universe(stock_data, **DCF)
+    result = screen_universe(FundamentalsTable.from_stock_data(stock_data), **DCF)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_table_quotes_match_apply_quote():
+    stock_data = _stock_data(300)
+    quotes = _quotes(stock_data)
+    expected = {
+        # Sama seperti _with_quote: kuotasi yang lebih lama dari snapshot diabaikan
+        ticker: apply_quote(data, quotes[ticker])
+        if ticker in quotes and quotes[ticker]["quoted_at"] > data["last_updated"] else data
+        for ticker, data in stock_data.items()
+    }
+
+    table = FundamentalsTable.from_stock_data(stock_data)
+    tickers = list(table.tickers)
+    prices = np.array([quotes[t]["price"] if t in quotes else np.nan for t in tickers])
+    volumes = np.array([quotes[t]["volume"] if t in quotes else np.nan for t in tickers])
+    quoted_at = np.array([_parse_time(quotes[t]["quoted_at"]) if t in quotes else np.nan for t in tickers])
+    quoted = table.with_quotes(prices, volumes, quoted_at, PRICE_SCALED_FIELDS, PRICE_INVERSE_FIELDS)
+
+    pd.testing.assert_frame_equal(
+        screen_universe(quoted, **DCF), screen_universe(expected, **DCF), check_dtype=False
+    )
+    # Tabel asal tidak berubah
+    np.testing.assert_array_equal(table.column("price"), [stock_data[t]["price"] for t in tickers])
+
+
+def test_incremental_screener_matches_full_screening():
+    stock_data = _stock_data(400)
+    screener = IncrementalScreener()
+    steps = []
+
+    steps.append((dict(stock_data), DCF, None))
+    changed = dict(stock_data)
+    for ticker in list(changed)[:25]:
+        changed[ticker] = dict(changed[ticker], price=changed[ticker]["price"] * 1.1)
+    del changed["T399.JK"]
+    changed["NEW.JK"] = dict(stock_data["T000.JK"])
+    steps.append((changed, DCF, None))
+    steps.append((changed, DCF, lkh_rules_from_thresholds(10, 18)))
+    steps.append((changed, dict(DCF, growth_rate=0.08), lkh_rules_from_thresholds(10, 18)))
+    steps.append((FundamentalsTable.from_stock_data(changed), dict(DCF, growth_rate=0.08),
+                  lkh_rules_from_thresholds(10, 18)))
+
+    recomputed = []
+    for data, dcf, rules in steps:
+        table, _ = screener.update(data, rules=rules, **dcf)
+        pd.testing.assert_frame_equal(table, screen_universe(data, rules=rules, **dcf), check_dtype=False)
+        recomputed.append(screener.last_stats["recomputed"])
+    # Hanya 25 saham berubah + 1 saham baru yang dinilai ulang; aturan/DCF baru menilai ulang semuanya
+    assert recomputed == [400, 26, 400, 400, 0]
+
+
+def _table(rows: list) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=["ticker", "LKH_Score", "Margin_of_Safety"])
+    df.index = df.index + 1
+    return df
+
+
+def test_diff_screenings_events():
+    old = _table([
+        ("AAAA", 90, 10.0), ("BBBB", 85, -5.0), ("CCCC", 79, 3.0),
+        *[(f"F{i:03d}", 70, -1.0) for i in range(6)], ("DDDD", 60, 5.0),
+    ])
+    new = _table([
+        ("DDDD", 95, 5.0), ("AAAA", 78, 10.0), ("CCCC", 80, -2.0), ("BBBB", 85, 1.0),
+        *[(f"F{i:03d}", 70, -1.0) for i in range(6)], ("EEEE", 50, 0.0),
+    ])
+
+    diff = diff_screenings(old, new, score_threshold=80, min_rank_change=5)
+    assert list(diff.columns) == DIFF_COLUMNS
+    events = {(r.ticker, r.event): (r.old, r.new) for r in diff.itertuples()}
+    assert events.keys() == {
+        ("EEEE", "added"), ("DDDD", "rank_change"), ("DDDD", "score_crossed_above"),
+        ("BBBB", "newly_undervalued"), ("CCCC", "no_longer_undervalued"),
+        ("CCCC", "score_crossed_above"), ("AAAA", "score_crossed_below"),
+    }
+    assert events[("DDDD", "rank_change")] == (10, 1)
+    assert events[("AAAA", "score_crossed_below")] == (90, 78)
+    assert np.isnan(events[("EEEE", "added")][0])
+
+    diff = diff_screenings(new, old)
+    assert set(diff.loc[diff["event"] == "removed", "ticker"]) == {"EEEE"}
+    assert diff_screenings(old, old).empty
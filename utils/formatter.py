@@ -12,3 +12,17 @@ def format_percent(value):
         return f"{value:.2f}%"
     except:
         return value
+
+
+def format_age(seconds):
+    try:
+        seconds = float(seconds)
+    except:
+        return seconds
+    if seconds < 60:
+        return f"{seconds:.0f} detik"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} menit"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} jam"
+    return f"{seconds / 86400:.1f} hari"
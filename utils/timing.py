@@ -0,0 +1,180 @@
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# SCREENER_TIMING=1 (or enable()) turns on process-wide instrumentation. A
+# context bound with bind_session() is timed into its own registry even when
+# that switch is off; otherwise span() hands back a shared no-op context manager.
+_enabled = os.environ.get("SCREENER_TIMING", "") not in ("", "0", "false")
+_NOOP = contextlib.nullcontext()
+
+METRICS_PATH = os.environ.get("SCREENER_METRICS_PATH", "screener_metrics.jsonl")
+
+_current_path = contextvars.ContextVar("timing_path", default="")
+_session_registry = contextvars.ContextVar("timing_session", default=None)
+
+
+class SpanStats:
+    """Count/total plus a bounded window of recent durations for percentiles"""
+
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self, window: int = 2048):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+
+class TimingRegistry:
+    """Thread-safe collection of SpanStats keyed by span path (e.g. "analysis/dcf")"""
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: str, seconds: float):
+        with self._lock:
+            stats = self._stats.get(path)
+            if stats is None:
+                stats = self._stats[path] = SpanStats(self.window)
+            stats.add(seconds)
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+    def summary(self) -> list:
+        """
+        Per-span statistics in milliseconds, sorted by path
+
+        Returns:
+        list: [{"span", "count", "total_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms"}, ...]
+        """
+        with self._lock:
+            items = [(path, s.count, s.total, np.array(s.samples)) for path, s in self._stats.items()]
+        rows = []
+        for path, count, total, samples in sorted(items):
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99)) if len(samples) else (0, 0, 0)
+            rows.append({
+                "span": path,
+                "count": count,
+                "total_ms": total * 1e3,
+                "mean_ms": total / count * 1e3 if count else 0.0,
+                "p50_ms": float(p50) * 1e3,
+                "p95_ms": float(p95) * 1e3,
+                "p99_ms": float(p99) * 1e3,
+            })
+        return rows
+
+
+# Aggregates every span recorded in this process
+process_registry = TimingRegistry()
+
+
+def enable():
+    """Process-wide switch, same as SCREENER_TIMING=1 (for scripts and benchmarks)"""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def bind_session(registry: TimingRegistry):
+    """
+    Also record spans of the current thread/context into `registry`
+
+    Call once per Streamlit run with a registry kept in st.session_state to get
+    per-session statistics next to the process-wide ones. Only this context is
+    affected; the process-wide switch is left alone.
+    """
+    _session_registry.set(registry)
+
+
+def unbind_session():
+    """Stop recording the current thread/context into its session registry"""
+    _session_registry.set(None)
+
+
+@contextlib.contextmanager
+def _span(name: str):
+    parent = _current_path.get()
+    path = f"{parent}/{name}" if parent else name
+    token = _current_path.set(path)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _current_path.reset(token)
+        if _enabled:
+            process_registry.record(path, elapsed)
+        session = _session_registry.get()
+        if session is not None:
+            session.record(path, elapsed)
+
+
+def span(name: str):
+    """
+    Time a block; nested spans are recorded under "parent/child" paths
+
+        with span("dcf"):
+            ...
+    """
+    if not _enabled and _session_registry.get() is None:
+        return _NOOP
+    return _span(name)
+
+
+def timed(name: str = None):
+    """Decorator form of span(); defaults to the function's qualified name"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled and _session_registry.get() is None:
+                return func(*args, **kwargs)
+            with _span(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def export_metrics(path: str = METRICS_PATH, registry: TimingRegistry = None, label: str = "process") -> str:
+    """
+    Append a timestamped summary of `registry` (default: process-wide) as one JSON line
+
+    Returns:
+    str: The path written to
+    """
+    registry = registry or process_registry
+    line = json.dumps({
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "pid": os.getpid(),
+        "scope": label,
+        "spans": registry.summary(),
+    })
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+    return path